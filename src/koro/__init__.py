@@ -1,8 +1,106 @@
-from .slot import *
-from .slot.bin import *
-from .slot.file import *
-from .slot.save import *
-from .slot.xml import *
-from .stage import *
-from .stage.model import *
-from .stage.part import *
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Final
+
+if TYPE_CHECKING:
+    from .slot import *
+    from .slot.bin import *
+    from .slot.cache import *
+    from .slot.corpus import *
+    from .slot.file import *
+    from .slot.library import *
+    from .slot.packed import *
+    from .slot.save import *
+    from .slot.xml import *
+    from .stage import *
+    from .stage.array import *
+    from .stage.diff import *
+    from .stage.frozen import *
+    from .stage.index import *
+    from .stage.journal import *
+    from .stage.model import *
+    from .stage.part import *
+    from .stage.shared import *
+    from .validation import *
+
+_MODULES: Final[dict[str, tuple[str, ...]]] = {
+    ".slot": ("Slot",),
+    ".slot.bin": ("BinSlot",),
+    ".slot.cache": ("CachedSlot", "DiskCache", "StageCache"),
+    ".slot.corpus": ("Corpus", "CorpusWriter"),
+    ".slot.file": ("FileSlot",),
+    ".slot.library": ("StageLibrary",),
+    ".slot.packed": ("PackedSlot",),
+    ".slot.save": ("EditorPage", "SaveSlot"),
+    ".slot.xml": ("XmlSlot", "XmlWriter"),
+    ".stage": ("EditUser", "Stage", "Theme"),
+    ".stage.array": ("StageArray",),
+    ".stage.diff": ("StageDiff",),
+    ".stage.frozen": ("Frozen", "Interner", "freeze", "thaw"),
+    ".stage.index": ("SpatialIndex", "TypeIndex"),
+    ".stage.journal": ("Journal",),
+    ".stage.model": ("DecorationModel", "DeviceModel", "Model", "PartModel"),
+    ".stage.part": (
+        "Ant",
+        "BasePart",
+        "BlinkingTile",
+        "Bumper",
+        "Cannon",
+        "ConveyorBelt",
+        "DashTunnel",
+        "Drawbridge",
+        "Fan",
+        "FixedSpeedDevice",
+        "Gear",
+        "Goal",
+        "GreenCrystal",
+        "KororinCapsule",
+        "Magnet",
+        "MagnetSegment",
+        "MagnifyingGlass",
+        "MelodyTile",
+        "MovingCurve",
+        "MovingTile",
+        "Part",
+        "Press",
+        "ProgressMarker",
+        "Punch",
+        "Scissors",
+        "SeesawBlock",
+        "SizeTunnel",
+        "SlidingTile",
+        "Spring",
+        "Start",
+        "Thorn",
+        "TimedDevice",
+        "ToyTrain",
+        "TrainTrack",
+        "Turntable",
+        "UpsideDownBall",
+        "UpsideDownStageDevice",
+        "Walls",
+        "Warp",
+    ),
+    ".stage.shared": ("SharedStage",),
+    ".validation": ("Rule", "Violation", "validate", "validate_all"),
+}
+"""The names exported by each submodule, which is only imported when one of them is first accessed."""
+
+_EXPORTS: Final[dict[str, str]] = {
+    name: module for module, names in _MODULES.items() for name in names
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module: Final[str] = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value: Final[Any] = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
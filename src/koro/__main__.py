@@ -0,0 +1,309 @@
+"""Command line interface, run with python -m koro.
+Each subcommand only imports the modules that it needs, so that short invocations start quickly.
+"""
+
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from collections.abc import Iterator, Sequence
+from os.path import splitext
+from typing import TYPE_CHECKING, Final
+
+if TYPE_CHECKING:
+    from .slot.file import FileSlot
+    from .stage import Stage
+
+
+def _bench(args: Namespace, /) -> int:
+    from time import perf_counter
+
+    from .slot.bin import BinSlot
+    from .slot.packed import PackedSlot
+    from .slot.xml import XmlSlot
+
+    stage: Final[Stage] = _load(args.file)
+    print(f"{'format':<8}{'size':>10}{'serialize':>14}{'deserialize':>14}")
+    for slot_type in BinSlot, XmlSlot, PackedSlot:
+        start: float = perf_counter()
+        for _ in range(args.number):
+            data: bytes = slot_type.serialize(stage)
+        serialize: float = (perf_counter() - start) / args.number
+        start = perf_counter()
+        for _ in range(args.number):
+            slot_type.deserialize(data)
+        deserialize: float = (perf_counter() - start) / args.number
+        print(
+            f"{slot_type.__name__.removesuffix('Slot').lower():<8}{len(data):>10}{serialize * 1000:>12.2f}ms{deserialize * 1000:>12.2f}ms"
+        )
+    return 0
+
+
+def _convert(args: Namespace, /) -> int:
+    _file_slot(args.dest).save(_load(args.source))
+    return 0
+
+
+def _export(source: str, slot: int, /) -> bytes | None:
+    from .slot.bin import BinSlot
+    from .slot.save import EditorPage, SaveSlot
+
+    stage: Final[Stage | None] = SaveSlot(source, EditorPage.ORIGINAL, slot).load()
+    return None if stage is None else BinSlot.serialize(stage)
+
+
+def _file_slot(path: str, /) -> "FileSlot":
+    extension: Final[str] = splitext(path)[1].lower()
+    if extension == ".bin":
+        from .slot.bin import BinSlot
+
+        return BinSlot(path)
+    elif extension == ".packed":
+        from .slot.packed import PackedSlot
+
+        return PackedSlot(path)
+    elif extension == ".xml":
+        from .slot.xml import XmlSlot
+
+        return XmlSlot(path)
+    else:
+        raise ValueError(f"unknown stage file extension {extension!r}")
+
+
+def _inspect(args: Namespace, /) -> int:
+    if splitext(args.file)[1].lower() == ".corpus":
+        from .slot.corpus import Corpus
+
+        with Corpus(args.file) as corpus:
+            print(f"{len(corpus)} stages")
+            for i, key in enumerate(corpus.keys()):
+                print(
+                    f"{i:>8} {key or '-':<24} {corpus.theme(i).name:<24} {corpus.part_count(i):>6} parts"
+                )
+        return 0
+    stage: Final[Stage] = _load(args.file)
+    print(f"theme: {stage.theme.name}")
+    print(f"edit user: {stage.edit_user.name}")
+    print(f"tilt lock: {stage.tilt_lock}")
+    print(f"parts: {len(stage)}")
+    print(f"cost: {stage.total_cost}")
+    counts: Final[dict[str, int]] = {}
+    for part in stage:
+        counts[type(part).__name__] = counts.get(type(part).__name__, 0) + 1
+    for name, count in sorted(counts.items()):
+        print(f"  {name}: {count}")
+    return 0
+
+
+def _load(path: str, /) -> "Stage":
+    stage: Final[Stage | None] = _file_slot(path).load()
+    if stage is None:
+        raise FileNotFoundError(f"no stage at {path!r}")
+    return stage
+
+
+def main(argv: Sequence[str] | None = None, /) -> int:
+    """Run the command line interface with the given arguments, returning its exit status."""
+    parser: Final[ArgumentParser] = ArgumentParser(
+        prog="python -m koro",
+        description="Tools for manipulating levels made in Marble Saga: Kororinpa.",
+    )
+    subparsers: Final = parser.add_subparsers(required=True, metavar="command")
+
+    pack: Final[ArgumentParser] = subparsers.add_parser(
+        "pack", help="export levels from a save file into a ZIP archive"
+    )
+    pack.add_argument("source", help="the save file to export levels from")
+    pack.add_argument(
+        "dest", help="the location of the archive, or - to write it to standard output"
+    )
+    pack.add_argument(
+        "slots",
+        nargs="*",
+        default=range(1, 21),
+        type=int,
+        help="the slots to read levels from, in the order that they should be packed",
+        metavar="i",
+    )
+    pack.add_argument(
+        "-j",
+        "--jobs",
+        default=1,
+        type=int,
+        help="the number of processes to compress levels with, or 0 for one per CPU",
+        metavar="N",
+    )
+    pack.set_defaults(command=_pack)
+
+    unpack: Final[ArgumentParser] = subparsers.add_parser(
+        "unpack",
+        help="inject the levels in a ZIP archive, or a single level, into a save file",
+    )
+    unpack.add_argument(
+        "source", help="the archive to read levels from, or a single level"
+    )
+    unpack.add_argument("dest", help="the save file to inject")
+    unpack.add_argument(
+        "slot",
+        nargs="?",
+        default=1,
+        type=int,
+        help="the slot to place the level in, if injecting a single level",
+        metavar="i",
+    )
+    unpack.add_argument(
+        "-j",
+        "--jobs",
+        default=1,
+        type=int,
+        help="the number of processes to decompress levels with, or 0 for one per CPU",
+        metavar="N",
+    )
+    unpack.set_defaults(command=_unpack)
+
+    convert: Final[ArgumentParser] = subparsers.add_parser(
+        "convert",
+        help="convert a stage between the .bin, .xml and .packed formats, chosen by extension",
+    )
+    convert.add_argument("source", help="the stage to read")
+    convert.add_argument("dest", help="the file to write")
+    convert.set_defaults(command=_convert)
+
+    inspect: Final[ArgumentParser] = subparsers.add_parser(
+        "inspect", help="summarize a stage file, or list the stages in a corpus"
+    )
+    inspect.add_argument("file", help="the stage or corpus to inspect")
+    inspect.set_defaults(command=_inspect)
+
+    validate: Final[ArgumentParser] = subparsers.add_parser(
+        "validate", help="check stages against the rules of the game"
+    )
+    validate.add_argument("files", nargs="+", help="the stages to check")
+    validate.add_argument(
+        "-b",
+        "--budget",
+        type=int,
+        help="the maximum total cost of each stage",
+        metavar="N",
+    )
+    validate.set_defaults(command=_validate)
+
+    bench: Final[ArgumentParser] = subparsers.add_parser(
+        "bench", help="time serializing and deserializing a stage in each format"
+    )
+    bench.add_argument("file", help="the stage to use")
+    bench.add_argument(
+        "-n",
+        "--number",
+        default=5,
+        type=_positive,
+        help="the number of times to repeat each operation",
+        metavar="N",
+    )
+    bench.set_defaults(command=_bench)
+
+    args: Final[Namespace] = parser.parse_args(argv)
+    try:
+        return args.command(args)
+    except BrokenPipeError:
+        # The reader went away, as when piping to head; silence the error that flushing stdout would raise at exit
+        from os import O_WRONLY, devnull, dup2
+        from os import open as os_open
+        from sys import stdout
+
+        dup2(os_open(devnull, O_WRONLY), stdout.fileno())
+        return 1
+    except (OSError, ValueError) as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
+
+
+def _pack(args: Namespace, /) -> int:
+    from concurrent.futures import ProcessPoolExecutor
+    from contextlib import ExitStack
+    from itertools import repeat
+    from sys import stdout
+    from zipfile import ZipFile
+
+    with ExitStack() as stack:
+        # Levels are compressed in parallel, but still added to the archive in order
+        binaries: Iterator[bytes | None] = (
+            map(_export, repeat(args.source), args.slots)
+            if args.jobs == 1
+            else stack.enter_context(ProcessPoolExecutor(args.jobs or None)).map(
+                _export, repeat(args.source), args.slots
+            )
+        )
+        z: Final[ZipFile] = stack.enter_context(
+            ZipFile(
+                (
+                    stdout.buffer
+                    if args.dest == "-"
+                    else stack.enter_context(open(args.dest, "wb"))
+                ),
+                "w",
+            )
+        )
+        for dest_slot, binary in enumerate(binaries, 1):
+            if binary is not None:
+                z.writestr(f"{dest_slot:02}.bin", binary)
+    return 0
+
+
+def _positive(value: str, /) -> int:
+    result: Final[int] = int(value)
+    if result < 1:
+        raise ArgumentTypeError(f"must be at least 1, not {result}")
+    return result
+
+
+def _transcode(data: bytes | None, /) -> bytes:
+    """Turn the data of a .bin file into the data of a save slot, or clear the slot if there is none.
+    Both are bytes, so that a worker process does not have to send a stage back.
+    """
+    from .slot.bin import BinSlot
+    from .slot.xml import XmlSlot
+
+    return b"" if data is None else XmlSlot.serialize(BinSlot.deserialize(data))
+
+
+def _unpack(args: Namespace, /) -> int:
+    from concurrent.futures import ProcessPoolExecutor
+    from contextlib import ExitStack
+    from zipfile import ZipFile
+
+    from .slot.save import EditorPage, SaveSlot
+
+    if splitext(args.source)[1].lower() != ".zip":
+        SaveSlot(args.dest, EditorPage.FRIEND, args.slot).save(_load(args.source))
+        return 0
+    with ZipFile(args.source) as z:
+        names: Final[set[str]] = set(z.namelist())
+        members: Final[list[bytes | None]] = [
+            z.read(f"{slot:02}.bin") if f"{slot:02}.bin" in names else None
+            for slot in range(1, 21)
+        ]
+    with ExitStack() as stack:
+        binaries: Final[Iterator[bytes]] = (
+            map(_transcode, members)
+            if args.jobs == 1
+            else stack.enter_context(ProcessPoolExecutor(args.jobs or None)).map(
+                _transcode, members
+            )
+        )
+        SaveSlot.write_many(
+            (SaveSlot(args.dest, EditorPage.FRIEND, slot), binary)
+            for slot, binary in enumerate(binaries, 1)
+        )
+    return 0
+
+
+def _validate(args: Namespace, /) -> int:
+    from .validation import validate
+
+    status: int = 0
+    for path in args.files:
+        for violation in validate(_load(path), budget=args.budget):
+            print(f"{path}: {violation.rule.name}: {violation.message}")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
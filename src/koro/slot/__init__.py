@@ -1,13 +1,64 @@
 from abc import ABC, abstractmethod
+from asyncio import get_running_loop
+from concurrent.futures import Executor
+from typing import BinaryIO, Final
 
 from ..stage import Stage
 
 __all__ = ["Slot"]
 
+_CHUNK_SIZE: Final[int] = 4096
+
+
+def _write_changes(f: BinaryIO, offset: int, old: bytes, new: bytes, /) -> None:
+    """Write the chunks of new that differ from old, the data currently stored at offset.
+    Runs of adjacent changed chunks are written together; nothing is written if the data is unchanged.
+    """
+    if old == new:
+        return
+    view: Final[memoryview] = memoryview(new)
+    start: int | None = None
+    for i in range(0, len(new), _CHUNK_SIZE):
+        if old[i : i + _CHUNK_SIZE] != view[i : i + _CHUNK_SIZE]:
+            if start is None:
+                start = i
+        elif start is not None:
+            f.seek(offset + start)
+            f.write(view[start:i])
+            start = None
+    if start is not None:
+        f.seek(offset + start)
+        f.write(view[start:])
+
 
 class Slot(ABC):
     __slots__ = ()
 
+    async def aload(
+        self,
+        /,
+        *,
+        cpu_executor: Executor | None = None,
+        io_executor: Executor | None = None,
+    ) -> Stage | None:
+        """Asynchronous version of load, which runs in io_executor; None selects the event loop's default executor.
+        Slots that can read their data separately from decoding it, such as FileSlot and SaveSlot, override this to decode in cpu_executor; this implementation cannot, so it leaves cpu_executor unused.
+        """
+        return await get_running_loop().run_in_executor(io_executor, self.load)
+
+    async def asave(
+        self,
+        data: Stage | None,
+        /,
+        *,
+        cpu_executor: Executor | None = None,
+        io_executor: Executor | None = None,
+    ) -> None:
+        """Asynchronous version of save, which runs in io_executor; None selects the event loop's default executor.
+        Slots that can encode their data separately from writing it, such as FileSlot and SaveSlot, override this to encode in cpu_executor; this implementation cannot, so it leaves cpu_executor unused.
+        """
+        await get_running_loop().run_in_executor(io_executor, self.save, data)
+
     def __bool__(self) -> bool:
         """Return whether this slot is filled."""
         return self.load() is not None
@@ -1,10 +1,17 @@
 from itertools import chain
-from typing import Final
+from typing import TYPE_CHECKING, Any, Final
 
 from ..stage import Stage
+from ..stage.frozen import Interner
 from .file import FileSlot
 from .xml import XmlSlot
 
+if TYPE_CHECKING:
+    from _typeshed import ReadableBuffer
+else:
+    ReadableBuffer = Any
+
+
 __all__ = ["BinSlot"]
 
 
@@ -117,42 +124,49 @@ class BinSlot(FileSlot):
         return bytes(output)
 
     @staticmethod
-    def decompress(data: bytes, /) -> bytes:
+    def decompress(data: ReadableBuffer, /) -> bytes:
+        """data can be any object supporting the buffer protocol; it is read in place."""
         buffer: Final[bytearray] = bytearray(1024)
         buffer_index: int = 958
         handle: int | bytearray
         flags: int
         offset: int
-        raw: Final[bytearray] = bytearray(data[:15:-1])
-        ref: bytes
+        position: int = 16
+        ref: tuple[int, int]
         result: Final[bytearray] = bytearray()
-        result_size: Final[int] = int.from_bytes(data[8:12], byteorder="big")
-        while len(result) < result_size:
-            flags = raw.pop()
-            for _ in range(8):
-                if flags & 1:
-                    handle = raw.pop()
-                    buffer[buffer_index] = handle
-                    buffer_index = buffer_index + 1 & 1023
-                    result.append(handle)
-                else:
-                    if len(raw) < 2:
-                        return result
-                    ref = bytes((raw.pop() for _ in range(2)))
-                    offset = (ref[1] << 2 & 768) + ref[0]
-                    handle = bytearray()
-                    for i in range((ref[1] & 63) + 3):
-                        handle.append(buffer[offset + i - 1024])
-                        buffer[buffer_index] = handle[-1]
+        with memoryview(data) as raw:
+            result_size: Final[int] = int.from_bytes(raw[8:12], byteorder="big")
+            while len(result) < result_size:
+                flags = raw[position]
+                position += 1
+                for _ in range(8):
+                    if flags & 1:
+                        handle = raw[position]
+                        position += 1
+                        buffer[buffer_index] = handle
                         buffer_index = buffer_index + 1 & 1023
-                    result.extend(handle)
-                flags >>= 1
+                        result.append(handle)
+                    else:
+                        if len(raw) - position < 2:
+                            return bytes(result)
+                        ref = raw[position], raw[position + 1]
+                        position += 2
+                        offset = (ref[1] << 2 & 768) + ref[0]
+                        handle = bytearray()
+                        for i in range((ref[1] & 63) + 3):
+                            handle.append(buffer[offset + i - 1024])
+                            buffer[buffer_index] = handle[-1]
+                            buffer_index = buffer_index + 1 & 1023
+                        result.extend(handle)
+                    flags >>= 1
         return bytes(result)
 
     @staticmethod
-    def deserialize(data: bytes, /) -> Stage:
-        return XmlSlot.deserialize(BinSlot.decompress(data))
+    def deserialize(
+        data: ReadableBuffer, /, *, interner: Interner | None = None
+    ) -> Stage:
+        return XmlSlot.deserialize(BinSlot.decompress(data), interner=interner)
 
     @staticmethod
-    def serialize(stage: Stage, /) -> bytes:
-        return BinSlot.compress(XmlSlot.serialize(stage))
+    def serialize(stage: Stage, /, *, canonical: bool = True) -> bytes:
+        return BinSlot.compress(XmlSlot.serialize(stage, canonical=canonical))
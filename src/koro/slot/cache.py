@@ -0,0 +1,278 @@
+from collections import OrderedDict
+from collections.abc import Iterator
+from os import DirEntry, getpid, makedirs, remove, replace, scandir, stat, utime
+from os.path import join
+from pickle import HIGHEST_PROTOCOL, dumps, loads
+from threading import Lock, get_ident
+from typing import TYPE_CHECKING, Any, Final
+
+from ..stage import EditUser, Stage, Theme
+from . import Slot
+from .file import FileSlot
+from .save import SaveSlot
+
+if TYPE_CHECKING:
+    from _typeshed import StrPath
+else:
+    StrPath = Any
+
+
+__all__ = ["CachedSlot", "DiskCache", "StageCache"]
+
+
+class StageCache:
+    """Least recently used cache of loaded stages, shared between any number of CachedSlots.
+    Entries are checked against the modification time and size of the file that they were loaded from.
+    Entries hold the records of the parts, from which every hit builds new parts without going through their constructors.
+    """
+
+    __match_args__ = ("maxsize",)
+    __slots__ = ("_entries", "_lock", "_maxsize")
+
+    _entries: OrderedDict[
+        FileSlot | SaveSlot,
+        tuple[int, int, tuple[tuple[Any, ...], ...], EditUser, Theme, bool],
+    ]
+    _lock: Lock
+    _maxsize: int
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._maxsize = maxsize
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def discard(self, slot: FileSlot | SaveSlot, /) -> None:
+        with self._lock:
+            self._entries.pop(slot, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, slot: FileSlot | SaveSlot, /) -> Stage | None:
+        """Load slot, reusing the last result if its file has not changed since.
+        Each call returns a new stage with parts of its own, which callers may change freely, as with Slot.load.
+        """
+        try:
+            stamp: Final = stat(slot._path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            entry: (
+                tuple[int, int, tuple[tuple[Any, ...], ...], EditUser, Theme, bool]
+                | None
+            ) = self._entries.get(slot)
+            if entry is not None:
+                if entry[:2] == (stamp.st_mtime_ns, stamp.st_size):
+                    self._entries.move_to_end(slot)
+                else:
+                    del self._entries[slot]
+                    entry = None
+        if entry is not None:
+            return Stage.from_records(
+                entry[2], edit_user=entry[3], theme=entry[4], tilt_lock=entry[5]
+            )
+        loaded: Final[Stage | None] = slot.load()
+        if loaded is None:
+            return None
+        with self._lock:
+            self._entries[slot] = (
+                stamp.st_mtime_ns,
+                stamp.st_size,
+                tuple(loaded.records()),
+                loaded.edit_user,
+                loaded.theme,
+                loaded.tilt_lock,
+            )
+            self._entries.move_to_end(slot)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return loaded
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.maxsize!r})"
+
+
+_shared_cache: Final[StageCache] = StageCache()
+
+
+class CachedSlot(Slot):
+    """Wrapper around a slot that loads through a StageCache and invalidates it on save.
+    By default, all CachedSlots share a single cache.
+    """
+
+    __match_args__ = ("slot",)
+    __slots__ = ("_cache", "_slot")
+
+    _cache: StageCache
+    _slot: FileSlot | SaveSlot
+
+    def __init__(
+        self, slot: FileSlot | SaveSlot, /, cache: StageCache = _shared_cache
+    ) -> None:
+        self._cache = cache
+        self._slot = slot
+
+    def __bool__(self) -> bool:
+        return bool(self.slot)
+
+    @property
+    def cache(self) -> StageCache:
+        return self._cache
+
+    def __eq__(self, other: object, /) -> bool:
+        if isinstance(other, CachedSlot):
+            return self.slot == other.slot and self.cache is other.cache
+        else:
+            return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.slot)
+
+    def load(self) -> Stage | None:
+        return self.cache.load(self.slot)
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}({self.slot!r})"
+            if self.cache is _shared_cache
+            else f"{type(self).__name__}({self.slot!r}, {self.cache!r})"
+        )
+
+    def save(self, data: Stage | None, /) -> None:
+        try:
+            self.slot.save(data)
+        finally:
+            self.cache.discard(self.slot)
+
+    @property
+    def slot(self) -> FileSlot | SaveSlot:
+        return self._slot
+
+
+class DiskCache:
+    """Persistent cache of decoded stages, stored as one file per entry in a directory.
+    Entries are keyed by a digest of the raw stage data, so they stay valid across processes and restarts.
+    Once the directory grows past max_bytes, the least recently used entries are deleted.
+    Entries are pickled, so only point this at a directory that is trusted.
+    To enable it for all file slots, set FileSlot.disk_cache to an instance of this class.
+    """
+
+    __match_args__ = ("directory", "max_bytes")
+    __slots__ = ("_directory", "_lock", "_max_bytes", "_size")
+
+    _directory: str
+    _lock: Lock
+    _max_bytes: int
+    _size: int | None
+
+    def __init__(self, directory: StrPath, /, max_bytes: int = 1 << 28) -> None:
+        self._directory = str(directory)
+        self._lock = Lock()
+        self._max_bytes = max_bytes
+        self._size = None
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._entries():
+                try:
+                    remove(entry.path)
+                except FileNotFoundError:
+                    pass
+            self._size = 0
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def _entries(self) -> Iterator[DirEntry[str]]:
+        try:
+            for shard in scandir(self.directory):
+                if shard.is_dir():
+                    for entry in scandir(shard.path):
+                        if entry.name.endswith(".stage"):
+                            yield entry
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        """Delete the least recently used entries until the cache is at three quarters of its limit."""
+        entries: Final[list[tuple[int, int, str]]] = []
+        for entry in self._entries():
+            try:
+                info = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((info.st_mtime_ns, info.st_size, entry.path))
+        entries.sort()
+        size: int = sum(entry[1] for entry in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes * 3 // 4:
+                break
+            try:
+                remove(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+        self._size = size
+
+    def get(self, key: str, /) -> Stage | None:
+        """Entries that cannot be unpickled, such as those written by other versions of this library, are deleted and treated as misses."""
+        path: Final[str] = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data: Final[bytes] = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            stage: Any = loads(data)
+        except Exception:
+            stage = None
+        if not isinstance(stage, Stage):
+            try:
+                remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        try:
+            utime(path)
+        except FileNotFoundError:
+            pass
+        return stage
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def _path(self, key: str, /) -> str:
+        return join(self.directory, key[:2], f"{key[2:]}.stage")
+
+    def put(self, key: str, stage: Stage, /) -> None:
+        data: Final[bytes] = dumps(stage, HIGHEST_PROTOCOL)
+        path: Final[str] = self._path(key)
+        makedirs(join(self.directory, key[:2]), exist_ok=True)
+        temp: Final[str] = f"{path}.{getpid()}-{get_ident()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(data)
+        with self._lock:
+            try:
+                replaced: int = stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+            replace(temp, path)
+            if self._size is None:
+                self._evict()
+            else:
+                self._size += len(data) - replaced
+                if self._size > self.max_bytes:
+                    self._evict()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.directory!r}, {self.max_bytes!r})"
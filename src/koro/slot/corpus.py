@@ -0,0 +1,271 @@
+from array import array
+from collections.abc import Iterator
+from mmap import ACCESS_READ, mmap
+from operator import index
+from struct import Struct, iter_unpack
+from types import TracebackType
+from typing import IO, TYPE_CHECKING, Any, Final, Self, SupportsIndex
+
+from ..stage import Stage, Theme
+from ..stage.frozen import Interner
+from .packed import PackedSlot
+
+if TYPE_CHECKING:
+    from _typeshed import StrOrBytesPath
+else:
+    StrOrBytesPath = Any
+
+
+__all__ = ["Corpus", "CorpusWriter"]
+
+_MAGIC: Final[bytes] = b"KRPC"
+
+_VERSION: Final[int] = 1
+
+_HEADER: Final[Struct] = Struct("<4sB")
+"""Magic and version, at the start of the file."""
+
+_ENTRY: Final[Struct] = Struct("<QIIBH")
+"""Offset, size, part count, theme and key length of a stage, in the index."""
+
+_TRAILER: Final[Struct] = Struct("<QI4s")
+"""Offset of the index, number of stages and magic, at the end of the file."""
+
+
+class CorpusWriter:
+    """Writes stages one after another to a new corpus file, which is opened by Corpus.
+    Stages are stored in the format of PackedSlot, and the index is written on close.
+    """
+
+    __match_args__ = ("path",)
+    __slots__ = ("_entries", "_file", "_keys", "_path")
+
+    _entries: list[tuple[int, int, int, int, bytes]]
+    _file: IO[bytes]
+    _keys: set[str]
+    _path: StrOrBytesPath
+
+    def __init__(self, path: StrOrBytesPath, /) -> None:
+        self._entries = []
+        self._file = open(path, "wb")
+        self._keys = set()
+        self._path = path
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION))
+
+    def add(self, stage: Stage, /, key: str = "", *, single: bool = False) -> int:
+        """Write stage, returning its index in the corpus.
+        If a key is given, the stage can also be looked up by it; keys must be unique, and at most 65535 bytes long in UTF-8.
+        When single is set, floating-point values are stored in single precision.
+        """
+        encoded: Final[bytes] = key.encode()
+        if len(encoded) > 0xFFFF:
+            raise ValueError("key is longer than 65535 bytes in UTF-8")
+        if key:
+            if key in self._keys:
+                raise ValueError(f"duplicate key {key!r}")
+        data: Final[bytes] = PackedSlot.serialize(stage, single=single)
+        if key:
+            self._keys.add(key)
+        self._entries.append(
+            (
+                self._file.tell(),
+                len(data),
+                len(stage),
+                stage.theme.value,
+                encoded,
+            )
+        )
+        self._file.write(data)
+        return len(self._entries) - 1
+
+    def close(self) -> None:
+        """Write the index and close the file. Nothing is written if it is already closed."""
+        if self._file.closed:
+            return
+        try:
+            offset: Final[int] = self._file.tell()
+            self._file.writelines(
+                _ENTRY.pack(*entry[:4], len(entry[4])) for entry in self._entries
+            )
+            self._file.writelines(entry[4] for entry in self._entries)
+            self._file.write(_TRAILER.pack(offset, len(self._entries), _MAGIC))
+        finally:
+            self._file.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+    ) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def path(self) -> StrOrBytesPath:
+        return self._path
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.path!r})"
+
+
+class Corpus:
+    """Read-only view of a corpus file written by CorpusWriter.
+    The file is memory-mapped, and only the index is read on opening; each stage is decoded when it is accessed.
+    Stages can be accessed by index or by key.
+    """
+
+    __match_args__ = ("path",)
+    __slots__ = (
+        "_file",
+        "_key_index",
+        "_keys",
+        "_map",
+        "_offsets",
+        "_part_counts",
+        "_path",
+        "_sizes",
+        "_themes",
+    )
+
+    _file: IO[bytes]
+    _key_index: dict[str, int] | None
+    _keys: list[str]
+    _map: mmap
+    _offsets: "array[int]"
+    _part_counts: "array[int]"
+    _path: StrOrBytesPath
+    _sizes: "array[int]"
+    _themes: "array[int]"
+
+    def __init__(self, path: StrOrBytesPath, /) -> None:
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        self._path = path
+        try:
+            self._read_index()
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __contains__(self, key: object, /) -> bool:
+        return isinstance(key, str) and key in self._lookup()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+    ) -> None:
+        self.close()
+
+    def __getitem__(self, key: SupportsIndex | str, /) -> Stage:
+        """Decode the stage with the given index or key."""
+        return self.load(key)
+
+    def _index(self, key: SupportsIndex | str, /) -> int:
+        if isinstance(key, str):
+            try:
+                return self._lookup()[key]
+            except KeyError:
+                raise KeyError(key) from None
+        return range(len(self))[index(key)]
+
+    def __iter__(self) -> Iterator[Stage]:
+        for i in range(len(self)):
+            yield self.load(i)
+
+    def key(self, index_: SupportsIndex, /) -> str:
+        """The key of the stage with the given index, or an empty string if it has none."""
+        return self._keys[index_]
+
+    def keys(self) -> list[str]:
+        """The key of each stage in order, or an empty string for those without one."""
+        return self._keys.copy()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def load(
+        self, key: SupportsIndex | str, /, *, interner: Interner | None = None
+    ) -> Stage:
+        """Decode the stage with the given index or key.
+        If an interner is given, the stage is made of frozen parts shared with other stages loaded with it, as returned by Interner.intern_all.
+        """
+        i: Final[int] = self._index(key)
+        with memoryview(self._map)[
+            self._offsets[i] : self._offsets[i] + self._sizes[i]
+        ] as view:
+            return PackedSlot.deserialize(view, interner=interner)
+
+    def _lookup(self) -> dict[str, int]:
+        if self._key_index is None:
+            self._key_index = {key: i for i, key in enumerate(self._keys) if key}
+        return self._key_index
+
+    def part_count(self, key: SupportsIndex | str, /) -> int:
+        """The number of parts in the stage with the given index or key, read from the index without decoding it."""
+        return self._part_counts[self._index(key)]
+
+    @property
+    def path(self) -> StrOrBytesPath:
+        return self._path
+
+    def _read_index(self) -> None:
+        if len(self._map) < _HEADER.size + _TRAILER.size:
+            raise ValueError("file is too short to be a corpus")
+        magic, version = _HEADER.unpack_from(self._map)
+        offset, count, end_magic = _TRAILER.unpack_from(
+            self._map, len(self._map) - _TRAILER.size
+        )
+        if magic != _MAGIC or end_magic != _MAGIC:
+            raise ValueError("file is not a corpus, or was not closed after writing")
+        if version > _VERSION:
+            raise ValueError(f"unsupported corpus version {version}")
+        if offset + count * _ENTRY.size > len(self._map) - _TRAILER.size:
+            raise ValueError("corpus index is truncated")
+        self._key_index = None
+        self._keys = []
+        self._offsets = array("Q")
+        self._part_counts = array("I")
+        self._sizes = array("I")
+        self._themes = array("B")
+        key_lengths: Final[list[int]] = []
+        with memoryview(self._map) as view:
+            for entry in iter_unpack(
+                _ENTRY.format, view[offset : offset + count * _ENTRY.size]
+            ):
+                self._offsets.append(entry[0])
+                self._sizes.append(entry[1])
+                self._part_counts.append(entry[2])
+                self._themes.append(entry[3])
+                key_lengths.append(entry[4])
+            position: int = offset + count * _ENTRY.size
+            for length in key_lengths:
+                self._keys.append(str(view[position : position + length], "utf-8"))
+                position += length
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.path!r})"
+
+    def theme(self, key: SupportsIndex | str, /) -> Theme:
+        """The theme of the stage with the given index or key, read from the index without decoding it."""
+        return Theme(self._themes[self._index(key)])
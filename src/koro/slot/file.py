@@ -1,14 +1,21 @@
 from abc import ABC, abstractmethod
-from os import remove
+from asyncio import get_running_loop
+from concurrent.futures import Executor
+from hashlib import blake2b
+from mmap import ACCESS_READ, mmap
+from os import fstat, remove
 from os.path import isfile
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar, Final
 
 from ..stage import Stage
-from . import Slot
+from . import Slot, _write_changes
 
 if TYPE_CHECKING:
-    from _typeshed import StrOrBytesPath
+    from _typeshed import ReadableBuffer, StrOrBytesPath
+
+    from .cache import DiskCache
 else:
+    ReadableBuffer = Any
     StrOrBytesPath = Any
 
 
@@ -21,15 +28,80 @@ class FileSlot(Slot, ABC):
 
     _path: StrOrBytesPath
 
+    disk_cache: ClassVar["DiskCache | None"] = None
+    """When set, decoded stages are stored in and reused from this cache."""
+
     def __init__(self, path: StrOrBytesPath, /) -> None:
         self._path = path
 
+    async def aload(
+        self,
+        /,
+        *,
+        cpu_executor: Executor | None = None,
+        io_executor: Executor | None = None,
+    ) -> Stage | None:
+        data: Final[bytes | None] = await get_running_loop().run_in_executor(
+            io_executor, self._read
+        )
+        if data is None:
+            return None
+        cache: Final[DiskCache | None] = self.disk_cache
+        if cache is None:
+            return await get_running_loop().run_in_executor(
+                cpu_executor, self.deserialize, data
+            )
+        key: Final[str] = self._cache_key(data)
+        stage: Stage | None = await get_running_loop().run_in_executor(
+            io_executor, cache.get, key
+        )
+        if stage is None:
+            stage = await get_running_loop().run_in_executor(
+                cpu_executor, self.deserialize, data
+            )
+            await get_running_loop().run_in_executor(io_executor, cache.put, key, stage)
+        return stage
+
+    async def asave(
+        self,
+        data: Stage | None,
+        /,
+        *,
+        cpu_executor: Executor | None = None,
+        io_executor: Executor | None = None,
+    ) -> None:
+        binary: Final[bytes | None] = (
+            None
+            if data is None
+            else await get_running_loop().run_in_executor(
+                cpu_executor, self.serialize, data
+            )
+        )
+        await get_running_loop().run_in_executor(io_executor, self._write, binary)
+
     def __bool__(self) -> bool:
         return isfile(self.path)
 
+    def _cache_key(self, data: ReadableBuffer, /) -> str:
+        # The number is bumped whenever the pickled form of stages changes, so that older cache entries are never looked up
+        return blake2b(
+            data, digest_size=20, person=f"koro2{type(self).__name__}".encode()[:16]
+        ).hexdigest()
+
+    def _decode(self, data: ReadableBuffer, /) -> Stage:
+        cache: Final[DiskCache | None] = self.disk_cache
+        if cache is None:
+            return self.deserialize(data)
+        key: Final[str] = self._cache_key(data)
+        stage: Stage | None = cache.get(key)
+        if stage is None:
+            stage = self.deserialize(data)
+            cache.put(key, stage)
+        return stage
+
     @staticmethod
     @abstractmethod
-    def deserialize(data: bytes, /) -> Stage:
+    def deserialize(data: ReadableBuffer, /) -> Stage:
         pass
 
     def __eq__(self, other: object, /) -> bool:
@@ -44,9 +116,13 @@ class FileSlot(Slot, ABC):
         return hash(self.path)
 
     def load(self) -> Stage | None:
+        """The file is memory-mapped rather than read into memory."""
         try:
             with open(self.path, "rb") as f:
-                return self.deserialize(f.read())
+                if not fstat(f.fileno()).st_size:
+                    return self._decode(b"")
+                with mmap(f.fileno(), 0, access=ACCESS_READ) as data:
+                    return self._decode(data)
         except FileNotFoundError:
             return None
 
@@ -54,17 +130,34 @@ class FileSlot(Slot, ABC):
     def path(self) -> StrOrBytesPath:
         return self._path
 
+    def _read(self) -> bytes | None:
+        try:
+            with open(self.path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
     def __repr__(self) -> str:
         return f"{type(self).__name__}({self.path!r})"
 
     def save(self, data: Stage | None) -> None:
-        if data is None:
-            remove(self.path)
-        else:
-            with open(self.path, "wb") as f:
-                f.write(self.serialize(data))
+        self._write(None if data is None else self.serialize(data))
 
     @staticmethod
     @abstractmethod
     def serialize(stage: Stage, /) -> bytes:
         pass
+
+    def _write(self, binary: bytes | None, /) -> None:
+        if binary is None:
+            remove(self.path)
+        else:
+            try:
+                with open(self.path, "r+b") as f:
+                    old: bytes = f.read()
+                    _write_changes(f, 0, old, binary)
+                    if len(old) > len(binary):
+                        f.truncate(len(binary))
+            except FileNotFoundError:
+                with open(self.path, "wb") as f:
+                    f.write(binary)
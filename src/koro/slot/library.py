@@ -0,0 +1,143 @@
+from collections.abc import Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import ExitStack
+from glob import iglob
+from os import cpu_count, fspath
+from os.path import join, splitext
+from typing import TYPE_CHECKING, Any, Final
+
+from ..stage import Stage
+from .bin import BinSlot
+from .file import FileSlot
+from .xml import XmlSlot
+
+if TYPE_CHECKING:
+    from _typeshed import StrPath
+else:
+    StrPath = Any
+
+
+__all__ = ["StageLibrary"]
+
+_SLOT_TYPES: Final[dict[str, type[FileSlot]]] = {".bin": BinSlot, ".xml": XmlSlot}
+
+
+class StageLibrary:
+    """A directory of BIN and XML stage files that are loaded in parallel.
+    Iterating yields (path, stage) pairs in the order that loading finishes.
+    Files that fail to load are skipped and recorded in errors, so that one bad file does not end the iteration.
+    """
+
+    __match_args__ = ("directory", "pattern")
+    __slots__ = (
+        "_cpu_executor",
+        "_directory",
+        "_errors",
+        "_io_executor",
+        "_max_pending",
+        "_pattern",
+    )
+
+    _cpu_executor: Executor | None
+    _directory: str
+    _errors: dict[str, Exception]
+    _io_executor: Executor | None
+    _max_pending: int
+    _pattern: str
+
+    def __init__(
+        self,
+        directory: StrPath,
+        /,
+        pattern: str = "*.bin",
+        *,
+        cpu_executor: Executor | None = None,
+        io_executor: Executor | None = None,
+        max_pending: int | None = None,
+    ) -> None:
+        """Files are read in io_executor and decoded in cpu_executor; when omitted, a thread pool and a process pool are created for each iteration.
+        At most max_pending files, which must be at least 1, are read or decoded ahead of the consumer.
+        """
+        if max_pending is not None and max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self._cpu_executor = cpu_executor
+        self._directory = fspath(directory)
+        self._errors = {}
+        self._io_executor = io_executor
+        self._max_pending = (
+            4 * (cpu_count() or 1) if max_pending is None else max_pending
+        )
+        self._pattern = pattern
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def errors(self) -> dict[str, Exception]:
+        """The exception raised while loading each file that failed in the current or most recent iteration, keyed by path."""
+        return self._errors
+
+    def __iter__(self) -> Iterator[tuple[str, Stage]]:
+        self._errors = {}
+        with ExitStack() as stack:
+            cpu_executor: Executor
+            io_executor: Executor
+            if self._cpu_executor is None:
+                cpu_executor = ProcessPoolExecutor()
+                stack.callback(cpu_executor.shutdown, cancel_futures=True)
+            else:
+                cpu_executor = self._cpu_executor
+            if self._io_executor is None:
+                io_executor = ThreadPoolExecutor()
+                stack.callback(io_executor.shutdown, cancel_futures=True)
+            else:
+                io_executor = self._io_executor
+            paths: Final[Iterator[str]] = self.paths()
+            pending: Final[dict[Future[Any], tuple[str, type[FileSlot] | None]]] = {}
+            while True:
+                while len(pending) < self._max_pending:
+                    path: str | None = next(paths, None)
+                    if path is None:
+                        break
+                    slot_type: type[FileSlot] = _SLOT_TYPES[splitext(path)[1].lower()]
+                    pending[io_executor.submit(slot_type(path)._read)] = (
+                        path,
+                        slot_type,
+                    )
+                if not pending:
+                    return
+                for future in wait(pending, return_when=FIRST_COMPLETED)[0]:
+                    done_path, done_type = pending.pop(future)
+                    try:
+                        result: Any = future.result()
+                    except Exception as e:
+                        self._errors[done_path] = e
+                        continue
+                    if done_type is None:
+                        yield done_path, result
+                    elif result is not None:
+                        pending[cpu_executor.submit(done_type.deserialize, result)] = (
+                            done_path,
+                            None,
+                        )
+
+    def paths(self) -> Iterator[str]:
+        """The paths of the BIN and XML files matching this library's pattern."""
+        for name in iglob(self.pattern, root_dir=self.directory, recursive=True):
+            if splitext(name)[1].lower() in _SLOT_TYPES:
+                yield join(self.directory, name)
+
+    @property
+    def pattern(self) -> str:
+        return self._pattern
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.directory!r}, {self.pattern!r})"
@@ -0,0 +1,222 @@
+from collections.abc import Callable
+from struct import Struct, iter_unpack
+from typing import TYPE_CHECKING, Any, Final
+
+from ..stage import EditUser, Stage, Theme
+from ..stage.array import _FIELDS, _KINDS, _encode, _kind_code
+from ..stage.frozen import Interner
+from ..stage.part import BasePart, Magnet, MagnetSegment, ToyTrain, TrainTrack
+from .file import FileSlot
+
+if TYPE_CHECKING:
+    from _typeshed import ReadableBuffer
+else:
+    ReadableBuffer = Any
+
+
+__all__ = ["PackedSlot"]
+
+_MAGIC: Final[bytes] = b"KORO"
+
+_VERSION: Final[int] = 1
+
+_SINGLE: Final[int] = 1
+"""Header flag set when floating-point values are stored in single precision."""
+
+_HEADER: Final[Struct] = Struct("<4sBBBBBB")
+"""Magic, version, flags, edit user, theme, tilt lock and section count."""
+
+_SECTION: Final[Struct] = Struct("<BI")
+"""Kind code and record count, at the start of each section."""
+
+
+_POSITION_ROTATION: Final[tuple[str, ...]] = (
+    "x_pos",
+    "y_pos",
+    "z_pos",
+    "x_rot",
+    "y_rot",
+    "z_rot",
+)
+"""Names of the values that every record except a magnet's starts with."""
+_structs: Final[dict[tuple[int, bool], Struct]] = {}
+
+
+def _struct(code: int, single: bool, /) -> Struct:
+    try:
+        return _structs[code, single]
+    except KeyError:
+        pass
+    kind: Final[type[BasePart]] = _KINDS[code]
+    result: Final[Struct] = Struct(
+        "<I"
+        if kind is Magnet
+        else (
+            "<dddddd" + "".join(format for format, _ in _FIELDS.get(kind, ()))
+        ).replace("d", "f" if single else "d")
+    )
+    _structs[code, single] = result
+    return result
+
+
+def _unpack(
+    code: int, single: bool, view: memoryview, count: int, /
+) -> list[tuple[Any, ...]]:
+    """The values of count records of the given kind at the start of view, with enums decoded."""
+    struct: Final[Struct] = _struct(code, single)
+    records: Final[list[tuple[Any, ...]]] = list(
+        iter_unpack(struct.format, view[: count * struct.size])
+    )
+    kind: Final[type[BasePart]] = _KINDS[code]
+    decoders: Final[list[tuple[int, Callable[[Any], Any]]]] = [
+        (i, decoder)
+        for i, (_, decoder) in enumerate(_FIELDS.get(kind, ()), 6)
+        if decoder is not None
+    ]
+    if single and kind is not Magnet:
+        # Rounding to single precision can take a rotation just below 360 up to 360.
+        names: Final[tuple[str, ...]] = (*_POSITION_ROTATION, *kind._fields)
+        decoders.extend(
+            (names.index(name), _reduce_rotation)
+            for rotation in kind._rotations
+            for name in rotation
+        )
+    if decoders:
+        for r, record in enumerate(records):
+            values: list[Any] = list(record)
+            for i, decoder in decoders:
+                values[i] = decoder(values[i])
+            records[r] = tuple(values)
+    return records
+
+
+def _reduce_rotation(value: float, /) -> float:
+    return value % 360
+
+
+class PackedSlot(FileSlot):
+    """A stage in the compact binary format of this library, which the game cannot read.
+    The format starts with a header, followed by one section per part type present, each holding a fixed-width record per part.
+    Magnets and toy trains are followed by the records of their segments and tracks.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def deserialize(
+        data: ReadableBuffer, /, *, interner: Interner | None = None
+    ) -> Stage:
+        """If an interner is given, the stage is made of frozen parts shared with other stages loaded with it, as returned by Interner.intern_all."""
+        with memoryview(data) as view:
+            if len(view) < _HEADER.size:
+                raise ValueError("data is too short to be a packed stage")
+            magic, version, flags, edit_user, theme, tilt_lock, sections = (
+                _HEADER.unpack_from(view)
+            )
+            if magic != _MAGIC:
+                raise ValueError("data is not a packed stage")
+            if version > _VERSION:
+                raise ValueError(f"unsupported packed stage version {version}")
+            single: Final[bool] = bool(flags & _SINGLE)
+            parts: Final[list[BasePart]] = []
+            position: int = _HEADER.size
+            for _ in range(sections):
+                code, count = _SECTION.unpack_from(view, position)
+                position += _SECTION.size
+                kind: type[BasePart] = _KINDS[code]
+                records: list[tuple[Any, ...]] = _unpack(
+                    code, single, view[position:], count
+                )
+                position += count * _struct(code, single).size
+                if kind is Magnet or kind is ToyTrain:
+                    child_code: int = _kind_code(
+                        MagnetSegment if kind is Magnet else TrainTrack
+                    )
+                    children: list[tuple[Any, ...]] = _unpack(
+                        child_code,
+                        single,
+                        view[position:],
+                        sum(record[-1] for record in records),
+                    )
+                    position += len(children) * _struct(child_code, single).size
+                    start: int = 0
+                    for record in records:
+                        parts.append(
+                            kind._from_fields(  # type: ignore[call-arg]
+                                *record[:-1], children[start : start + record[-1]]
+                            )
+                        )
+                        start += record[-1]
+                else:
+                    parts.extend(kind._from_fields(*record) for record in records)
+        return Stage(
+            parts if interner is None else interner.intern_all(parts),
+            edit_user=EditUser(edit_user),
+            theme=Theme(theme),
+            tilt_lock=bool(tilt_lock),
+        )
+
+    @staticmethod
+    def serialize(stage: Stage, /, *, single: bool = False) -> bytes:
+        """When single is set, floating-point values are stored in single precision, which halves their size but loses precision."""
+        sections: Final[dict[int, list[BasePart]]] = {}
+        for part in stage:
+            sections.setdefault(_kind_code(type(part)), []).append(part)
+        output: Final[list[bytes]] = [
+            _HEADER.pack(
+                _MAGIC,
+                _VERSION,
+                _SINGLE if single else 0,
+                stage.edit_user.value,
+                stage.theme.value,
+                stage.tilt_lock,
+                len(sections),
+            )
+        ]
+        for code, parts in sorted(sections.items()):
+            output.append(_SECTION.pack(code, len(parts)))
+            pack: Callable[..., bytes] = _struct(code, single).pack
+            if isinstance(parts[0], Magnet):
+                output.extend(pack(len(part)) for part in parts)  # type: ignore[arg-type]
+            elif isinstance(parts[0], ToyTrain):
+                output.extend(
+                    pack(
+                        part.x_pos,
+                        part.y_pos,
+                        part.z_pos,
+                        part.x_rot,
+                        part.y_rot,
+                        part.z_rot,
+                        len(part),  # type: ignore[arg-type]
+                    )
+                    for part in parts
+                )
+            else:
+                output.extend(
+                    pack(
+                        part.x_pos,
+                        part.y_pos,
+                        part.z_pos,
+                        part.x_rot,
+                        part.y_rot,
+                        part.z_rot,
+                        *[_encode(getattr(part, name)) for name in part._fields],
+                    )
+                    for part in parts
+                )
+            if isinstance(parts[0], (Magnet, ToyTrain)):
+                child: BasePart
+                for part in parts:
+                    for child in part:  # type: ignore[attr-defined]
+                        output.append(
+                            _struct(_kind_code(type(child)), single).pack(
+                                child.x_pos,
+                                child.y_pos,
+                                child.z_pos,
+                                child.x_rot,
+                                child.y_rot,
+                                child.z_rot,
+                                _encode(child.shape),  # type: ignore[attr-defined]
+                            )
+                        )
+        return b"".join(output)
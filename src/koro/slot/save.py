@@ -1,4 +1,7 @@
-from collections.abc import Mapping, Sequence
+from asyncio import get_running_loop
+from collections.abc import Iterable, Mapping, Sequence
+from concurrent.futures import Executor
+from contextlib import contextmanager
 from enum import Enum, unique
 from io import BytesIO
 from operator import index as ix
@@ -7,15 +10,22 @@ from typing import (
     TYPE_CHECKING,
     Annotated,
     Any,
+    BinaryIO,
     Final,
+    Iterator,
     Literal,
     SupportsIndex,
     TypeAlias,
 )
 from warnings import warn
 
+try:
+    from fcntl import LOCK_EX, LOCK_SH, LOCK_UN, lockf
+except ImportError:  # not available on Windows
+    lockf = None  # type: ignore[assignment]
+
 from ..stage import Stage
-from . import Slot
+from . import Slot, _write_changes
 from .xml import XmlSlot
 
 if TYPE_CHECKING:
@@ -40,10 +50,24 @@ class EditorPage(Enum):
     HUDSON = 2
 
 
+def _create(path: str | bytes, /) -> bool:
+    """Create an empty save file at path, returning whether it did not exist."""
+    try:
+        with open(path, "xb") as f:
+            # Extend rather than write zeros so that a concurrent writer's slot is not overwritten
+            f.truncate(
+                638976
+            )  # Weird. Would expect this to be 627464 (8 + 4 * (_SIZE_LIMIT))
+        return True
+    except FileExistsError:
+        return False
+
+
 class SaveSlot(Slot):
     __match_args__ = ("path", "page", "index")
-    __slots__ = ("_offset", "_path")
+    __slots__ = ("_lock", "_offset", "_path")
 
+    _lock: bool
     _offset: Literal[8, 156872, 313736, 470600]
     _path: str | bytes
 
@@ -52,7 +76,17 @@ class SaveSlot(Slot):
         path: StrOrBytesPath,
         page: EditorPage,
         index: Annotated[SupportsIndex, SlotNumber],
+        *,
+        lock: bool = False,
     ) -> None:
+        """When lock is set, reads and writes take an advisory fcntl lock on this slot's region of the save file.
+        Readers and writers of different slots of the same file do not block each other.
+        For one slot, readers share the lock while they copy the region, which still blocks writers for that long, and a writer holds it exclusively until its changes are written, so readers never see a partly written stage.
+        These locks coordinate processes, not threads within one process.
+        """
+        if lock and lockf is None:
+            raise ValueError("locking is not supported on this platform")
+        self._lock = lock
         index = ix(index) - 1
         if index in range(20):
             if page == EditorPage.HUDSON and index in range(5):
@@ -65,6 +99,40 @@ class SaveSlot(Slot):
         else:
             raise ValueError("index must be between 1 and 20")
 
+    async def aload(
+        self,
+        /,
+        *,
+        cpu_executor: Executor | None = None,
+        io_executor: Executor | None = None,
+    ) -> Stage | None:
+        data: Final[bytes | None] = await get_running_loop().run_in_executor(
+            io_executor, self._read
+        )
+        if data is None:
+            return None
+        else:
+            return await get_running_loop().run_in_executor(
+                cpu_executor, XmlSlot.deserialize, data
+            )
+
+    async def asave(
+        self,
+        data: Stage | None,
+        /,
+        *,
+        cpu_executor: Executor | None = None,
+        io_executor: Executor | None = None,
+    ) -> None:
+        binary: Final[bytes] = (
+            b""
+            if data is None
+            else await get_running_loop().run_in_executor(
+                cpu_executor, self._serialize, data
+            )
+        )
+        await get_running_loop().run_in_executor(io_executor, self._write, binary)
+
     def __bool__(self) -> bool:
         try:
             with open(self._path, "rb") as f:
@@ -87,30 +155,23 @@ class SaveSlot(Slot):
         return (int(basename(self._path)[2:4]) % 5 >> 2 | self._offset // _SIZE_LIMIT) + 1  # type: ignore[return-value]
 
     def load(self) -> Stage | None:
-        try:
-            with open(self._path, "rb") as f:
-                f.seek(self._offset)
-                with BytesIO() as b:
-                    block: bytearray = bytearray()
-                    while True:
-                        block.clear()
-                        block.extend(f.read1(_SIZE_LIMIT - len(b.getbuffer())))
-                        if block and block[-1]:
-                            b.write(block)
-                        else:
-                            while block:
-                                if block[len(block) >> 1]:
-                                    b.write(block[: (len(block) >> 1) + 1])
-                                    del block[: (len(block) >> 1) + 1]
-                                else:
-                                    del block[len(block) >> 1 :]
-                            data: bytes = b.getvalue()
-                            if data:
-                                return XmlSlot.deserialize(data)
-                            else:
-                                return None
-        except FileNotFoundError:
-            return None
+        data: Final[bytes | None] = self._read()
+        return None if data is None else XmlSlot.deserialize(data)
+
+    @property
+    def lock(self) -> bool:
+        return self._lock
+
+    @contextmanager
+    def _locked(self, f: BinaryIO, /, *, exclusive: bool) -> Iterator[None]:
+        if self._lock:
+            lockf(f, LOCK_EX if exclusive else LOCK_SH, _SIZE_LIMIT, self._offset)
+            try:
+                yield
+            finally:
+                lockf(f, LOCK_UN, _SIZE_LIMIT, self._offset)
+        else:
+            yield
 
     @property
     def page(self) -> EditorPage:
@@ -120,26 +181,102 @@ class SaveSlot(Slot):
     def path(self) -> StrOrBytesPath:
         return dirname(self._path)
 
+    def _read(self) -> bytes | None:
+        try:
+            with open(self._path, "rb") as f, self._locked(f, exclusive=False):
+                # Only copy the slot under the lock, so that writers wait as briefly as possible
+                f.seek(self._offset)
+                block: Final[bytearray] = bytearray(f.read(_SIZE_LIMIT))
+        except FileNotFoundError:
+            return None
+        if block and block[-1]:
+            return bytes(block)
+        with BytesIO() as b:
+            while block:
+                if block[len(block) >> 1]:
+                    b.write(block[: (len(block) >> 1) + 1])
+                    del block[: (len(block) >> 1) + 1]
+                else:
+                    del block[len(block) >> 1 :]
+            return b.getvalue() or None
+
     def __repr__(self) -> str:
-        return f"{type(self).__name__}({self.path!r}, {self.page!r}, {self.index!r})"
+        return (
+            f"{type(self).__name__}({self.path!r}, {self.page!r}, {self.index!r}, lock=True)"
+            if self.lock
+            else f"{type(self).__name__}({self.path!r}, {self.page!r}, {self.index!r})"
+        )
 
     def save(self, data: Stage | None) -> None:
-        binary: bytes = b"" if data is None else XmlSlot.serialize(data)
+        self._write(self._serialize(data))
+
+    @staticmethod
+    def save_many(
+        items: Iterable[tuple["SaveSlot", Stage | None]],
+        /,
+        *,
+        executor: Executor | None = None,
+    ) -> None:
+        """Save each stage to its slot, as write_many does.
+        Every stage is serialized before anything is written, in parallel if an executor is given, so a stage that is too large leaves all files untouched.
+        """
+        slots: Final[list[SaveSlot]] = []
+        stages: Final[list[Stage | None]] = []
+        for slot, stage in items:
+            slots.append(slot)
+            stages.append(stage)
+        SaveSlot.write_many(
+            zip(
+                slots,
+                (map if executor is None else executor.map)(
+                    SaveSlot._serialize, stages
+                ),
+            )
+        )
+
+    @staticmethod
+    def _serialize(data: Stage | None, /) -> bytes:
+        binary: Final[bytes] = b"" if data is None else XmlSlot.serialize(data)
         if len(binary) > _SIZE_LIMIT:
             raise ValueError("serialized stage data is too large to save")
-        try:
-            with open(self._path, "xb") as f:
-                f.write(
-                    bytes(638976)
-                )  # Weird. Would expect this to be 627464 (8 + 4 * (_SIZE_LIMIT))
-            if data is None:
-                return
-        except FileExistsError:
-            pass
-        with open(self._path, "r+b") as f:
+        return binary
+
+    def _write(self, binary: bytes, /) -> None:
+        if _create(self._path) and not binary:
+            return
+        with open(self._path, "r+b") as f, self._locked(f, exclusive=True):
             f.seek(self._offset)
-            f.write(binary)
-            f.write(bytes(_SIZE_LIMIT - len(binary)))
+            _write_changes(
+                f,
+                self._offset,
+                f.read(_SIZE_LIMIT),
+                binary + bytes(_SIZE_LIMIT - len(binary)),
+            )
+
+    @staticmethod
+    def write_many(items: Iterable[tuple["SaveSlot", bytes]], /) -> None:
+        """Write already serialized stage data, as produced by XmlSlot.serialize, to each slot, opening each save file only once.
+        Empty data clears a slot. Every item is checked before anything is written, so data that is too large leaves all files untouched.
+        Each slot is compared and written separately, under its own lock when locking is enabled, and slots whose contents would not change are not written.
+        If a slot is given more than once, the last data is written.
+        """
+        files: Final[dict[str | bytes, dict[SaveSlot, bytes]]] = {}
+        for slot, binary in items:
+            if len(binary) > _SIZE_LIMIT:
+                raise ValueError("serialized stage data is too large to save")
+            files.setdefault(slot._path, {})[slot] = binary
+        for path, writes in files.items():
+            _create(path)
+            with open(path, "r+b") as f:
+                for slot in sorted(writes, key=lambda slot: slot._offset):
+                    with slot._locked(f, exclusive=True):
+                        f.seek(slot._offset)
+                        _write_changes(
+                            f,
+                            slot._offset,
+                            f.read(_SIZE_LIMIT),
+                            writes[slot] + bytes(_SIZE_LIMIT - len(writes[slot])),
+                        )
 
 
 def get_slots(save: StrOrBytesPath, /) -> Mapping[EditorPage, Sequence[SaveSlot]]:
@@ -1,11 +1,14 @@
-from collections.abc import Iterator, Sequence
+from collections.abc import Callable, Iterable, Sequence
 from io import StringIO
-from itertools import chain
+from itertools import groupby
+from operator import itemgetter
 from os import SEEK_END
-from typing import Final
+from typing import TYPE_CHECKING, Any, Final
 from xml.etree.ElementTree import Element, ElementTree, fromstring
 
 from ..stage import EditUser, Stage, Theme
+from ..stage.frozen import Interner
+from ..stage.journal import Journal
 from ..stage.model import DecorationModel, DeviceModel, PartModel
 from ..stage.part import (
     Ant,
@@ -23,7 +26,6 @@ from ..stage.part import (
     GreenCrystal,
     KororinCapsule,
     Magnet,
-    MagnetSegment,
     MagnifyingGlass,
     MelodyTile,
     MovementTiming,
@@ -44,33 +46,226 @@ from ..stage.part import (
     Thorn,
     TimedDevice,
     ToyTrain,
-    TrainTrack,
     Turntable,
     UpsideDownBall,
     UpsideDownStageDevice,
     Walls,
     Warp,
+    _anmtype,
+    _base_type,
+    _canonical,
 )
 from .file import FileSlot
 
-__all__ = ["XmlSlot"]
+if TYPE_CHECKING:
+    from _typeshed import ReadableBuffer
+else:
+    ReadableBuffer = Any
+
+
+__all__ = ["XmlSlot", "XmlWriter"]
+
+
+def _canonical_order(
+    parts: Iterable[BasePart],
+    /,
+    key: Callable[[BasePart], tuple[Any, ...]] | None = None,
+) -> list[BasePart]:
+    """Sorts parts by class, then shape, then position and rotation.
+    Parts that tie are ordered by all of their values, which is slower but rarely needed.
+    """
+    keyed: Final[list[tuple[tuple[Any, ...], BasePart]]] = sorted(
+        ((_order_key(part) if key is None else key(part), part) for part in parts),
+        key=itemgetter(0),
+    )
+    result: Final[list[BasePart]] = []
+    for _, group in groupby(keyed, key=itemgetter(0)):
+        parts = [part for _, part in group]
+        if len(parts) > 1:
+            parts.sort(key=_canonical)
+        result.extend(parts)
+    return result
+
+
+def _device_data(device: BasePart, /) -> str:
+    if isinstance(device, ProgressMarker):
+        return f"<hook> {(device._progress - 1) // 2} 0 </hook>\n"
+    elif isinstance(device, MovingTile):
+        anmmov: Final[str] = (
+            f"<anmspd> {_minify(device.speed)} 0 </anmspd>\n<anmmov0> {_serialize_numbers(device.x_pos, device.y_pos, device.z_pos)} </anmmov0>\n<anmmov1> {_serialize_numbers(device.dest_x, device.dest_y, device.dest_z)} </anmmov1>"
+        )
+        if device.walls:
+            match device.shape:
+                case PartModel.Tile20x20:
+                    return f"<hook> {DeviceModel.MovingTile20x20Wall.value} {device.walls.value} </hook>\n{anmmov}\n"
+                case PartModel.TileA30x30:
+                    return f"<hook> {DeviceModel.MovingTile30x30Wall.value} {device.walls.value} </hook>\n{anmmov}\n"
+        return anmmov
+    else:
+        return ""
+
+
+def _fragment(part: BasePart, theme: Theme, /) -> tuple[str, ...]:
+    """The XML elements for part.
+    The elements of magnets, toy trains and warps are split where their group number goes, so that the pieces can be joined with it.
+    """
+    if isinstance(part, Magnet):
+        magnet_pieces: Final[list[str]] = [""]
+        for i, segment in enumerate(part):
+            magnet_pieces[
+                -1
+            ] += f'<EDIT_GIM_NORMAL>\n<model> "EGB_{theme.value:02}.bin" {segment.shape.value} </model>\n<pos> {_serialize_numbers(segment.x_pos, segment.y_pos, segment.z_pos)} </pos>\n<rot> {_serialize_numbers(segment.x_rot, segment.y_rot, segment.z_rot)} </rot>\n<sts> 7 </sts>\n<group> '
+            magnet_pieces.append(f" {i} </group>\n</EDIT_GIM_NORMAL>\n")
+        return tuple(magnet_pieces)
+    elif isinstance(part, ToyTrain):
+        train_pieces: Final[list[str]] = [
+            f'<EDIT_GIM_NORMAL>\n<model> "EGB_{theme.value:02}.bin" {DeviceModel.ToyTrain.value} </model>\n<pos> {_serialize_numbers(part.x_pos, part.y_pos, part.z_pos)} </pos>\n<rot> {_serialize_numbers(part.x_rot, part.y_rot, part.z_rot)} </rot>\n<sts> 7 </sts>\n<group> ',
+            " 0 </group>\n</EDIT_GIM_NORMAL>\n",
+        ]
+        for i, track in enumerate(part, 1):
+            train_pieces[
+                -1
+            ] += f'<EDIT_GIM_NORMAL>\n<model> "EGB_{theme.value:02}.bin" {track.shape.value} </model>\n<pos> {_serialize_numbers(track.x_pos, track.y_pos, track.z_pos)} </pos>\n<rot> {_serialize_numbers(track.x_rot, track.y_rot, track.z_rot)} </rot>\n<sts> 7 </sts>\n<group> '
+            train_pieces.append(f" {i} </group>\n</EDIT_GIM_NORMAL>\n")
+        return tuple(train_pieces)
+    elif isinstance(part, Warp):
+        return (
+            f'<EDIT_GIM_NORMAL>\n<model> "EGB_{theme.value:02}.bin" {DeviceModel.Warp.value} </model>\n<pos> {_serialize_numbers(part.x_pos, part.y_pos, part.z_pos)} </pos>\n<rot> {_serialize_numbers(part.x_rot, part.y_rot, part.z_rot)} </rot>\n<sts> 7 </sts>\n<anmmov0> {_serialize_numbers(part.dest_x, part.dest_y, part.dest_z)} </anmmov0>\n<group> ',
+            f' 0 </group>\n</EDIT_GIM_NORMAL>\n<EDIT_GIM_NORMAL>\n<model> "EGB_{theme.value:02}.bin" {DeviceModel.Warp.value} </model>\n<pos> {_serialize_numbers(part.return_x_pos, part.return_y_pos, part.return_z_pos)} </pos>\n<rot> {_serialize_numbers(part.return_x_rot, part.return_y_rot, part.return_z_rot)} </rot>\n<sts> 7 </sts>\n<anmmov0> {_serialize_numbers(part.return_dest_x, part.return_dest_y, part.return_dest_z)} </anmmov0>\n<group> ',
+            " 1 </group>\n</EDIT_GIM_NORMAL>\n",
+        )
+    else:
+        with StringIO() as output:
+            if isinstance(part, Start):
+                output.write("<EDIT_GIM_START>\n")
+            elif isinstance(part, Goal):
+                output.write("<EDIT_GIM_GOAL>\n")
+            elif isinstance(part, Part):
+                if isinstance(part.shape, DecorationModel):
+                    output.write("<EDIT_MAP_EXT>\n")
+                else:
+                    output.write("<EDIT_MAP_NORMAL>\n")
+            else:
+                output.write("<EDIT_GIM_NORMAL>\n")
+            if isinstance(part, Part):
+                if isinstance(part.shape, DecorationModel):
+                    output.write(
+                        f'<model> "EME_{theme.value:02}.bin" {part.shape.value} </model>\n'
+                    )
+                else:
+                    output.write(
+                        f'<model> "EMB_{theme.value:02}.bin" {part.shape.value} </model>\n'
+                    )
+            elif isinstance(part, Start):
+                output.write(f'<model> "EGB_{theme.value:02}.bin" 0 </model>\n')
+            elif isinstance(part, Goal):
+                output.write(f'<model> "EGB_{theme.value:02}.bin" 1 </model>\n')
+            else:
+                output.write(
+                    f'<model> "EGB_{theme.value:02}.bin" {_anmtype(part).value} </model>\n'
+                )
+            output.write(
+                f"<pos> {_serialize_numbers(part.x_pos, part.y_pos, part.z_pos)} </pos>\n<rot> {_serialize_numbers(part.x_rot, part.y_rot, part.z_rot)} </rot>\n<sts> {_sts(part)} </sts>\n"
+            )
+            try:
+                output.write(f"<anmtype> {_anmtype(part).value} </anmtype>\n")
+            except ValueError:
+                pass
+            output.write(_device_data(part))
+            if isinstance(part, Start):
+                output.write("</EDIT_GIM_START>\n")
+            elif isinstance(part, Goal):
+                output.write("</EDIT_GIM_GOAL>\n")
+            elif isinstance(part, Part):
+                if isinstance(part.shape, DecorationModel):
+                    output.write("</EDIT_MAP_EXT>\n")
+                else:
+                    output.write("</EDIT_MAP_NORMAL>\n")
+            else:
+                output.write("</EDIT_GIM_NORMAL>\n")
+            return (output.getvalue(),)
+
+
+def _minify(value: float, /) -> str:
+    """Removes the decimal point from floats representing integers."""
+    return str(int(value) if value.is_integer() else value)
+
+
+def _order_key(part: BasePart, /) -> tuple[Any, ...]:
+    shape: Final = getattr(part, "shape", None)
+    try:
+        return (
+            _base_type(part).__name__,
+            "" if shape is None else type(shape).__name__,
+            -1 if shape is None else shape.value,
+            part.x_pos,
+            part.y_pos,
+            part.z_pos,
+            part.x_rot,
+            part.y_rot,
+            part.z_rot,
+        )
+    except IndexError:
+        # Empty magnets do not have a position.
+        return (_base_type(part).__name__,)
+
+
+def _serialize(
+    stage: Stage,
+    parts: Iterable[BasePart],
+    fragment: Callable[[BasePart], tuple[str, ...]],
+    /,
+) -> bytes:
+    """Write the metadata of stage and the fragments of parts, numbering the groups of magnets, toy trains and warps in order."""
+    with StringIO(
+        f'<?xml version="1.0" encoding="SHIFT_JIS"?>\n<EDITINFO>\n<THEME> {stage.theme.value} </THEME>\n<LOCK> {int(stage.tilt_lock)} </LOCK>\n<EDITUSER> {stage.edit_user.value} </EDITUSER>\n</EDITINFO>\n<STAGEDATA>\n<EDIT_BG_NORMAL>\n<model> "EBB_{stage.theme.value:02}.bin 0 </model>\n</EDIT_BG_NORMAL>\n'
+    ) as output:
+        output.seek(0, SEEK_END)
+        group: int = 1
+        for part in parts:
+            if isinstance(part, (Magnet, ToyTrain, Warp)):
+                output.write(str(group).join(fragment(part)))
+                group += 1
+            else:
+                output.write(fragment(part)[0])
+        output.write("</STAGEDATA>")
+        return output.getvalue().encode("shift_jis", "xmlcharrefreplace")
+
+
+def _serialize_numbers(*values: float) -> str:
+    """Does not include leading or trailing spaces."""
+    return " ".join(_minify(value) for value in values)
+
+
+def _sts(part: BasePart, /) -> int:
+    if isinstance(part, FixedSpeedDevice):
+        return part.speed.value
+    elif isinstance(part, ConveyorBelt):
+        return 39 if part.reversing else 23
+    elif isinstance(part, TimedDevice):
+        return part.timing.value
+    else:
+        return 7
 
 
 class XmlSlot(FileSlot):
     __slots__ = ()
 
     @staticmethod
-    def deserialize(data: bytes | str | ElementTree | Element) -> Stage:
-        """Behavior is undefined when passed invalid stage data"""
-        if isinstance(data, (bytes, bytearray, memoryview)):
-            data = (
-                bytes(data)
-                .decode("shift_jis", "xmlcharrefreplace")
-                .replace(
-                    '<?xml version="1.0" encoding="SHIFT_JIS"?>',
-                    '<?xml version="1.0"?>',
-                    1,
-                )
+    def deserialize(
+        data: ReadableBuffer | str | ElementTree | Element,
+        *,
+        interner: Interner | None = None,
+    ) -> Stage:
+        """Behavior is undefined when passed invalid stage data
+        Any object supporting the buffer protocol is decoded in place, without copying it to bytes first.
+        If an interner is given, the stage is made of frozen parts shared with other stages loaded with it, as returned by Interner.intern_all.
+        """
+        if not isinstance(data, (str, ElementTree, Element)):
+            data = str(data, "shift_jis", "xmlcharrefreplace").replace(
+                '<?xml version="1.0" encoding="SHIFT_JIS"?>',
+                '<?xml version="1.0"?>',
+                1,
             )
         if isinstance(data, str):
             data = fromstring(
@@ -85,90 +280,85 @@ class XmlSlot(FileSlot):
         def get_values(element: Element, /, tag: str) -> Sequence[str]:
             return element.find(tag).text.strip().split()  # type: ignore[union-attr]
 
-        def get_pos_rot(element: Element, /) -> Iterator[float]:
-            return chain(
-                map(float, get_values(element, "pos")),
-                map(float, get_values(element, "rot")),
+        def get_point(element: Element, /, tag: str) -> tuple[float, float, float]:
+            x, y, z = get_values(element, tag)
+            return float(x), float(y), float(z)
+
+        def get_pos_rot(
+            element: Element, /
+        ) -> tuple[float, float, float, float, float, float]:
+            # Parts are created with _from_fields, which does not reduce rotations to [0, 360) itself.
+            x_rot, y_rot, z_rot = get_point(element, "rot")
+            return (
+                *get_point(element, "pos"),
+                x_rot % 360,
+                y_rot % 360,
+                z_rot % 360,
             )
 
         root: Final[Element] = data
         editinfo: Final[Element] = root.find("EDITINFO")  # type: ignore[assignment]
-        output: Final[Stage] = Stage(
-            (),
-            edit_user=(
-                EditUser.PROTECTED
-                if editinfo.find("EDITUSER") is None
-                else EditUser(int(editinfo.find("EDITUSER").text.strip()))  # type: ignore[union-attr]
-            ),
-            theme=Theme(int(editinfo.find("THEME").text.strip())),  # type: ignore[union-attr]
-            tilt_lock=False if editinfo.find("LOCK") is None else bool(int(editinfo.find("LOCK").text.strip())),  # type: ignore[union-attr]
-        )
+        parts: Final[list[BasePart]] = []
+        add: Final[Callable[[BasePart], None]] = parts.append
         groups: Final[dict[int, dict[int, Element]]] = {}
         for elem in root.find("STAGEDATA") or ():
             match elem.tag:
                 case "EDIT_LIGHT" | "EDIT_BG_NORMAL":
                     continue
                 case "EDIT_MAP_NORMAL":
-                    output.add(
-                        Part(
+                    add(
+                        Part._from_fields(
                             *get_pos_rot(elem),
-                            shape=PartModel(int(get_values(elem, "model")[1])),
+                            PartModel(int(get_values(elem, "model")[1])),
                         )
                     )
                 case "EDIT_MAP_EXT":
-                    output.add(
-                        Part(
+                    add(
+                        Part._from_fields(
                             *get_pos_rot(elem),
-                            shape=DecorationModel(int(get_values(elem, "model")[1])),
+                            DecorationModel(int(get_values(elem, "model")[1])),
                         )
                     )
                 case "EDIT_GIM_START":
-                    output.add(Start(*get_pos_rot(elem)))
+                    add(Start._from_fields(*get_pos_rot(elem)))
                 case "EDIT_GIM_GOAL":
-                    output.add(Goal(*get_pos_rot(elem)))
+                    add(Goal._from_fields(*get_pos_rot(elem)))
                 case "EDIT_GIM_NORMAL":
                     match DeviceModel(int(get_values(elem, "model")[1])):
                         case DeviceModel.Crystal:
-                            output.add(
-                                ProgressMarker(
+                            add(
+                                ProgressMarker._from_fields(
                                     *get_pos_rot(elem),
-                                    progress=int(get_values(elem, "hook")[0]) * 2 + 1,  # type: ignore[arg-type]
+                                    int(get_values(elem, "hook")[0]) * 2 + 1,  # type: ignore[arg-type]
                                 )
                             )
                         case DeviceModel.Respawn:
-                            output.add(
-                                ProgressMarker(
+                            add(
+                                ProgressMarker._from_fields(
                                     *get_pos_rot(elem),
-                                    progress=int(get_values(elem, "hook")[0]) * 2 + 2,  # type: ignore[arg-type]
+                                    int(get_values(elem, "hook")[0]) * 2 + 2,  # type: ignore[arg-type]
                                 )
                             )
                         case DeviceModel.MovingTile10x10:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.Tile10x10,
-                                    speed=float(get_values(elem, "anmspd")[0]),
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.Tile10x10,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    False,
+                                    Walls(0),
                                 )
                             )
                         case DeviceModel.MovingTile20x20:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.Tile20x20,
-                                    speed=float(get_values(elem, "anmspd")[0]),
-                                    walls=(
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.Tile20x20,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    False,
+                                    (
                                         Walls(0)
                                         if elem.find("hook") is None
                                         else Walls(int(get_values(elem, "hook")[1]))
@@ -176,18 +366,14 @@ class XmlSlot(FileSlot):
                                 )
                             )
                         case DeviceModel.MovingTile30x30:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.TileA30x30,
-                                    speed=float(get_values(elem, "anmspd")[0]),
-                                    walls=(
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.TileA30x30,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    False,
+                                    (
                                         Walls(0)
                                         if elem.find("hook") is None
                                         else Walls(int(get_values(elem, "hook")[1]))
@@ -195,76 +381,58 @@ class XmlSlot(FileSlot):
                                 )
                             )
                         case DeviceModel.MovingTile30x90:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.TileA30x90,
-                                    speed=float(get_values(elem, "anmspd")[0]),
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.TileA30x90,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    False,
+                                    Walls(0),
                                 )
                             )
                         case DeviceModel.MovingTile90x90A:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.Tile90x90,
-                                    speed=float(get_values(elem, "anmspd")[0]),
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.Tile90x90,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    False,
+                                    Walls(0),
                                 )
                             )
                         case DeviceModel.MovingTile90x90B:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.HoleB90x90,
-                                    speed=float(get_values(elem, "anmspd")[0]),
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.HoleB90x90,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    False,
+                                    Walls(0),
                                 )
                             )
                         case DeviceModel.MovingTile10x10Switch:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.Tile10x10,
-                                    speed=float(get_values(elem, "anmspd")[0]),
-                                    switch=True,
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.Tile10x10,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    True,
+                                    Walls(0),
                                 )
                             )
                         case DeviceModel.MovingTile20x20Switch:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.Tile20x20,
-                                    speed=float(get_values(elem, "anmspd")[0]),
-                                    switch=True,
-                                    walls=(
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.Tile20x20,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    True,
+                                    (
                                         Walls(0)
                                         if elem.find("hook") is None
                                         else Walls(int(get_values(elem, "hook")[1]))
@@ -272,19 +440,14 @@ class XmlSlot(FileSlot):
                                 )
                             )
                         case DeviceModel.MovingTile30x30Switch:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.TileA30x30,
-                                    speed=float(get_values(elem, "anmspd")[0]),
-                                    switch=True,
-                                    walls=(
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.TileA30x30,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    True,
+                                    (
                                         Walls(0)
                                         if elem.find("hook") is None
                                         else Walls(int(get_values(elem, "hook")[1]))
@@ -292,253 +455,217 @@ class XmlSlot(FileSlot):
                                 )
                             )
                         case DeviceModel.MovingTile30x90Switch:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.TileA30x90,
-                                    speed=float(get_values(elem, "anmspd")[0]),
-                                    switch=True,
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.TileA30x90,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    True,
+                                    Walls(0),
                                 )
                             )
                         case DeviceModel.MovingTile90x90ASwitch:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.Tile90x90,
-                                    speed=float(get_values(elem, "anmspd")[0]),
-                                    switch=True,
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.Tile90x90,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    True,
+                                    Walls(0),
                                 )
                             )
                         case DeviceModel.MovingTile90x90BSwitch:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.HoleB90x90,
-                                    speed=float(get_values(elem, "anmspd")[0]),
-                                    switch=True,
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.HoleB90x90,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    True,
+                                    Walls(0),
                                 )
                             )
                         case DeviceModel.MovingFunnelPipe:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.FunnelPipe,
-                                    speed=float(get_values(elem, "anmspd")[0]),
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.FunnelPipe,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    False,
+                                    Walls(0),
                                 )
                             )
                         case DeviceModel.MovingStraightPipe:
-                            output.add(
-                                MovingTile(
+                            add(
+                                MovingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    **dict(
-                                        zip(
-                                            ("dest_x", "dest_y", "dest_z"),
-                                            map(float, get_values(elem, "anmmov1")),
-                                        )
-                                    ),  # type: ignore[arg-type]
-                                    shape=PartModel.StraightPipe,
-                                    speed=float(get_values(elem, "anmspd")[0]),
+                                    *get_point(elem, "anmmov1"),
+                                    PartModel.StraightPipe,
+                                    float(get_values(elem, "anmspd")[0]),
+                                    False,
+                                    Walls(0),
                                 )
                             )
                         case DeviceModel.MovingCurveS:
-                            output.add(
-                                MovingCurve(
+                            add(
+                                MovingCurve._from_fields(
                                     *get_pos_rot(elem),
-                                    shape=PartModel.CurveS,
-                                    speed=Speed(int(get_values(elem, "sts")[0])),
+                                    PartModel.CurveS,
+                                    Speed(int(get_values(elem, "sts")[0])),
                                 )
                             )
                         case DeviceModel.MovingCurveM:
-                            output.add(
-                                MovingCurve(
+                            add(
+                                MovingCurve._from_fields(
                                     *get_pos_rot(elem),
-                                    shape=PartModel.CurveM,
-                                    speed=Speed(int(get_values(elem, "sts")[0])),
+                                    PartModel.CurveM,
+                                    Speed(int(get_values(elem, "sts")[0])),
                                 )
                             )
                         case DeviceModel.MovingCurveL:
-                            output.add(
-                                MovingCurve(
+                            add(
+                                MovingCurve._from_fields(
                                     *get_pos_rot(elem),
-                                    shape=PartModel.CurveL,
-                                    speed=Speed(int(get_values(elem, "sts")[0])),
+                                    PartModel.CurveL,
+                                    Speed(int(get_values(elem, "sts")[0])),
                                 )
                             )
                         case DeviceModel.SlidingTile:
-                            output.add(SlidingTile(*get_pos_rot(elem)))
+                            add(SlidingTile._from_fields(*get_pos_rot(elem)))
                         case DeviceModel.ConveyorBelt:
-                            output.add(
-                                ConveyorBelt(
+                            add(
+                                ConveyorBelt._from_fields(
                                     *get_pos_rot(elem),
-                                    reversing=get_values(elem, "sts")[0] == "39",
+                                    get_values(elem, "sts")[0] == "39",
                                 )
                             )
                         case DeviceModel.DashTunnelA:
-                            output.add(
-                                DashTunnel(
-                                    *get_pos_rot(elem),
-                                    shape=DeviceModel.DashTunnelA,
+                            add(
+                                DashTunnel._from_fields(
+                                    *get_pos_rot(elem), DeviceModel.DashTunnelA
                                 )
                             )
                         case DeviceModel.DashTunnelB:
-                            output.add(
-                                DashTunnel(
-                                    *get_pos_rot(elem),
-                                    shape=DeviceModel.DashTunnelB,
+                            add(
+                                DashTunnel._from_fields(
+                                    *get_pos_rot(elem), DeviceModel.DashTunnelB
                                 )
                             )
                         case DeviceModel.SeesawLBlock:
-                            output.add(
-                                SeesawBlock(
-                                    *get_pos_rot(elem),
-                                    shape=DeviceModel.SeesawLBlock,
+                            add(
+                                SeesawBlock._from_fields(
+                                    *get_pos_rot(elem), False, DeviceModel.SeesawLBlock
                                 )
                             )
                         case DeviceModel.SeesawIBlock:
-                            output.add(
-                                SeesawBlock(
-                                    *get_pos_rot(elem),
-                                    shape=DeviceModel.SeesawIBlock,
+                            add(
+                                SeesawBlock._from_fields(
+                                    *get_pos_rot(elem), False, DeviceModel.SeesawIBlock
                                 )
                             )
                         case DeviceModel.AutoSeesawLBlock:
-                            output.add(
-                                SeesawBlock(
-                                    *get_pos_rot(elem),
-                                    auto=True,
-                                    shape=DeviceModel.SeesawLBlock,
+                            add(
+                                SeesawBlock._from_fields(
+                                    *get_pos_rot(elem), True, DeviceModel.SeesawLBlock
                                 )
                             )
                         case DeviceModel.AutoSeesawIBlock:
-                            output.add(
-                                SeesawBlock(
-                                    *get_pos_rot(elem),
-                                    auto=True,
-                                    shape=DeviceModel.SeesawIBlock,
+                            add(
+                                SeesawBlock._from_fields(
+                                    *get_pos_rot(elem), True, DeviceModel.SeesawIBlock
                                 )
                             )
                         case DeviceModel.Cannon:
-                            output.add(Cannon(*get_pos_rot(elem)))
+                            add(Cannon._from_fields(*get_pos_rot(elem)))
                         case DeviceModel.Drawbridge:
-                            output.add(Drawbridge(*get_pos_rot(elem)))
+                            add(Drawbridge._from_fields(*get_pos_rot(elem)))
                         case DeviceModel.Turntable:
-                            output.add(
-                                Turntable(
+                            add(
+                                Turntable._from_fields(
                                     *get_pos_rot(elem),
-                                    speed=Speed(int(get_values(elem, "sts")[0])),
+                                    Speed(int(get_values(elem, "sts")[0])),
                                 )
                             )
                         case DeviceModel.Bumper:
-                            output.add(Bumper(*get_pos_rot(elem)))
+                            add(Bumper._from_fields(*get_pos_rot(elem), False))
                         case DeviceModel.PowerfulBumper:
-                            output.add(Bumper(*get_pos_rot(elem), powerful=True))
+                            add(Bumper._from_fields(*get_pos_rot(elem), True))
                         case DeviceModel.Thorn:
-                            output.add(Thorn(*get_pos_rot(elem)))
+                            add(Thorn._from_fields(*get_pos_rot(elem)))
                         case DeviceModel.Gear:
-                            output.add(
-                                Gear(
+                            add(
+                                Gear._from_fields(
                                     *get_pos_rot(elem),
-                                    speed=Speed(int(get_values(elem, "sts")[0])),
+                                    Speed(int(get_values(elem, "sts")[0])),
                                 )
                             )
                         case DeviceModel.Fan:
-                            output.add(Fan(*get_pos_rot(elem)))
+                            add(Fan._from_fields(*get_pos_rot(elem), DeviceModel.Fan))
                         case DeviceModel.PowerfulFan:
-                            output.add(
-                                Fan(
-                                    *get_pos_rot(elem),
-                                    wind_pattern=DeviceModel.PowerfulFan,
+                            add(
+                                Fan._from_fields(
+                                    *get_pos_rot(elem), DeviceModel.PowerfulFan
                                 )
                             )
                         case DeviceModel.TimerFan:
-                            output.add(
-                                Fan(
-                                    *get_pos_rot(elem),
-                                    wind_pattern=DeviceModel.TimerFan,
+                            add(
+                                Fan._from_fields(
+                                    *get_pos_rot(elem), DeviceModel.TimerFan
                                 )
                             )
                         case DeviceModel.Spring:
-                            output.add(Spring(*get_pos_rot(elem)))
+                            add(Spring._from_fields(*get_pos_rot(elem)))
                         case DeviceModel.Punch:
-                            output.add(
-                                Punch(
+                            add(
+                                Punch._from_fields(
                                     *get_pos_rot(elem),
-                                    timing=MovementTiming(
-                                        int(get_values(elem, "sts")[0])
-                                    ),
+                                    MovementTiming(int(get_values(elem, "sts")[0])),
                                 )
                             )
                         case DeviceModel.Press:
-                            output.add(
-                                Press(
+                            add(
+                                Press._from_fields(
                                     *get_pos_rot(elem),
-                                    timing=MovementTiming(
-                                        int(get_values(elem, "sts")[0])
-                                    ),
+                                    MovementTiming(int(get_values(elem, "sts")[0])),
                                 )
                             )
                         case DeviceModel.Scissors:
-                            output.add(
-                                Scissors(
+                            add(
+                                Scissors._from_fields(
                                     *get_pos_rot(elem),
-                                    timing=MovementTiming(
-                                        int(get_values(elem, "sts")[0])
-                                    ),
+                                    MovementTiming(int(get_values(elem, "sts")[0])),
                                 )
                             )
                         case DeviceModel.MagnifyingGlass:
-                            output.add(MagnifyingGlass(*get_pos_rot(elem)))
+                            add(MagnifyingGlass._from_fields(*get_pos_rot(elem)))
                         case DeviceModel.UpsideDownStageDevice:
-                            output.add(UpsideDownStageDevice(*get_pos_rot(elem)))
+                            add(UpsideDownStageDevice._from_fields(*get_pos_rot(elem)))
                         case DeviceModel.UpsideDownBall:
-                            output.add(UpsideDownBall(*get_pos_rot(elem)))
+                            add(UpsideDownBall._from_fields(*get_pos_rot(elem)))
                         case DeviceModel.SmallTunnel:
-                            output.add(
-                                SizeTunnel(
-                                    *get_pos_rot(elem), size=DeviceModel.SmallTunnel
+                            add(
+                                SizeTunnel._from_fields(
+                                    *get_pos_rot(elem), DeviceModel.SmallTunnel
                                 )
                             )
                         case DeviceModel.BigTunnel:
-                            output.add(
-                                SizeTunnel(
-                                    *get_pos_rot(elem), size=DeviceModel.BigTunnel
+                            add(
+                                SizeTunnel._from_fields(
+                                    *get_pos_rot(elem), DeviceModel.BigTunnel
                                 )
                             )
                         case DeviceModel.BlinkingTile:
-                            output.add(
-                                BlinkingTile(
+                            add(
+                                BlinkingTile._from_fields(
                                     *get_pos_rot(elem),
-                                    timing=MovementTiming(
-                                        int(get_values(elem, "sts")[0])
-                                    ),
+                                    MovementTiming(int(get_values(elem, "sts")[0])),
                                 )
                             )
                         case DeviceModel.CubicTextBox:
-                            output.add(
+                            add(
                                 TextBox(
                                     *get_pos_rot(elem),
                                     shape=DeviceModel.CubicTextBox,
@@ -546,7 +673,7 @@ class XmlSlot(FileSlot):
                                 )
                             )
                         case DeviceModel.WallTextBox:
-                            output.add(
+                            add(
                                 TextBox(
                                     *get_pos_rot(elem),
                                     shape=DeviceModel.WallTextBox,
@@ -554,13 +681,13 @@ class XmlSlot(FileSlot):
                                 )
                             )
                         case DeviceModel.KororinCapsule:
-                            output.add(KororinCapsule(*get_pos_rot(elem)))
+                            add(KororinCapsule._from_fields(*get_pos_rot(elem)))
                         case DeviceModel.GreenCrystal:
-                            output.add(GreenCrystal(*get_pos_rot(elem)))
+                            add(GreenCrystal._from_fields(*get_pos_rot(elem)))
                         case DeviceModel.Ant:
-                            output.add(Ant(*get_pos_rot(elem)))
+                            add(Ant._from_fields(*get_pos_rot(elem)))
                         case model if model.name.startswith("MelodyTile"):
-                            output.add(MelodyTile(*get_pos_rot(elem), note=model))  # type: ignore[arg-type]
+                            add(MelodyTile._from_fields(*get_pos_rot(elem), model))  # type: ignore[arg-type]
                         case _:
                             groups.setdefault(int(get_values(elem, "group")[0]), {})[
                                 int(get_values(elem, "group")[1])
@@ -568,291 +695,150 @@ class XmlSlot(FileSlot):
         for group in groups.values():
             match DeviceModel(int(get_values(group[0], "model")[1])):
                 case DeviceModel.EndMagnet:
-                    m: Magnet = Magnet()
-                    for _, elem in sorted(group.items()):
-                        m.append(
-                            MagnetSegment(
+                    add(
+                        Magnet._from_fields(
+                            (
                                 *get_pos_rot(elem),
-                                shape=DeviceModel(int(get_values(elem, "model")[1])),  # type: ignore[arg-type]
+                                DeviceModel(int(get_values(elem, "model")[1])),
                             )
+                            for _, elem in sorted(group.items())
                         )
-                    output.add(m)
+                    )
                 case DeviceModel.ToyTrain:
-                    t: ToyTrain = ToyTrain(*get_pos_rot(group[0]))
-                    for i, elem in sorted(group.items()):
-                        if i:
-                            t.append(
-                                TrainTrack(
-                                    *get_pos_rot(elem),
-                                    shape=DeviceModel(int(get_values(elem, "model")[1])),  # type: ignore[arg-type]
-                                )
-                            )
-                    output.add(t)
-                case DeviceModel.Warp:
-                    output.add(
-                        Warp(
+                    add(
+                        ToyTrain._from_fields(
                             *get_pos_rot(group[0]),
-                            **dict(
-                                zip(
-                                    ("dest_x", "dest_y", "dest_z"),
-                                    map(float, get_values(group[0], "anmmov0")),
-                                )
-                            ),
-                            **dict(
-                                zip(
-                                    (
-                                        "return_x_pos",
-                                        "return_y_pos",
-                                        "return_z_pos",
-                                        "return_x_rot",
-                                        "return_y_rot",
-                                        "return_z_rot",
-                                    ),
-                                    get_pos_rot(group[1]),
-                                    strict=True,
-                                )
-                            ),
-                            **dict(
-                                zip(
-                                    ("return_dest_x", "return_dest_y", "return_dest_z"),
-                                    map(float, get_values(group[1], "anmmov0")),
+                            (
+                                (
+                                    *get_pos_rot(elem),
+                                    DeviceModel(int(get_values(elem, "model")[1])),
                                 )
+                                for i, elem in sorted(group.items())
+                                if i
                             ),
-                        )  # type: ignore[misc]
-                    )
-        return output
-
-    @staticmethod
-    def serialize(stage: Stage, /) -> bytes:
-        def minify(value: float, /) -> str:
-            """Removes the decimal point from floats representing integers."""
-            return str(int(value) if value.is_integer() else value)
-
-        def serialize_numbers(*values: float) -> str:
-            """Does not include leading or trailing spaces."""
-            return " ".join(minify(value) for value in values)
-
-        def anmtype(device: BasePart, /) -> DeviceModel:
-            if isinstance(device, ProgressMarker):
-                return (
-                    DeviceModel.Crystal if device.progress % 2 else DeviceModel.Respawn
-                )
-            elif isinstance(device, MovingTile):
-                match device.shape:
-                    case PartModel.Tile10x10:
-                        return (
-                            DeviceModel.MovingTile10x10Switch
-                            if device.switch
-                            else DeviceModel.MovingTile10x10
-                        )
-                    case PartModel.Tile20x20:
-                        return (
-                            DeviceModel.MovingTile20x20Switch
-                            if device.switch
-                            else DeviceModel.MovingTile20x20
-                        )
-                    case PartModel.TileA30x30:
-                        return (
-                            DeviceModel.MovingTile30x30Switch
-                            if device.switch
-                            else DeviceModel.MovingTile30x30
                         )
-                    case PartModel.TileA30x90:
-                        return (
-                            DeviceModel.MovingTile30x90Switch
-                            if device.switch
-                            else DeviceModel.MovingTile30x90
-                        )
-                    case PartModel.Tile90x90:
-                        return (
-                            DeviceModel.MovingTile90x90ASwitch
-                            if device.switch
-                            else DeviceModel.MovingTile90x90A
-                        )
-                    case PartModel.HoleB90x90:
-                        return (
-                            DeviceModel.MovingTile90x90BSwitch
-                            if device.switch
-                            else DeviceModel.MovingTile90x90B
-                        )
-                    case PartModel.FunnelPipe:
-                        return DeviceModel.MovingFunnelPipe
-                    case PartModel.StraightPipe:
-                        return DeviceModel.MovingStraightPipe
-            elif isinstance(device, MovingCurve):
-                match device.shape:
-                    case PartModel.CurveS:
-                        return DeviceModel.MovingCurveS
-                    case PartModel.CurveM:
-                        return DeviceModel.MovingCurveM
-                    case PartModel.CurveL:
-                        return DeviceModel.MovingCurveL
-            elif isinstance(device, SlidingTile):
-                return DeviceModel.SlidingTile
-            elif isinstance(device, ConveyorBelt):
-                return DeviceModel.ConveyorBelt
-            elif isinstance(device, (DashTunnel, TextBox)):
-                return device.shape
-            elif isinstance(device, SeesawBlock):
-                if device.auto:
-                    match device.shape:
-                        case DeviceModel.SeesawLBlock:
-                            return DeviceModel.AutoSeesawLBlock
-                        case DeviceModel.SeesawIBlock:
-                            return DeviceModel.AutoSeesawIBlock
-                else:
-                    return device.shape
-            elif isinstance(device, Cannon):
-                return DeviceModel.Cannon
-            elif isinstance(device, Drawbridge):
-                return DeviceModel.Drawbridge
-            elif isinstance(device, Turntable):
-                return DeviceModel.Turntable
-            elif isinstance(device, Bumper):
-                return (
-                    DeviceModel.PowerfulBumper
-                    if device.powerful
-                    else DeviceModel.Bumper
-                )
-            elif isinstance(device, Thorn):
-                return DeviceModel.Thorn
-            elif isinstance(device, Gear):
-                return DeviceModel.Gear
-            elif isinstance(device, Fan):
-                return device.wind_pattern
-            elif isinstance(device, Spring):
-                return DeviceModel.Spring
-            elif isinstance(device, Punch):
-                return DeviceModel.Punch
-            elif isinstance(device, Press):
-                return DeviceModel.Press
-            elif isinstance(device, Scissors):
-                return DeviceModel.Scissors
-            elif isinstance(device, MagnifyingGlass):
-                return DeviceModel.MagnifyingGlass
-            elif isinstance(device, UpsideDownStageDevice):
-                return DeviceModel.UpsideDownStageDevice
-            elif isinstance(device, UpsideDownBall):
-                return DeviceModel.UpsideDownBall
-            elif isinstance(device, SizeTunnel):
-                return device.size
-            elif isinstance(device, BlinkingTile):
-                return DeviceModel.BlinkingTile
-            elif isinstance(device, MelodyTile):
-                return device.note
-            elif isinstance(device, KororinCapsule):
-                return DeviceModel.KororinCapsule
-            elif isinstance(device, GreenCrystal):
-                return DeviceModel.GreenCrystal
-            elif isinstance(device, Ant):
-                return DeviceModel.Ant
-            else:
-                raise ValueError(f"part {device!r} does not have a known anmtype")
-
-        def device_data(device: BasePart, /) -> str:
-            if isinstance(device, ProgressMarker):
-                return f"<hook> {(device._progress - 1) // 2} 0 </hook>\n"
-            elif isinstance(device, MovingTile):
-                anmmov: Final[str] = (
-                    f"<anmspd> {minify(device.speed)} 0 </anmspd>\n<anmmov0> {serialize_numbers(device.x_pos, device.y_pos, device.z_pos)} </anmmov0>\n<anmmov1> {serialize_numbers(device.dest_x, device.dest_y, device.dest_z)} </anmmov1>"
-                )
-                if device.walls:
-                    match device.shape:
-                        case PartModel.Tile20x20:
-                            return f"<hook> {DeviceModel.MovingTile20x20Wall.value} {device.walls.value} </hook>\n{anmmov}\n"
-                        case PartModel.TileA30x30:
-                            return f"<hook> {DeviceModel.MovingTile30x30Wall.value} {device.walls.value} </hook>\n{anmmov}\n"
-                return anmmov
-            else:
-                return ""
-
-        def sts(part: BasePart, /) -> int:
-            if isinstance(part, FixedSpeedDevice):
-                return part.speed.value
-            elif isinstance(part, ConveyorBelt):
-                return 39 if part.reversing else 23
-            elif isinstance(part, TimedDevice):
-                return part.timing.value
-            else:
-                return 7
-
-        with StringIO(
-            f'<?xml version="1.0" encoding="SHIFT_JIS"?>\n<EDITINFO>\n<THEME> {stage.theme.value} </THEME>\n<LOCK> {int(stage.tilt_lock)} </LOCK>\n<EDITUSER> {stage.edit_user.value} </EDITUSER>\n</EDITINFO>\n<STAGEDATA>\n<EDIT_BG_NORMAL>\n<model> "EBB_{stage.theme.value:02}.bin 0 </model>\n</EDIT_BG_NORMAL>\n'
-        ) as output:
-            output.seek(0, SEEK_END)
-            group: int = 1
-            for part in stage:
-                if isinstance(part, Magnet):
-                    for i, segment in enumerate(part):
-                        output.write(
-                            f'<EDIT_GIM_NORMAL>\n<model> "EGB_{stage.theme.value:02}.bin" {segment.shape.value} </model>\n<pos> {serialize_numbers(segment.x_pos, segment.y_pos, segment.z_pos)} </pos>\n<rot> {serialize_numbers(segment.x_rot, segment.y_rot, segment.z_rot)} </rot>\n<sts> 7 </sts>\n<group> {group} {i} </group>\n</EDIT_GIM_NORMAL>\n'
-                        )
-                    group += 1
-                elif isinstance(part, ToyTrain):
-                    output.write(
-                        f'<EDIT_GIM_NORMAL>\n<model> "EGB_{stage.theme.value:02}.bin" {DeviceModel.ToyTrain.value} </model>\n<pos> {serialize_numbers(part.x_pos, part.y_pos, part.z_pos)} </pos>\n<rot> {serialize_numbers(part.x_rot, part.y_rot, part.z_rot)} </rot>\n<sts> 7 </sts>\n<group> {group} 0 </group>\n</EDIT_GIM_NORMAL>\n'
                     )
-                    for i, track in enumerate(part, 1):
-                        output.write(
-                            f'<EDIT_GIM_NORMAL>\n<model> "EGB_{stage.theme.value:02}.bin" {track.shape.value} </model>\n<pos> {serialize_numbers(track.x_pos, track.y_pos, track.z_pos)} </pos>\n<rot> {serialize_numbers(track.x_rot, track.y_rot, track.z_rot)} </rot>\n<sts> 7 </sts>\n<group> {group} {i} </group>\n</EDIT_GIM_NORMAL>\n'
-                        )
-                    group += 1
-                elif isinstance(part, Warp):
-                    output.write(
-                        f'<EDIT_GIM_NORMAL>\n<model> "EGB_{stage.theme.value:02}.bin" {DeviceModel.Warp.value} </model>\n<pos> {serialize_numbers(part.x_pos, part.y_pos, part.z_pos)} </pos>\n<rot> {serialize_numbers(part.x_rot, part.y_rot, part.z_rot)} </rot>\n<sts> 7 </sts>\n<anmmov0> {serialize_numbers(part.dest_x, part.dest_y, part.dest_z)} </anmmov0>\n<group> {group} 0 </group>\n</EDIT_GIM_NORMAL>\n<EDIT_GIM_NORMAL>\n<model> "EGB_{stage.theme.value:02}.bin" {DeviceModel.Warp.value} </model>\n<pos> {serialize_numbers(part.return_x_pos, part.return_y_pos, part.return_z_pos)} </pos>\n<rot> {serialize_numbers(part.return_x_rot, part.return_y_rot, part.return_z_rot)} </rot>\n<sts> 7 </sts>\n<anmmov0> {serialize_numbers(part.return_dest_x, part.return_dest_y, part.return_dest_z)} </anmmov0>\n<group> {group} 1 </group>\n</EDIT_GIM_NORMAL>\n'
-                    )
-                    group += 1
-                else:
-                    if isinstance(part, Start):
-                        output.write("<EDIT_GIM_START>\n")
-                    elif isinstance(part, Goal):
-                        output.write("<EDIT_GIM_GOAL>\n")
-                    elif isinstance(part, Part):
-                        if isinstance(part.shape, DecorationModel):
-                            output.write("<EDIT_MAP_EXT>\n")
-                        else:
-                            output.write("<EDIT_MAP_NORMAL>\n")
-                    else:
-                        output.write("<EDIT_GIM_NORMAL>\n")
-                    if isinstance(part, Part):
-                        if isinstance(part.shape, DecorationModel):
-                            output.write(
-                                f'<model> "EME_{stage.theme.value:02}.bin" {part.shape.value} </model>\n'
-                            )
-                        else:
-                            output.write(
-                                f'<model> "EMB_{stage.theme.value:02}.bin" {part.shape.value} </model>\n'
-                            )
-                    elif isinstance(part, Start):
-                        output.write(
-                            f'<model> "EGB_{stage.theme.value:02}.bin" 0 </model>\n'
-                        )
-                    elif isinstance(part, Goal):
-                        output.write(
-                            f'<model> "EGB_{stage.theme.value:02}.bin" 1 </model>\n'
-                        )
-                    else:
-                        output.write(
-                            f'<model> "EGB_{stage.theme.value:02}.bin" {anmtype(part).value} </model>\n'
+                case DeviceModel.Warp:
+                    add(
+                        Warp._from_fields(
+                            *get_pos_rot(group[0]),
+                            *get_point(group[0], "anmmov0"),
+                            *get_pos_rot(group[1]),
+                            *get_point(group[1], "anmmov0"),
                         )
-                    output.write(
-                        f"<pos> {serialize_numbers(part.x_pos, part.y_pos, part.z_pos)} </pos>\n<rot> {serialize_numbers(part.x_rot, part.y_rot, part.z_rot)} </rot>\n<sts> {sts(part)} </sts>\n"
                     )
-                    try:
-                        output.write(f"<anmtype> {anmtype(part).value} </anmtype>\n")
-                    except ValueError:
-                        pass
-                    output.write(device_data(part))
-                    if isinstance(part, Start):
-                        output.write("</EDIT_GIM_START>\n")
-                    elif isinstance(part, Goal):
-                        output.write("</EDIT_GIM_GOAL>\n")
-                    elif isinstance(part, Part):
-                        if isinstance(part.shape, DecorationModel):
-                            output.write("</EDIT_MAP_EXT>\n")
-                        else:
-                            output.write("</EDIT_MAP_NORMAL>\n")
-                    else:
-                        output.write("</EDIT_GIM_NORMAL>\n")
-            output.write("</STAGEDATA>")
-            return output.getvalue().encode("shift_jis", "xmlcharrefreplace")
+        return Stage(
+            parts if interner is None else interner.intern_all(parts),
+            edit_user=(
+                EditUser.PROTECTED
+                if editinfo.find("EDITUSER") is None
+                else EditUser(int(editinfo.find("EDITUSER").text.strip()))  # type: ignore[union-attr]
+            ),
+            theme=Theme(int(editinfo.find("THEME").text.strip())),  # type: ignore[union-attr]
+            tilt_lock=False if editinfo.find("LOCK") is None else bool(int(editinfo.find("LOCK").text.strip())),  # type: ignore[union-attr]
+        )
+
+    @staticmethod
+    def serialize(stage: Stage, /, *, canonical: bool = True) -> bytes:
+        """When canonical is set, parts are written in a fixed order, so equal stages produce equal output regardless of set iteration order."""
+        return _serialize(
+            stage,
+            _canonical_order(stage) if canonical else stage,
+            lambda part: _fragment(part, stage.theme),
+        )
+
+
+class XmlWriter:
+    """Serializes one stage repeatedly, reusing the XML of the parts that have not changed since the last call.
+    Changes are read from the stage's journal, which is created if the stage does not have one.
+    Unless trim is unset, the entries that have been read are trimmed from the journal, which must then not be shared with other readers.
+    """
+
+    __match_args__ = ("stage",)
+    __slots__ = (
+        "_fragments",
+        "_generation",
+        "_journal",
+        "_order_keys",
+        "_position",
+        "_stage",
+        "_theme",
+        "_trim",
+    )
+
+    _fragments: dict[BasePart, tuple[str, ...]]
+    _generation: int
+    _journal: Journal
+    _order_keys: dict[BasePart, tuple[Any, ...]]
+    _position: int
+    _stage: Stage
+    _theme: Theme
+    _trim: bool
+
+    def __init__(self, stage: Stage, /, *, trim: bool = True) -> None:
+        if stage.journal is None:
+            stage.journal = Journal()
+        self._fragments = {}
+        self._generation = stage.journal.generation
+        self._journal = stage.journal
+        self._order_keys = {}
+        self._position = stage.journal.position
+        self._stage = stage
+        self._theme = stage.theme
+        self._trim = trim
+
+    def _fragment(self, part: BasePart, /) -> tuple[str, ...]:
+        try:
+            return self._fragments[part]
+        except KeyError:
+            fragment: Final[tuple[str, ...]] = _fragment(part, self._theme)
+            self._fragments[part] = fragment
+            return fragment
+
+    def _order_key(self, part: BasePart, /) -> tuple[Any, ...]:
+        try:
+            return self._order_keys[part]
+        except KeyError:
+            key: Final[tuple[Any, ...]] = _order_key(part)
+            self._order_keys[part] = key
+            return key
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.stage!r})"
+
+    def serialize(self, *, canonical: bool = True) -> bytes:
+        """Equivalent to XmlSlot.serialize(self.stage, canonical=canonical)."""
+        if (
+            self.stage.journal is not self._journal
+            or self._journal.generation != self._generation
+            or self._position < self._journal.start
+            or self.stage.theme != self._theme
+        ):
+            # The journal was replaced, cleared or trimmed past what was read, so any fragment may be stale.
+            self._fragments.clear()
+            self._order_keys.clear()
+            if self.stage.journal is None:
+                self.stage.journal = Journal()
+            self._journal = self.stage.journal
+            self._generation = self._journal.generation
+            self._theme = self.stage.theme
+        else:
+            for _, part in self._journal.since(self._position):
+                self._fragments.pop(part, None)
+                self._order_keys.pop(part, None)
+        self._position = self._journal.position
+        if self._trim:
+            self._journal.trim(self._position)
+        return _serialize(
+            self.stage,
+            (
+                _canonical_order(self.stage, self._order_key)
+                if canonical
+                else self.stage
+            ),
+            self._fragment,
+        )
+
+    @property
+    def stage(self) -> Stage:
+        return self._stage
@@ -1,7 +1,26 @@
-from collections.abc import Iterable
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, Set
 from enum import Enum, unique
+from hashlib import blake2b
+from itertools import chain
+from math import atan2, cos, degrees, hypot, inf, radians, sin
+from typing import Any, Final, Literal, Self
 
-from .part import BasePart
+from .diff import StageDiff, _diff
+from .index import SpatialIndex, TypeIndex, _CostTracker, _model, _position, _Tracker
+from .journal import Journal
+from .model import DecorationModel, DeviceModel, PartModel
+from .part import (
+    BasePart,
+    Magnet,
+    ToyTrain,
+    _canonical,
+    _notify,
+    _record,
+    _unreported,
+    _unwatch,
+    _watch,
+)
 
 __all__ = ["EditUser", "Stage", "Theme"]
 
@@ -50,12 +69,101 @@ class Theme(Enum):
         }[self]
 
 
+def _elements(part: BasePart, /) -> Iterator[BasePart]:
+    """The parts whose coordinates make up part, including the segments of magnets and the tracks of toy trains."""
+    if isinstance(part, Magnet):
+        return iter(part)
+    elif isinstance(part, ToyTrain):
+        return chain((part,), part)
+    else:
+        return iter((part,))
+
+
+_Matrix = tuple[
+    tuple[float, float, float],
+    tuple[float, float, float],
+    tuple[float, float, float],
+]
+
+
+def _euler(m: _Matrix, /) -> tuple[float, float, float]:
+    """The rotations about x, y and z, in degrees, that _matrix turns into m.
+    When the rotation about y is a quarter turn, the rotation about x is taken to be 0, since only the difference or sum of the other two matters.
+    """
+    cos_y: Final[float] = hypot(m[0][0], m[1][0])
+    if cos_y < 1e-12:
+        return 0.0, degrees(atan2(-m[2][0], cos_y)), degrees(atan2(-m[0][1], m[1][1]))
+    return (
+        degrees(atan2(m[2][1], m[2][2])),
+        degrees(atan2(-m[2][0], cos_y)),
+        degrees(atan2(m[1][0], m[0][0])),
+    )
+
+
+def _matrix(x: float, y: float, z: float, /) -> _Matrix:
+    """The rotation matrix of the given rotations in degrees, which are applied about the stage's x axis, then its y axis, then its z axis."""
+    sx, cx = _sin_cos(x)
+    sy, cy = _sin_cos(y)
+    sz, cz = _sin_cos(z)
+    return (
+        (cy * cz, sx * sy * cz - cx * sz, cx * sy * cz + sx * sz),
+        (cy * sz, sx * sy * sz + cx * cz, cx * sy * sz - sx * cz),
+        (-sy, sx * cy, cx * cy),
+    )
+
+
+def _product(a: _Matrix, b: _Matrix, /) -> _Matrix:
+    return tuple(  # type: ignore[return-value]
+        tuple(sum(a[i][k] * b[k][j] for k in range(3)) for j in range(3))
+        for i in range(3)
+    )
+
+
+def _restore(
+    cls: type["Stage"],
+    parts: list[BasePart],
+    edit_user: "EditUser",
+    theme: "Theme",
+    tilt_lock: bool,
+    /,
+) -> "Stage":
+    return cls(parts, edit_user=edit_user, theme=theme, tilt_lock=tilt_lock)
+
+
+def _sin_cos(angle: float, /) -> tuple[float, float]:
+    """Exact for multiples of 90 degrees, so quarter turns do not accumulate rounding error."""
+    if angle % 90 == 0:
+        return ((0, 1), (1, 0), (0, -1), (-1, 0))[int(angle // 90) % 4]
+    else:
+        return sin(radians(angle)), cos(radians(angle))
+
+
 class Stage(set[BasePart]):
-    __slots__ = ("_edit_user", "_theme", "_tilt_lock")
+    """A set of parts, along with the settings of the level that they make up.
+    While a stage has any trackers (its journal, indexes and cost tracker), every part in it is watched with _watch, whose property setters and container methods then report changes; the class of a watched part stays the same.
+    For the trackers to stay correct, every method that adds or removes parts must go through _change, parts must only be changed through their properties and container methods (or inside _unreported, followed by _notify), and trackers must only be attached or detached through _set_tracker.
+    """
 
+    __slots__ = (
+        "_cost_tracker",
+        "_edit_user",
+        "_journal",
+        "_spatial_index",
+        "_theme",
+        "_tilt_lock",
+        "_trackers",
+        "_type_index",
+    )
+
+    _cost_tracker: _CostTracker | None
     _edit_user: EditUser
+    _journal: Journal | None
+    _spatial_index: SpatialIndex | None
     _theme: Theme
     _tilt_lock: bool
+    _trackers: tuple[_Tracker, ...]
+    """Indexes that are kept up to date with this stage. While there are any, every part in the stage is watched."""
+    _type_index: TypeIndex | None
 
     def __init__(
         self,
@@ -67,10 +175,93 @@ class Stage(set[BasePart]):
         tilt_lock: bool = False,
     ) -> None:
         super().__init__(iterable)
+        self._cost_tracker = None
+        self._journal = None
+        self._spatial_index = None
+        self._trackers = ()
+        self._type_index = None
         self.edit_user = edit_user
         self.theme = theme
         self.tilt_lock = tilt_lock
 
+    def add(self, element: BasePart, /) -> None:
+        if self._trackers and element not in self:
+            self._change({element}, set())
+        else:
+            super().add(element)
+
+    @property
+    def budget(self) -> int | None:
+        """The most that the parts in this stage may cost in total, or None for no limit.
+        Changes that take the total cost over budget raise ValueError if strict_budget is set, or emit a RuntimeWarning otherwise.
+        Setting a budget or strict_budget starts tracking the total cost, which stops again once both are cleared.
+        """
+        return None if self._cost_tracker is None else self._cost_tracker.budget
+
+    @budget.setter
+    def budget(self, value: int | None, /) -> None:
+        self._track_costs().budget = value
+        self._untrack_costs()
+
+    def _change(self, added: set[BasePart], removed: set[BasePart], /) -> None:
+        """Add and remove parts while keeping the trackers up to date."""
+        if self._cost_tracker is not None:
+            self._cost_tracker.check(
+                sum(part.cost for part in added) - sum(part.cost for part in removed)
+            )
+        super().difference_update(removed)
+        super().update(added)
+        for part in removed:
+            _unwatch(part, self._part_changed)
+            for tracker in self._trackers:
+                tracker._discard(part)
+        for part in added:
+            _watch(part, self._part_changed)
+            for tracker in self._trackers:
+                tracker._add(part)
+
+    def clear(self) -> None:
+        if self._trackers:
+            self._change(set(), set(self))
+        else:
+            super().clear()
+
+    def count_by_model(self) -> Counter[PartModel | DecorationModel | DeviceModel]:
+        """The number of parts shown with each model; see TypeIndex.
+        This takes time proportional to the number of parts in the stage unless it has a type index.
+        """
+        if self._type_index is None:
+            return Counter(model for model in map(_model, self) if model is not None)
+        else:
+            return self._type_index.count_by_model()
+
+    def diff(self, other: "Stage", /, max_distance: float = inf) -> StageDiff:
+        """Compare this stage with a newer version of it.
+        Parts with equal values are matched first. Each remaining part of other is then matched with the closest remaining part of this stage of the same class, if one is within max_distance, and reported as modified.
+        """
+        return _diff(
+            self,
+            other,
+            max_distance,
+            (
+                name
+                for name in ("edit_user", "theme", "tilt_lock")
+                if getattr(self, name) != getattr(other, name)
+            ),
+        )
+
+    def difference_update(self, *s: Iterable[Any]) -> None:
+        if self._trackers:
+            self._change(set(), {part for it in s for part in it if part in self})
+        else:
+            super().difference_update(*s)
+
+    def discard(self, element: object, /) -> None:
+        if self._trackers and isinstance(element, BasePart) and element in self:
+            self._change(set(), {element})
+        else:
+            super().discard(element)
+
     @property
     def edit_user(self) -> EditUser:
         return self._edit_user
@@ -79,9 +270,320 @@ class Stage(set[BasePart]):
     def edit_user(self, value: EditUser, /) -> None:
         self._edit_user = value
 
+    def fingerprint(self) -> str:
+        """Hex digest of the metadata and parts of this stage, which does not depend on the order of iteration.
+        Stages that only differ in negative zeros, integer versus float coordinates or full turns of rotation have the same fingerprint.
+        """
+        digest: Final = blake2b(digest_size=20, person=b"koro1Stage")
+        digest.update(
+            f"{self.edit_user.value} {self.theme.value} {int(self.tilt_lock)}\n".encode()
+        )
+        for record in sorted(map(_canonical, self)):
+            digest.update(f"{record}\n".encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[tuple[Any, ...]],
+        /,
+        *,
+        edit_user: EditUser = EditUser.EXPERT,
+        theme: Theme = Theme.THE_EMPTY_LOT,
+        tilt_lock: bool = False,
+    ) -> Self:
+        """Create a stage from part records, as returned by records, without validating or normalizing their values.
+        This is much faster than calling the part constructors, but the records must come from a trusted source.
+        """
+        return cls(
+            (record[0]._from_fields(*record[1:]) for record in records),
+            edit_user=edit_user,
+            theme=theme,
+            tilt_lock=tilt_lock,
+        )
+
+    def __iand__(self, value: Set[object], /) -> Self:
+        if not isinstance(value, Set):
+            return NotImplemented
+        self.intersection_update(value)
+        return self
+
+    def in_box(
+        self,
+        x_min: float,
+        y_min: float,
+        z_min: float,
+        x_max: float,
+        y_max: float,
+        z_max: float,
+        /,
+    ) -> set[BasePart]:
+        """The parts whose positions are inside the given box, including its boundary.
+        This takes time proportional to the number of parts in the stage unless it has a spatial index.
+        """
+        if self._spatial_index is None:
+            result: Final[set[BasePart]] = set()
+            for part in self:
+                position = _position(part)
+                if position is not None:
+                    x, y, z = position
+                    if (
+                        x_min <= x <= x_max
+                        and y_min <= y <= y_max
+                        and z_min <= z <= z_max
+                    ):
+                        result.add(part)
+            return result
+        else:
+            return self._spatial_index.in_box(x_min, y_min, z_min, x_max, y_max, z_max)
+
+    def intersection_update(self, *s: Iterable[Any]) -> None:
+        if self._trackers:
+            self._change(set(), set(self).difference(set(self).intersection(*s)))
+        else:
+            super().intersection_update(*s)
+
+    # set.__or__ and set.__xor__ are typed as returning sets of the union of both element types, which no in-place operator of a subclass can match
+    def __ior__(self, value: Set[BasePart], /) -> Self:  # type: ignore[misc, override]
+        if not isinstance(value, Set):
+            return NotImplemented
+        self.update(value)
+        return self
+
+    def __isub__(self, value: Set[object], /) -> Self:
+        if not isinstance(value, Set):
+            return NotImplemented
+        self.difference_update(value)
+        return self
+
+    def __ixor__(self, value: Set[BasePart], /) -> Self:  # type: ignore[misc, override]
+        if not isinstance(value, Set):
+            return NotImplemented
+        self.symmetric_difference_update(value)
+        return self
+
+    @property
+    def journal(self) -> Journal | None:
+        """Assigning a journal records every part that is added, removed or changed from then on."""
+        return self._journal
+
+    @journal.setter
+    def journal(self, value: Journal | None, /) -> None:
+        self._set_tracker(self._journal, value)
+        self._journal = value
+
+    def mirror(self, axis: Literal["x", "y", "z"], /, origin: float = 0.0) -> None:
+        """Reflect every part across the plane perpendicular to axis through origin.
+        Rotations about the other two axes are negated. Parts are not replaced by mirror-image models, so asymmetric parts keep their handedness.
+        """
+        if axis == "x":
+            self._transform(
+                lambda x, y, z: (2 * origin - x, y, z),
+                lambda x, y, z: (x, -y, -z),
+            )
+        elif axis == "y":
+            self._transform(
+                lambda x, y, z: (x, 2 * origin - y, z),
+                lambda x, y, z: (-x, y, -z),
+            )
+        elif axis == "z":
+            self._transform(
+                lambda x, y, z: (x, y, 2 * origin - z),
+                lambda x, y, z: (-x, -y, z),
+            )
+        else:
+            raise ValueError(f"axis must be x, y or z, not {axis!r}")
+
+    def near(self, x: float, y: float, z: float, r: float, /) -> set[BasePart]:
+        """The parts whose positions are no further than r from (x, y, z).
+        This takes time proportional to the number of parts in the stage unless it has a spatial index.
+        """
+        if self._spatial_index is None:
+            result: Final[set[BasePart]] = set()
+            for part in self:
+                position = _position(part)
+                if (
+                    position is not None
+                    and (position[0] - x) ** 2
+                    + (position[1] - y) ** 2
+                    + (position[2] - z) ** 2
+                    <= r * r
+                ):
+                    result.add(part)
+            return result
+        else:
+            return self._spatial_index.near(x, y, z, r)
+
+    def of_type(self, cls: type[BasePart], /) -> set[BasePart]:
+        """The parts that are instances of cls.
+        This takes time proportional to the number of parts in the stage unless it has a type index.
+        """
+        if self._type_index is None:
+            return {part for part in self if isinstance(part, cls)}
+        else:
+            return self._type_index.of_type(cls)
+
+    def _part_changed(self, part: BasePart, /) -> None:
+        for tracker in self._trackers:
+            tracker._changed(part)
+
+    def pop(self) -> BasePart:
+        if self._trackers:
+            if not self:
+                raise KeyError("pop from an empty set")
+            element: Final[BasePart] = next(iter(self))
+            self._change(set(), {element})
+            return element
+        else:
+            return super().pop()
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Indexes are not copied or pickled."""
+        return _restore, (
+            type(self),
+            list(self),
+            self.edit_user,
+            self.theme,
+            self.tilt_lock,
+        )
+
+    def records(self) -> Iterator[tuple[Any, ...]]:
+        """A record of each part in this stage: its class, then x_pos, y_pos, z_pos, x_rot, y_rot, z_rot and the values of its keyword-only constructor arguments, in the order of the class's _fields.
+        The segments of a magnet replace all of its values, and the tracks of a toy train follow its rotation, each as a tuple in the same layout without the class.
+        """
+        return map(_record, self)
+
+    def remove(self, element: BasePart, /) -> None:
+        if self._trackers:
+            if element not in self:
+                raise KeyError(element)
+            self._change(set(), {element})
+        else:
+            super().remove(element)
+
     def __repr__(self) -> str:
         return f"{type(self).__name__}({set(self)!r}, edit_user={self.edit_user!r}, theme={self.theme!r}, tilt_lock={self.tilt_lock!r})"
 
+    def rotate_about(
+        self,
+        axis: Literal["x", "y", "z"],
+        angle: float,
+        /,
+        pivot: tuple[float, float, float] = (0.0, 0.0, 0.0),
+    ) -> None:
+        """Rotate every part by angle degrees about the line parallel to axis through pivot, in the same direction as the matching rotation property.
+        Each orientation is composed with the rotation as a matrix, taking a part's rotations to apply about x, then y, then z, so parts that are rotated about several axes keep their shape relative to each other.
+        """
+        s, c = _sin_cos(angle)
+        px, py, pz = pivot
+        turn: Final[_Matrix] = _matrix(
+            angle if axis == "x" else 0.0,
+            angle if axis == "y" else 0.0,
+            angle if axis == "z" else 0.0,
+        )
+
+        def rotation(x: float, y: float, z: float) -> tuple[float, float, float]:
+            # Adding the angle gives the same result without rounding error where it is exact
+            if axis == "z":
+                return x, y, z + angle
+            elif axis == "y" and z % 360 == 0:
+                return x, y + angle, z
+            elif axis == "x" and y % 360 == 0 and z % 360 == 0:
+                return x + angle, y, z
+            else:
+                return _euler(_product(turn, _matrix(x, y, z)))
+
+        if axis == "x":
+            self._transform(
+                lambda x, y, z: (
+                    x,
+                    py + (y - py) * c - (z - pz) * s,
+                    pz + (y - py) * s + (z - pz) * c,
+                ),
+                rotation,
+            )
+        elif axis == "y":
+            self._transform(
+                lambda x, y, z: (
+                    px + (x - px) * c + (z - pz) * s,
+                    y,
+                    pz - (x - px) * s + (z - pz) * c,
+                ),
+                rotation,
+            )
+        elif axis == "z":
+            self._transform(
+                lambda x, y, z: (
+                    px + (x - px) * c - (y - py) * s,
+                    py + (x - px) * s + (y - py) * c,
+                    z,
+                ),
+                rotation,
+            )
+        else:
+            raise ValueError(f"axis must be x, y or z, not {axis!r}")
+
+    def scale_grid(
+        self,
+        factor: float,
+        /,
+        pivot: tuple[float, float, float] = (0.0, 0.0, 0.0),
+    ) -> None:
+        """Multiply the distance of every part from pivot by factor, without changing the size or orientation of the parts themselves."""
+        px, py, pz = pivot
+        self._transform(
+            lambda x, y, z: (
+                px + (x - px) * factor,
+                py + (y - py) * factor,
+                pz + (z - pz) * factor,
+            ),
+            None,
+        )
+
+    def _set_tracker(self, old: _Tracker | None, new: _Tracker | None, /) -> None:
+        """Replace one of this stage's trackers, and start or stop watching its parts as needed."""
+        was_watching: Final[bool] = bool(self._trackers)
+        trackers: Final[list[_Tracker]] = [
+            tracker for tracker in self._trackers if tracker is not old
+        ]
+        if new is not None:
+            new._build(self)
+            trackers.append(new)
+        self._trackers = tuple(trackers)
+        if trackers and not was_watching:
+            for part in self:
+                _watch(part, self._part_changed)
+        elif was_watching and not trackers:
+            for part in self:
+                _unwatch(part, self._part_changed)
+
+    @property
+    def spatial_index(self) -> SpatialIndex | None:
+        """Assigning an index makes near and in_box take time proportional to the number of nearby parts, at the cost of updating the index whenever a part is added, removed or changed."""
+        return self._spatial_index
+
+    @spatial_index.setter
+    def spatial_index(self, value: SpatialIndex | None, /) -> None:
+        self._set_tracker(self._spatial_index, value)
+        self._spatial_index = value
+
+    @property
+    def strict_budget(self) -> bool:
+        """Whether changes that go over budget are rejected rather than warned about."""
+        return False if self._cost_tracker is None else self._cost_tracker.strict
+
+    @strict_budget.setter
+    def strict_budget(self, value: bool, /) -> None:
+        self._track_costs().strict = value
+        self._untrack_costs()
+
+    def symmetric_difference_update(self, s: Iterable[BasePart], /) -> None:
+        if self._trackers:
+            other: Final[set[BasePart]] = set(s)
+            self._change(other.difference(self), other.intersection(self))
+        else:
+            super().symmetric_difference_update(s)
+
     @property
     def theme(self) -> Theme:
         return self._theme
@@ -97,3 +599,96 @@ class Stage(set[BasePart]):
     @tilt_lock.setter
     def tilt_lock(self, value: bool, /) -> None:
         self._tilt_lock = value
+
+    @property
+    def total_cost(self) -> int:
+        """The number of kororin points that the parts in this stage cost to place.
+        This takes constant time while a budget or strict_budget is set, since the total is then tracked as parts change, and time proportional to the number of parts otherwise.
+        """
+        if self._cost_tracker is None:
+            return sum(part.cost for part in self)
+        return self._cost_tracker.total
+
+    def _track_costs(self) -> _CostTracker:
+        if self._cost_tracker is None:
+            tracker: Final[_CostTracker] = _CostTracker()
+            self._set_tracker(None, tracker)
+            self._cost_tracker = tracker
+        return self._cost_tracker
+
+    def _transform(
+        self,
+        point: Callable[[float, float, float], tuple[float, float, float]],
+        rotation: Callable[[float, float, float], tuple[float, float, float]] | None,
+        /,
+    ) -> None:
+        """Apply point to every coordinate triple and rotation to every orientation in this stage, including destinations, warp returns, and magnet and track segments.
+        The watchers of each part are notified once, after every part has been changed, rather than once per value.
+        """
+        for part in self:
+            with _unreported(part):
+                for element in _elements(part):
+                    for names in element._points:
+                        x_name, y_name, z_name = names
+                        x, y, z = point(
+                            getattr(element, x_name),
+                            getattr(element, y_name),
+                            getattr(element, z_name),
+                        )
+                        setattr(element, x_name, x)
+                        setattr(element, y_name, y)
+                        setattr(element, z_name, z)
+                    if rotation is not None:
+                        for names in element._rotations:
+                            x_name, y_name, z_name = names
+                            x, y, z = rotation(
+                                getattr(element, x_name),
+                                getattr(element, y_name),
+                                getattr(element, z_name),
+                            )
+                            setattr(element, x_name, x)
+                            setattr(element, y_name, y)
+                            setattr(element, z_name, z)
+        for part in self:
+            _notify(part)
+
+    def translate(self, x: float, y: float, z: float, /) -> None:
+        """Move every part by the given offset."""
+        self._transform(lambda px, py, pz: (px + x, py + y, pz + z), None)
+
+    @property
+    def type_index(self) -> TypeIndex | None:
+        """Assigning an index makes of_type, with_model and count_by_model take time proportional to the number of matching parts, at the cost of updating the index whenever a part is added, removed or changed."""
+        return self._type_index
+
+    @type_index.setter
+    def type_index(self, value: TypeIndex | None, /) -> None:
+        self._set_tracker(self._type_index, value)
+        self._type_index = value
+
+    def _untrack_costs(self) -> None:
+        """Stop tracking the total cost if neither a budget nor strict_budget is set."""
+        if (
+            self._cost_tracker is not None
+            and self._cost_tracker.budget is None
+            and not self._cost_tracker.strict
+        ):
+            self._set_tracker(self._cost_tracker, None)
+            self._cost_tracker = None
+
+    def update(self, *s: Iterable[BasePart]) -> None:
+        if self._trackers:
+            self._change(set().union(*s).difference(self), set())
+        else:
+            super().update(*s)
+
+    def with_model(
+        self, model: PartModel | DecorationModel | DeviceModel, /
+    ) -> set[BasePart]:
+        """The parts shown with model; see TypeIndex.
+        This takes time proportional to the number of parts in the stage unless it has a type index.
+        """
+        if self._type_index is None:
+            return {part for part in self if _model(part) is model}
+        else:
+            return self._type_index.with_model(model)
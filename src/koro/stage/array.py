@@ -0,0 +1,456 @@
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from enum import Enum
+from math import nan
+from operator import index
+from pickle import HIGHEST_PROTOCOL, dumps, loads
+from struct import Struct
+from typing import TYPE_CHECKING, Any, Final, SupportsIndex
+
+from . import EditUser, Stage, Theme
+from .model import DecorationModel, DeviceModel, PartModel
+from .part import (
+    Ant,
+    BasePart,
+    BlinkingTile,
+    Bumper,
+    Cannon,
+    ConveyorBelt,
+    DashTunnel,
+    Drawbridge,
+    Fan,
+    Gear,
+    Goal,
+    GreenCrystal,
+    KororinCapsule,
+    Magnet,
+    MagnetSegment,
+    MagnifyingGlass,
+    MelodyTile,
+    MovementTiming,
+    MovingCurve,
+    MovingTile,
+    Part,
+    Press,
+    ProgressMarker,
+    Punch,
+    Scissors,
+    SeesawBlock,
+    SizeTunnel,
+    SlidingTile,
+    Speed,
+    Spring,
+    Start,
+    TextBox,
+    Thorn,
+    ToyTrain,
+    TrainTrack,
+    Turntable,
+    UpsideDownBall,
+    UpsideDownStageDevice,
+    Walls,
+    Warp,
+)
+
+if TYPE_CHECKING:
+    from _typeshed import ReadableBuffer
+else:
+    ReadableBuffer = Any
+
+__all__ = ["StageArray"]
+
+_KINDS: Final[tuple[type[BasePart], ...]] = (
+    Part,
+    Start,
+    Goal,
+    ProgressMarker,
+    MovingTile,
+    MovingCurve,
+    SlidingTile,
+    ConveyorBelt,
+    MagnetSegment,
+    Magnet,
+    DashTunnel,
+    SeesawBlock,
+    Cannon,
+    Drawbridge,
+    Turntable,
+    Bumper,
+    Thorn,
+    Gear,
+    Fan,
+    Spring,
+    Punch,
+    Press,
+    Scissors,
+    MagnifyingGlass,
+    UpsideDownStageDevice,
+    UpsideDownBall,
+    SizeTunnel,
+    TrainTrack,
+    ToyTrain,
+    Warp,
+    BlinkingTile,
+    MelodyTile,
+    TextBox,
+    KororinCapsule,
+    GreenCrystal,
+    Ant,
+)
+"""Concrete part types in the order of their kind codes. New types must only be appended."""
+
+_HEADER: Final[Struct] = Struct("=IIIIBBB")
+"""Row count, lengths of the codes and floats columns, size of the pickled side table, edit user, theme and tilt lock, at the start of the packed form of a StageArray."""
+
+_CODES: Final[dict[type[BasePart], int]] = {
+    kind: code for code, kind in enumerate(_KINDS)
+}
+
+
+def _encode(value: Any, /) -> Any:
+    if isinstance(value, DecorationModel):
+        return ~value.value
+    elif isinstance(value, Enum):
+        return value.value
+    else:
+        return value
+
+
+def _kind_code(kind: type[BasePart], /) -> int:
+    try:
+        return _CODES[kind]
+    except KeyError:
+        for base in kind.__mro__:
+            if base in _CODES:
+                _CODES[kind] = _CODES[base]
+                return _CODES[base]
+        raise TypeError(f"{kind.__name__} is not a known part type") from None
+
+
+def _shape(value: int, /) -> PartModel | DecorationModel:
+    return PartModel(value) if value >= 0 else DecorationModel(~value)
+
+
+_FIELDS: Final[
+    dict[type[BasePart], tuple[tuple[str, Callable[[Any], Any] | None], ...]]
+] = {
+    Part: (("h", _shape),),
+    ProgressMarker: (("B", None),),
+    MovingTile: (
+        ("d", None),
+        ("d", None),
+        ("d", None),
+        ("B", PartModel),
+        ("d", None),
+        ("?", bool),
+        ("B", Walls),
+    ),
+    MovingCurve: (("B", PartModel), ("B", Speed)),
+    ConveyorBelt: (("?", bool),),
+    MagnetSegment: (("B", DeviceModel),),
+    DashTunnel: (("B", DeviceModel),),
+    SeesawBlock: (("?", bool), ("B", DeviceModel)),
+    Turntable: (("B", Speed),),
+    Bumper: (("?", bool),),
+    Gear: (("B", Speed),),
+    Fan: (("B", DeviceModel),),
+    Punch: (("B", MovementTiming),),
+    Press: (("B", MovementTiming),),
+    Scissors: (("B", MovementTiming),),
+    SizeTunnel: (("B", DeviceModel),),
+    TrainTrack: (("B", DeviceModel),),
+    ToyTrain: (("I", None),),
+    Warp: (("d", None),) * 12,
+    BlinkingTile: (("B", MovementTiming),),
+    MelodyTile: (("B", DeviceModel),),
+    TextBox: (("B", DeviceModel), ("i", None)),
+}
+"""Format and decoder of each value that follows the position and rotation in the records of a kind, in _fields order.
+Enums are stored by value, and decorations by the complement of theirs, so that they do not collide with part models.
+Packed records of toy trains store the number of their tracks, which StageArray keeps in its side table instead.
+"""
+
+
+class StageArray:
+    """Column-oriented copy of a stage.
+    Positions and rotations are stored in one array per coordinate and part types in an array of kind codes.
+    The other values of each part, as laid out by _FIELDS, go in a codes column of integers and a floats column, with each row's first index in the offset columns.
+    Only the segments of magnets and the tracks of toy trains, whose number varies, are kept in a side table.
+    Converting a stage to and from this representation is lossless.
+    """
+
+    __slots__ = (
+        "_chains",
+        "_code_offsets",
+        "_codes",
+        "_edit_user",
+        "_float_offsets",
+        "_floats",
+        "_kinds",
+        "_theme",
+        "_tilt_lock",
+        "_x_pos",
+        "_x_rot",
+        "_y_pos",
+        "_y_rot",
+        "_z_pos",
+        "_z_rot",
+    )
+
+    _chains: dict[int, tuple[tuple[Any, ...], ...]]
+    _code_offsets: "array[int]"
+    _codes: "array[int]"
+    _edit_user: EditUser
+    _float_offsets: "array[int]"
+    _floats: "array[float]"
+    _kinds: "array[int]"
+    _theme: Theme
+    _tilt_lock: bool
+    _x_pos: "array[float]"
+    _x_rot: "array[float]"
+    _y_pos: "array[float]"
+    _y_rot: "array[float]"
+    _z_pos: "array[float]"
+    _z_rot: "array[float]"
+
+    def __init__(
+        self,
+        iterable: Iterable[BasePart] = (),
+        /,
+        *,
+        edit_user: EditUser = EditUser.EXPERT,
+        theme: Theme = Theme.THE_EMPTY_LOT,
+        tilt_lock: bool = False,
+    ) -> None:
+        self._chains = {}
+        self._code_offsets = array("I")
+        self._codes = array("i")
+        self._edit_user = edit_user
+        self._float_offsets = array("I")
+        self._floats = array("d")
+        self._kinds = array("B")
+        self._theme = theme
+        self._tilt_lock = tilt_lock
+        self._x_pos = array("d")
+        self._x_rot = array("d")
+        self._y_pos = array("d")
+        self._y_rot = array("d")
+        self._z_pos = array("d")
+        self._z_rot = array("d")
+        for part in iterable:
+            self.append(part)
+
+    def append(self, part: BasePart, /) -> None:
+        code: Final[int] = _kind_code(type(part))
+        if isinstance(part, (Magnet, ToyTrain)):
+            self._chains[len(self)] = tuple(
+                (
+                    child.x_pos,
+                    child.y_pos,
+                    child.z_pos,
+                    child.x_rot,
+                    child.y_rot,
+                    child.z_rot,
+                    child.shape,
+                )
+                for child in part
+            )
+        self._code_offsets.append(len(self._codes))
+        self._float_offsets.append(len(self._floats))
+        if not isinstance(part, ToyTrain):
+            for name, (format, _) in zip(part._fields, _FIELDS.get(_KINDS[code], ())):
+                if format == "d":
+                    self._floats.append(getattr(part, name))
+                else:
+                    self._codes.append(_encode(getattr(part, name)))
+        self._kinds.append(code)
+        if isinstance(part, Magnet) and not part:
+            for column in self._x_pos, self._y_pos, self._z_pos:
+                column.append(nan)
+            for column in self._x_rot, self._y_rot, self._z_rot:
+                column.append(nan)
+        else:
+            self._x_pos.append(part.x_pos)
+            self._y_pos.append(part.y_pos)
+            self._z_pos.append(part.z_pos)
+            self._x_rot.append(part.x_rot)
+            self._y_rot.append(part.y_rot)
+            self._z_rot.append(part.z_rot)
+
+    @property
+    def edit_user(self) -> EditUser:
+        return self._edit_user
+
+    @classmethod
+    def from_stage(cls, stage: Stage, /) -> "StageArray":
+        return cls(
+            stage,
+            edit_user=stage.edit_user,
+            theme=stage.theme,
+            tilt_lock=stage.tilt_lock,
+        )
+
+    def __getitem__(self, index_: SupportsIndex, /) -> BasePart:
+        """Create a new part from the values stored in the given row."""
+        i: Final[int] = range(len(self))[index(index_)]
+        kind: Final[type[BasePart]] = _KINDS[self._kinds[i]]
+        if kind is Magnet:
+            return Magnet._from_fields(self._chains[i])
+        elif kind is ToyTrain:
+            return ToyTrain._from_fields(
+                self._x_pos[i],
+                self._y_pos[i],
+                self._z_pos[i],
+                self._x_rot[i],
+                self._y_rot[i],
+                self._z_rot[i],
+                self._chains[i],
+            )
+        values: Final[list[Any]] = []
+        code: int = self._code_offsets[i]
+        float_: int = self._float_offsets[i]
+        for format, decoder in _FIELDS.get(kind, ()):
+            value: Any
+            if format == "d":
+                value = self._floats[float_]
+                float_ += 1
+            else:
+                value = self._codes[code]
+                code += 1
+            values.append(value if decoder is None else decoder(value))
+        return kind._from_fields(
+            self._x_pos[i],
+            self._y_pos[i],
+            self._z_pos[i],
+            self._x_rot[i],
+            self._y_rot[i],
+            self._z_rot[i],
+            *values,
+        )
+
+    def __iter__(self) -> Iterator[BasePart]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def kind(self, index_: SupportsIndex, /) -> type[BasePart]:
+        """The type of the part stored in the given row."""
+        return _KINDS[self._kinds[index_]]
+
+    @staticmethod
+    def kind_code(kind: type[BasePart], /) -> int:
+        """The value used in the kinds column for the given part type."""
+        return _kind_code(kind)
+
+    @property
+    def kinds(self) -> "array[int]":
+        return self._kinds
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def _pack(self) -> list[bytes]:
+        """The packed form of this array, in pieces to be written one after another.
+        It is made of a header, the kinds column, the position and rotation columns, the offset columns, the codes and floats columns, all in native byte order, and then the pickled side table.
+        """
+        chains: Final[bytes] = dumps(self._chains, HIGHEST_PROTOCOL)
+        return [
+            _HEADER.pack(
+                len(self),
+                len(self._codes),
+                len(self._floats),
+                len(chains),
+                self.edit_user.value,
+                self.theme.value,
+                self.tilt_lock,
+            ),
+            self._kinds.tobytes(),
+            self._x_pos.tobytes(),
+            self._y_pos.tobytes(),
+            self._z_pos.tobytes(),
+            self._x_rot.tobytes(),
+            self._y_rot.tobytes(),
+            self._z_rot.tobytes(),
+            self._code_offsets.tobytes(),
+            self._float_offsets.tobytes(),
+            self._codes.tobytes(),
+            self._floats.tobytes(),
+            chains,
+        ]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r}, edit_user={self.edit_user!r}, theme={self.theme!r}, tilt_lock={self.tilt_lock!r})"
+
+    @property
+    def theme(self) -> Theme:
+        return self._theme
+
+    @property
+    def tilt_lock(self) -> bool:
+        return self._tilt_lock
+
+    def to_stage(self) -> Stage:
+        return Stage(
+            self,
+            edit_user=self.edit_user,
+            theme=self.theme,
+            tilt_lock=self.tilt_lock,
+        )
+
+    @classmethod
+    def _unpack(cls, buffer: ReadableBuffer, /) -> "StageArray":
+        """Read an array from the start of buffer, in the form written by _pack.
+        The columns are copied out of buffer, so it may be released afterwards.
+        """
+        with memoryview(buffer) as view:
+            length, codes, floats, chains_size, edit_user, theme, tilt_lock = (
+                _HEADER.unpack_from(view)
+            )
+            self: Final[StageArray] = cls(
+                edit_user=EditUser(edit_user),
+                theme=Theme(theme),
+                tilt_lock=bool(tilt_lock),
+            )
+            position: int = _HEADER.size
+            self._kinds.frombytes(view[position : position + length])
+            position += length
+            column: array[Any]
+            for column, count in (
+                (self._x_pos, length),
+                (self._y_pos, length),
+                (self._z_pos, length),
+                (self._x_rot, length),
+                (self._y_rot, length),
+                (self._z_rot, length),
+                (self._code_offsets, length),
+                (self._float_offsets, length),
+                (self._codes, codes),
+                (self._floats, floats),
+            ):
+                column.frombytes(view[position : position + count * column.itemsize])
+                position += count * column.itemsize
+            self._chains = loads(view[position : position + chains_size])
+        return self
+
+    @property
+    def x_pos(self) -> "array[float]":
+        return self._x_pos
+
+    @property
+    def x_rot(self) -> "array[float]":
+        return self._x_rot
+
+    @property
+    def y_pos(self) -> "array[float]":
+        return self._y_pos
+
+    @property
+    def y_rot(self) -> "array[float]":
+        return self._y_rot
+
+    @property
+    def z_pos(self) -> "array[float]":
+        return self._z_pos
+
+    @property
+    def z_rot(self) -> "array[float]":
+        return self._z_rot
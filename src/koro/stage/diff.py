@@ -0,0 +1,145 @@
+from collections.abc import Iterable
+from typing import Any, Final
+
+from .index import SpatialIndex, _position
+from .part import BasePart, _base_type, _record, _values
+
+__all__ = ["StageDiff"]
+
+
+class StageDiff:
+    """The differences between two stages, as returned by Stage.diff."""
+
+    __match_args__ = ("added", "removed", "modified", "metadata")
+    __slots__ = ("_added", "_metadata", "_modified", "_removed")
+
+    _added: set[BasePart]
+    _metadata: tuple[str, ...]
+    _modified: list[tuple[BasePart, BasePart, tuple[str, ...]]]
+    _removed: set[BasePart]
+
+    def __init__(
+        self,
+        added: Iterable[BasePart] = (),
+        removed: Iterable[BasePart] = (),
+        modified: Iterable[tuple[BasePart, BasePart, tuple[str, ...]]] = (),
+        metadata: Iterable[str] = (),
+    ) -> None:
+        self._added = set(added)
+        self._metadata = tuple(metadata)
+        self._modified = list(modified)
+        self._removed = set(removed)
+
+    @property
+    def added(self) -> set[BasePart]:
+        """Parts of the new stage that have no counterpart in the old stage."""
+        return self._added
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.metadata or self.modified or self.removed)
+
+    @property
+    def metadata(self) -> tuple[str, ...]:
+        """Names of the stage properties that differ, out of edit_user, theme and tilt_lock."""
+        return self._metadata
+
+    @property
+    def modified(self) -> list[tuple[BasePart, BasePart, tuple[str, ...]]]:
+        """Old part, new part and the names of the properties that differ between them, for each part that was moved or changed."""
+        return self._modified
+
+    @property
+    def removed(self) -> set[BasePart]:
+        """Parts of the old stage that have no counterpart in the new stage."""
+        return self._removed
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.added!r}, {self.removed!r}, {self.modified!r}, {self.metadata!r})"
+
+
+def _diff(
+    old: Iterable[BasePart],
+    new: Iterable[BasePart],
+    max_distance: float,
+    metadata: Iterable[str],
+    /,
+) -> StageDiff:
+    # Pair off parts with equal values first.
+    unmatched: Final[dict[tuple[Any, ...], list[BasePart]]] = {}
+    for part in old:
+        unmatched.setdefault(_record(part), []).append(part)
+    added: Final[list[BasePart]] = []
+    for part in new:
+        candidates = unmatched.get(_record(part))
+        if candidates:
+            candidates.pop()
+        else:
+            added.append(part)
+    # Then pair each remaining new part with the nearest remaining old part of the same class.
+    indexes: Final[dict[type[BasePart], SpatialIndex]] = {}
+    unplaced: Final[dict[type[BasePart], list[BasePart]]] = {}
+    for candidates in unmatched.values():
+        for part in candidates:
+            kind = _base_type(part)
+            if _position(part) is None:
+                unplaced.setdefault(kind, []).append(part)
+            else:
+                indexes.setdefault(kind, SpatialIndex())._add(part)
+    modified: Final[list[tuple[BasePart, BasePart, tuple[str, ...]]]] = []
+    still_added: Final[list[BasePart]] = []
+    for part in added:
+        kind = _base_type(part)
+        match: BasePart | None = None
+        position = _position(part)
+        if position is None:
+            if unplaced.get(kind):
+                match = unplaced[kind].pop()
+        elif kind in indexes:
+            match = _nearest(indexes[kind], position, max_distance)
+            if match is not None:
+                indexes[kind]._discard(match)
+        if match is None:
+            still_added.append(part)
+        else:
+            old_values = _values(match)
+            new_values = _values(part)
+            modified.append(
+                (
+                    match,
+                    part,
+                    tuple(
+                        name
+                        for name, value in new_values.items()
+                        if old_values[name] != value
+                    ),
+                )
+            )
+    removed: Final[set[BasePart]] = set()
+    for index in indexes.values():
+        removed.update(index._locations)
+    for parts in unplaced.values():
+        removed.update(parts)
+    return StageDiff(still_added, removed, modified, metadata)
+
+
+def _nearest(
+    index: SpatialIndex, position: tuple[float, float, float], max_distance: float, /
+) -> BasePart | None:
+    """The closest part in index that is no further than max_distance from position."""
+    x, y, z = position
+    radius: float = min(index.cell_size, max_distance)
+    while index._locations:
+        found = index.near(x, y, z, radius)
+        if found:
+            return min(
+                found,
+                key=lambda part: (
+                    (index._locations[part][1] - x) ** 2
+                    + (index._locations[part][2] - y) ** 2
+                    + (index._locations[part][3] - z) ** 2
+                ),
+            )
+        if radius >= max_distance:
+            break
+        radius = min(radius * 2, max_distance)
+    return None
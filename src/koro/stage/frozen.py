@@ -0,0 +1,206 @@
+from collections.abc import Callable, Iterable, MutableSequence
+from typing import Any, Final, TypeVar
+from weakref import WeakValueDictionary
+
+from .part import (
+    _CONTAINER_METHODS,
+    BasePart,
+    Magnet,
+    ToyTrain,
+    _base_type,
+    _from_record,
+    _original_types,
+    _record,
+)
+
+__all__ = ["Frozen", "Interner", "freeze", "thaw"]
+
+_P = TypeVar("_P", bound=BasePart)
+
+
+class Frozen:
+    """Marker base class of the frozen part variants created by freeze.
+    Frozen parts cannot be modified, so one frozen part can safely belong to any number of stages.
+    Like other parts, they compare and hash by identity, so a stage can hold several equal frozen parts.
+    Since they never change, stages do not watch them.
+    """
+
+    __slots__ = ()
+
+
+_frozen_types: Final[dict[type[BasePart], type[BasePart]]] = {}
+
+
+def _blocked(name: str, /) -> Callable[..., Any]:
+    def method(self: BasePart, /, *args: Any) -> Any:
+        raise AttributeError(f"{type(self).__name__} is frozen")
+
+    method.__name__ = name
+    return method
+
+
+def _copy(self: _P, /, *args: Any) -> _P:
+    return self
+
+
+def _frozen_copy(
+    part: BasePart, freeze_child: Callable[[BasePart], BasePart], /
+) -> BasePart:
+    cls: Final[type[BasePart]] = _frozen_type(_base_type(part))
+    if isinstance(part, Magnet):
+        return cls(map(freeze_child, part))  # type: ignore[arg-type, call-arg]
+    elif isinstance(part, ToyTrain):
+        return cls(
+            part.x_pos,
+            part.y_pos,
+            part.z_pos,
+            part.x_rot,
+            part.y_rot,
+            part.z_rot,
+            tracks=map(freeze_child, part),  # type: ignore[call-arg]
+        )
+    else:
+        return cls(
+            part.x_pos,
+            part.y_pos,
+            part.z_pos,
+            part.x_rot,
+            part.y_rot,
+            part.z_rot,
+            **{name: getattr(part, name) for name in part._fields},
+        )
+
+
+def _frozen_type(cls: type[BasePart], /) -> type[BasePart]:
+    try:
+        return _frozen_types[cls]
+    except KeyError:
+        pass
+
+    def __init__(self: BasePart, /, *args: Any, **kwargs: Any) -> None:
+        cls.__init__(self, *args, **kwargs)
+        if isinstance(self, MutableSequence):
+            cls.__setitem__(self, slice(None), [freeze(child) for child in self])  # type: ignore[index]
+        object.__setattr__(self, "_sealed", True)
+
+    def __reduce__(self: BasePart) -> tuple[Any, ...]:
+        if isinstance(self, Magnet):
+            return _make, (cls, (tuple(self),), {})
+        elif isinstance(self, ToyTrain):
+            return _make, (
+                cls,
+                (
+                    self.x_pos,
+                    self.y_pos,
+                    self.z_pos,
+                    self.x_rot,
+                    self.y_rot,
+                    self.z_rot,
+                ),
+                {"tracks": tuple(self)},
+            )
+        else:
+            return _make, (
+                cls,
+                (
+                    self.x_pos,
+                    self.y_pos,
+                    self.z_pos,
+                    self.x_rot,
+                    self.y_rot,
+                    self.z_rot,
+                ),
+                {name: getattr(self, name) for name in self._fields},
+            )
+
+    namespace: Final[dict[str, Any]] = {
+        "__copy__": _copy,
+        "__deepcopy__": _copy,
+        "__init__": __init__,
+        "__module__": cls.__module__,
+        "__qualname__": f"Frozen{cls.__qualname__}",
+        "__reduce__": __reduce__,
+        "__setattr__": _setattr,
+        "__slots__": ("__weakref__", "_sealed"),
+        "_watchable": False,
+    }
+    if issubclass(cls, MutableSequence):
+        for name in _CONTAINER_METHODS:
+            namespace[name] = _blocked(name)
+    # Created through the metaclass of cls, which is ABCMeta for every part, rather than type
+    metaclass: Final[type[type]] = type(cls)
+    frozen: Final[type[BasePart]] = metaclass(
+        f"Frozen{cls.__name__}", (Frozen, cls), namespace
+    )
+    _frozen_types[cls] = frozen
+    _original_types[frozen] = cls
+    return frozen
+
+
+def _make(
+    cls: type[BasePart], args: tuple[Any, ...], kwargs: dict[str, Any], /
+) -> BasePart:
+    return _frozen_type(cls)(*args, **kwargs)
+
+
+def _setattr(self: BasePart, name: str, value: Any, /) -> None:
+    if hasattr(self, "_sealed") and not name.startswith("__"):
+        raise AttributeError(f"{type(self).__name__} is frozen")
+    object.__setattr__(self, name, value)
+
+
+def freeze(part: _P, /) -> _P:
+    """A frozen copy of part, or part itself if it is already frozen."""
+    return part if isinstance(part, Frozen) else _frozen_copy(part, freeze)  # type: ignore[return-value]
+
+
+def thaw(part: _P, /) -> _P:
+    """A copy of part that can be modified, whether or not part is frozen."""
+    return _from_record(*_record(part))  # type: ignore[return-value]
+
+
+class Interner:
+    """Table of frozen parts, so that equal parts loaded from any number of stages share one object.
+    Parts are only kept while something else refers to them.
+    Sharing only happens between stages: intern_all keeps equal parts within one stage as separate objects, so interning a stage does not change what it contains.
+    """
+
+    __slots__ = ("_parts",)
+
+    _parts: "WeakValueDictionary[tuple[Any, ...], BasePart]"
+
+    def __init__(self) -> None:
+        self._parts = WeakValueDictionary()
+
+    def intern(self, part: _P, /) -> _P:
+        """The frozen part in this table that is equal to part, which is added if there is none."""
+        record: Final[tuple[Any, ...]] = _record(part)
+        try:
+            return self._parts[record]  # type: ignore[return-value]
+        except KeyError:
+            frozen: Final[BasePart] = (
+                part if isinstance(part, Frozen) else _frozen_copy(part, self.intern)
+            )
+            self._parts[record] = frozen
+            return frozen  # type: ignore[return-value]
+
+    def intern_all(self, parts: Iterable[_P], /) -> list[_P]:
+        """Frozen copies of the parts of one stage, shared with other stages where possible.
+        The first of a group of equal parts is interned, and the others are given frozen copies of their own.
+        """
+        seen: Final[set[tuple[Any, ...]]] = set()
+        result: Final[list[_P]] = []
+        for part in parts:
+            record: tuple[Any, ...] = _record(part)
+            if record in seen:
+                result.append(_frozen_copy(part, self.intern))  # type: ignore[arg-type]
+            else:
+                seen.add(record)
+                result.append(self.intern(part))
+        return result
+
+    def __len__(self) -> int:
+        return len(self._parts)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
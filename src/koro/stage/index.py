@@ -0,0 +1,312 @@
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from itertools import product
+from math import floor
+from typing import Final, Protocol
+from warnings import warn
+
+from .model import DecorationModel, DeviceModel, PartModel
+from .part import (
+    BasePart,
+    Goal,
+    Magnet,
+    MagnetSegment,
+    Part,
+    Start,
+    ToyTrain,
+    TrainTrack,
+    Warp,
+    _anmtype,
+    _base_type,
+)
+
+__all__ = ["SpatialIndex", "TypeIndex"]
+
+
+def _model(part: BasePart, /) -> PartModel | DecorationModel | DeviceModel | None:
+    """The model that part is shown with, as written to the model element of its XML.
+    Magnets are shown as their segments, so they have no model of their own.
+    """
+    if isinstance(part, (MagnetSegment, Part, TrainTrack)):
+        return part.shape
+    elif isinstance(part, Start):
+        return DeviceModel.Start
+    elif isinstance(part, Goal):
+        return DeviceModel.Goal
+    elif isinstance(part, Magnet):
+        return None
+    elif isinstance(part, ToyTrain):
+        return DeviceModel.ToyTrain
+    elif isinstance(part, Warp):
+        return DeviceModel.Warp
+    else:
+        try:
+            return _anmtype(part)
+        except ValueError:
+            return None
+
+
+def _position(part: BasePart, /) -> tuple[float, float, float] | None:
+    try:
+        return part.x_pos, part.y_pos, part.z_pos
+    except IndexError:
+        # Empty magnets do not have a position.
+        return None
+
+
+class _Tracker(Protocol):
+    """Private interface of the indexes that a Stage keeps up to date."""
+
+    def _add(self, part: BasePart, /) -> None:
+        pass
+
+    def _build(self, parts: Iterable[BasePart], /) -> None:
+        pass
+
+    def _changed(self, part: BasePart, /) -> None:
+        pass
+
+    def _discard(self, part: BasePart, /) -> None:
+        pass
+
+
+class _CostTracker:
+    """Running total of the cost of the parts in a stage, checked against an optional budget."""
+
+    __slots__ = ("_costs", "budget", "strict", "total")
+
+    _costs: dict[BasePart, int]
+    budget: int | None
+    strict: bool
+    total: int
+
+    def __init__(self) -> None:
+        self._costs = {}
+        self.budget = None
+        self.strict = False
+        self.total = 0
+
+    def _add(self, part: BasePart, /) -> None:
+        cost: Final[int] = part.cost
+        self._costs[part] = cost
+        self.total += cost
+
+    def _build(self, parts: Iterable[BasePart], /) -> None:
+        self._costs = {part: part.cost for part in parts}
+        self.total = sum(self._costs.values())
+
+    def _changed(self, part: BasePart, /) -> None:
+        cost: Final[int] = part.cost
+        self.check(cost - self._costs[part])
+        self.total += cost - self._costs[part]
+        self._costs[part] = cost
+
+    def check(self, increase: int, /) -> None:
+        """Reject or warn about an increase in cost that would go over budget."""
+        if (
+            self.budget is not None
+            and increase > 0
+            and self.total + increase > self.budget
+        ):
+            message: Final[str] = (
+                f"total cost of {self.total + increase} would exceed budget of {self.budget}"
+            )
+            if self.strict:
+                raise ValueError(message)
+            else:
+                warn(message, RuntimeWarning)
+
+    def _discard(self, part: BasePart, /) -> None:
+        self.total -= self._costs.pop(part)
+
+
+class SpatialIndex:
+    """Uniform grid over the positions of the parts in a stage, kept up to date as parts are added, removed and moved.
+    To use one, assign it to Stage.spatial_index. An index can only belong to one stage at a time.
+    """
+
+    __match_args__ = ("cell_size",)
+    __slots__ = ("_cell_size", "_cells", "_locations")
+
+    _cell_size: float
+    _cells: dict[tuple[int, int, int], set[BasePart]]
+    _locations: dict[BasePart, tuple[tuple[int, int, int], float, float, float]]
+
+    def __init__(self, cell_size: float = 40.0) -> None:
+        """Queries are fastest when cell_size is close to the distances being searched for."""
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self._cell_size = cell_size
+        self._cells = {}
+        self._locations = {}
+
+    def _add(self, part: BasePart, /) -> None:
+        position: Final = _position(part)
+        if position is not None:
+            x, y, z = position
+            cell: Final = self._cell(x, y, z)
+            self._cells.setdefault(cell, set()).add(part)
+            self._locations[part] = cell, x, y, z
+
+    def _build(self, parts: Iterable[BasePart], /) -> None:
+        self._cells.clear()
+        self._locations.clear()
+        for part in parts:
+            self._add(part)
+
+    def _cell(self, x: float, y: float, z: float, /) -> tuple[int, int, int]:
+        return (
+            floor(x / self._cell_size),
+            floor(y / self._cell_size),
+            floor(z / self._cell_size),
+        )
+
+    @property
+    def cell_size(self) -> float:
+        return self._cell_size
+
+    def _cells_between(
+        self,
+        low: tuple[int, int, int],
+        high: tuple[int, int, int],
+        /,
+    ) -> Iterator[set[BasePart]]:
+        """The occupied cells in the inclusive range from low to high."""
+        if (high[0] - low[0] + 1) * (high[1] - low[1] + 1) * (
+            high[2] - low[2] + 1
+        ) > len(self._cells):
+            for cell, parts in self._cells.items():
+                if (
+                    low[0] <= cell[0] <= high[0]
+                    and low[1] <= cell[1] <= high[1]
+                    and low[2] <= cell[2] <= high[2]
+                ):
+                    yield parts
+        else:
+            for cell in product(
+                range(low[0], high[0] + 1),
+                range(low[1], high[1] + 1),
+                range(low[2], high[2] + 1),
+            ):
+                occupied: set[BasePart] | None = self._cells.get(cell)
+                if occupied is not None:
+                    yield occupied
+
+    def _changed(self, part: BasePart, /) -> None:
+        self._discard(part)
+        self._add(part)
+
+    def _discard(self, part: BasePart, /) -> None:
+        location: Final = self._locations.pop(part, None)
+        if location is not None:
+            parts: Final = self._cells[location[0]]
+            parts.discard(part)
+            if not parts:
+                del self._cells[location[0]]
+
+    def in_box(
+        self,
+        x_min: float,
+        y_min: float,
+        z_min: float,
+        x_max: float,
+        y_max: float,
+        z_max: float,
+        /,
+    ) -> set[BasePart]:
+        """The parts whose positions are inside the given box, including its boundary."""
+        result: Final[set[BasePart]] = set()
+        for parts in self._cells_between(
+            self._cell(x_min, y_min, z_min), self._cell(x_max, y_max, z_max)
+        ):
+            for part in parts:
+                _, x, y, z = self._locations[part]
+                if x_min <= x <= x_max and y_min <= y <= y_max and z_min <= z <= z_max:
+                    result.add(part)
+        return result
+
+    def near(self, x: float, y: float, z: float, r: float, /) -> set[BasePart]:
+        """The parts whose positions are no further than r from (x, y, z)."""
+        result: Final[set[BasePart]] = set()
+        for parts in self._cells_between(
+            self._cell(x - r, y - r, z - r), self._cell(x + r, y + r, z + r)
+        ):
+            for part in parts:
+                _, px, py, pz = self._locations[part]
+                if (px - x) ** 2 + (py - y) ** 2 + (pz - z) ** 2 <= r * r:
+                    result.add(part)
+        return result
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.cell_size!r})"
+
+
+class TypeIndex:
+    """Sets of the parts in a stage grouped by class and by model, kept up to date as parts are added, removed and changed.
+    A part's model is the one that the game shows it with, so devices are included, and moving tiles are grouped apart from static tiles of the same shape.
+    To use one, assign it to Stage.type_index. An index can only belong to one stage at a time.
+    """
+
+    __slots__ = ("_by_model", "_by_type", "_models")
+
+    _by_model: dict[PartModel | DecorationModel | DeviceModel, set[BasePart]]
+    _by_type: dict[type[BasePart], set[BasePart]]
+    _models: dict[BasePart, PartModel | DecorationModel | DeviceModel]
+
+    def __init__(self) -> None:
+        self._by_model = {}
+        self._by_type = {}
+        self._models = {}
+
+    def _add(self, part: BasePart, /) -> None:
+        self._by_type.setdefault(_base_type(part), set()).add(part)
+        model: Final = _model(part)
+        if model is not None:
+            self._by_model.setdefault(model, set()).add(part)
+            self._models[part] = model
+
+    def _build(self, parts: Iterable[BasePart], /) -> None:
+        self._by_model.clear()
+        self._by_type.clear()
+        self._models.clear()
+        for part in parts:
+            self._add(part)
+
+    def _changed(self, part: BasePart, /) -> None:
+        if _model(part) is not self._models.get(part):
+            self._discard(part)
+            self._add(part)
+
+    def count_by_model(self) -> Counter[PartModel | DecorationModel | DeviceModel]:
+        """The number of parts with each model."""
+        return Counter({model: len(parts) for model, parts in self._by_model.items()})
+
+    def _discard(self, part: BasePart, /) -> None:
+        kind: Final = _base_type(part)
+        parts: set[BasePart] = self._by_type[kind]
+        parts.discard(part)
+        if not parts:
+            del self._by_type[kind]
+        model: Final = self._models.pop(part, None)
+        if model is not None:
+            parts = self._by_model[model]
+            parts.discard(part)
+            if not parts:
+                del self._by_model[model]
+
+    def of_type(self, cls: type[BasePart], /) -> set[BasePart]:
+        """The parts that are instances of cls."""
+        result: Final[set[BasePart]] = set()
+        for kind, parts in self._by_type.items():
+            if issubclass(kind, cls):
+                result.update(parts)
+        return result
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+    def with_model(
+        self, model: PartModel | DecorationModel | DeviceModel, /
+    ) -> set[BasePart]:
+        """The parts shown with model."""
+        return set(self._by_model.get(model, ()))
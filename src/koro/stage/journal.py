@@ -0,0 +1,85 @@
+from collections.abc import Iterable, Iterator
+from typing import Literal
+
+from .part import BasePart
+
+__all__ = ["Journal"]
+
+
+class Journal:
+    """Record of the changes made to a stage, in order.
+    To use one, assign it to Stage.journal. A journal can only belong to one stage at a time.
+    Each entry is a pair of an event and the part that it applies to. The event is "add" or "discard" when the part is added to or removed from the stage, or "change" when the part, or a magnet segment or toy train track in it, is modified.
+    Entries are numbered by position from the last time the journal was cleared. Readers remember the position that they have read up to, and trim the entries before it once they are no longer needed, so that the journal does not keep every part it has seen alive.
+    """
+
+    __slots__ = ("_entries", "_generation", "_start")
+
+    _entries: list[tuple[Literal["add", "change", "discard"], BasePart]]
+    _generation: int
+    _start: int
+
+    def __init__(self) -> None:
+        self._entries = []
+        self._generation = 0
+        self._start = 0
+
+    def _add(self, part: BasePart, /) -> None:
+        self._entries.append(("add", part))
+
+    def _build(self, parts: Iterable[BasePart], /) -> None:
+        """Parts already in the stage are not recorded."""
+
+    def _changed(self, part: BasePart, /) -> None:
+        self._entries.append(("change", part))
+
+    def clear(self) -> None:
+        """Forget every entry and start numbering positions from 0 again, in a new generation."""
+        self._entries.clear()
+        self._generation += 1
+        self._start = 0
+
+    def _discard(self, part: BasePart, /) -> None:
+        self._entries.append(("discard", part))
+
+    @property
+    def generation(self) -> int:
+        """Incremented by every call to clear, so that a reader can tell that the positions it holds no longer refer to the same entries."""
+        return self._generation
+
+    def __iter__(
+        self,
+    ) -> Iterator[tuple[Literal["add", "change", "discard"], BasePart]]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        """The number of entries held, which excludes those that were trimmed."""
+        return len(self._entries)
+
+    @property
+    def position(self) -> int:
+        """The position after the last entry, counting entries that were trimmed."""
+        return self._start + len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+    def since(
+        self, position: int, /
+    ) -> list[tuple[Literal["add", "change", "discard"], BasePart]]:
+        """The entries from the given position onwards."""
+        if position < self._start:
+            raise ValueError("entries before the start of the journal were trimmed")
+        return self._entries[position - self._start :]
+
+    @property
+    def start(self) -> int:
+        """The position of the first entry held; the entries before it were trimmed."""
+        return self._start
+
+    def trim(self, position: int, /) -> None:
+        """Forget the entries before the given position, releasing the parts that they refer to."""
+        position = min(position, self.position)
+        if position > self._start:
+            del self._entries[: position - self._start]
+            self._start = position
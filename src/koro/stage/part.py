@@ -1,11 +1,23 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Iterable, MutableSequence
+from collections.abc import Callable, Iterable, MutableSequence
+from contextlib import contextmanager
 from enum import Enum, Flag, unique
+from functools import wraps
 from operator import index
 from sys import maxsize
-from typing import Any, Final, Iterator, Literal, Self, SupportsIndex, overload
+from typing import (
+    Any,
+    ClassVar,
+    Final,
+    Iterator,
+    Literal,
+    Self,
+    SupportsIndex,
+    TypeVar,
+    overload,
+)
 
 from .model import DecorationModel, DeviceModel, PartModel
 
@@ -51,13 +63,99 @@ __all__ = [
     "Warp",
 ]
 
+_PIPES: Final[frozenset[PartModel]] = frozenset(
+    {PartModel.FunnelPipe, PartModel.StraightPipe}
+)
+_SPECIAL_TILES: Final[frozenset[PartModel]] = frozenset(
+    {
+        PartModel.MagmaTile,
+        PartModel.SlipperyTile,
+        PartModel.StickyTile,
+        PartModel.InvisibleTile,
+    }
+)
+"""Tiles that cost more than other parts."""
+_WALL_SHAPES: Final[frozenset[PartModel]] = frozenset(
+    {PartModel.Tile20x20, PartModel.TileA30x30}
+)
+"""Moving tile shapes that walls can be attached to."""
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+
+def _reported(setter: _F, /) -> _F:
+    """Make a property setter notify the part's watchers, undoing the change if one of them raises; see _watch.
+    Unwatched parts only pay for one attribute lookup.
+    """
+
+    @wraps(setter)
+    def wrapper(self: BasePart, value: Any, /) -> None:
+        if self._watchers is None:
+            setter(self, value)
+            return
+        old: Final = getattr(self, setter.__name__)
+        setter(self, value)
+        try:
+            _notify(self)
+        except BaseException:
+            setter(self, old)
+            _notify(self)
+            raise
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _reported_items(method: _F, /) -> _F:
+    """Make a method that changes which parts a Magnet or ToyTrain contains watch the new parts and notify the container's watchers once, undoing the change if one of them raises; see _watch."""
+
+    @wraps(method)
+    def wrapper(self: Any, /, *args: Any) -> Any:
+        if self._watchers is None:
+            return method(self, *args)
+        before: Final[list[BasePart]] = list(self)
+        with _unreported(self):
+            result: Final = method(self, *args)
+        try:
+            _rewatch(self, before)
+            _notify(self)
+        except BaseException:
+            after: Final[list[BasePart]] = list(self)
+            with _unreported(self):
+                self[:] = before
+            _rewatch(self, after)
+            _notify(self)
+            raise
+        return result
+
+    return wrapper  # type: ignore[return-value]
+
 
 class BasePart(ABC):
     """Base class for all stage elements"""
 
     __match_args__ = ("x_pos", "y_pos", "z_pos", "x_rot", "y_rot", "z_rot")
-    __slots__ = ("_x_pos", "_x_rot", "_y_pos", "_y_rot", "_z_pos", "_z_rot")
+    __slots__ = (
+        "_watchers",
+        "_x_pos",
+        "_x_rot",
+        "_y_pos",
+        "_y_rot",
+        "_z_pos",
+        "_z_rot",
+    )
+    _fields: ClassVar[tuple[str, ...]] = ()
+    """Names of the keyword-only constructor arguments, which are also the names of the corresponding properties."""
+    _points: ClassVar[tuple[tuple[str, str, str], ...]] = (("x_pos", "y_pos", "z_pos"),)
+    """Names of the properties holding the coordinates of each point in the stage that this part refers to."""
+    _rotations: ClassVar[tuple[tuple[str, str, str], ...]] = (
+        ("x_rot", "y_rot", "z_rot"),
+    )
+    """Names of the properties holding each orientation of this part."""
+    _watchable: ClassVar[bool] = True
+    """Unset for parts that can never change, such as frozen parts, which _watch leaves alone."""
 
+    _watchers: list[Callable[[BasePart], object] | BasePart] | None
+    """None unless the part is watched; see _watch."""
     _x_pos: float
     _x_rot: float
     _y_pos: float
@@ -86,6 +184,50 @@ class BasePart(ABC):
     def cost(self) -> int:
         """The number of kororin points that this part costs to place."""
 
+    @classmethod
+    def _from_fields(
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        /,
+    ) -> Self:
+        """Create a part from its position, its rotation and then the values of the properties named by _fields, bypassing the property setters.
+        Nothing is validated or normalized, so the values must be ones that a part could hold, such as those read from another part: rotations must already be in [0, 360), speeds must be numbers rather than Speed members, and so on.
+        """
+        self: Final[Self] = cls.__new__(cls)
+        self._x_pos = x_pos
+        self._y_pos = y_pos
+        self._z_pos = z_pos
+        self._x_rot = x_rot
+        self._y_rot = y_rot
+        self._z_rot = z_rot
+        return self
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> Self:
+        self: Final[Self] = super().__new__(cls)
+        self._watchers = None
+        return self
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickles and copies hold the class and values of a part, rather than a dictionary of its slots."""
+        return (
+            _from_record,
+            (
+                _base_type(self),
+                self._x_pos,
+                self._y_pos,
+                self._z_pos,
+                self._x_rot,
+                self._y_rot,
+                self._z_rot,
+                *[getattr(self, name) for name in self._fields],
+            ),
+        )
+
     def __repr__(self) -> str:
         return f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r})"
 
@@ -95,6 +237,7 @@ class BasePart(ABC):
         return self._x_pos
 
     @x_pos.setter
+    @_reported
     def x_pos(self, value: float, /) -> None:
         self._x_pos = value
 
@@ -106,6 +249,7 @@ class BasePart(ABC):
         return self._x_rot
 
     @x_rot.setter
+    @_reported
     def x_rot(self, value: float, /) -> None:
         self._x_rot = value % 360
 
@@ -115,6 +259,7 @@ class BasePart(ABC):
         return self._y_pos
 
     @y_pos.setter
+    @_reported
     def y_pos(self, value: float, /) -> None:
         self._y_pos = value
 
@@ -126,6 +271,7 @@ class BasePart(ABC):
         return self._y_rot
 
     @y_rot.setter
+    @_reported
     def y_rot(self, value: float, /) -> None:
         self._y_rot = value % 360
 
@@ -135,6 +281,7 @@ class BasePart(ABC):
         return self._z_pos
 
     @z_pos.setter
+    @_reported
     def z_pos(self, value: float, /) -> None:
         self._z_pos = value
 
@@ -146,6 +293,7 @@ class BasePart(ABC):
         return self._z_rot
 
     @z_rot.setter
+    @_reported
     def z_rot(self, value: float, /) -> None:
         self._z_rot = value % 360
 
@@ -154,6 +302,7 @@ class Part(BasePart):
     """(Usually) static model that has no behavior other than being solid."""
 
     __slots__ = ("_shape",)
+    _fields = ("shape",)
 
     _shape: PartModel | DecorationModel
 
@@ -175,23 +324,35 @@ class Part(BasePart):
     def cost(self) -> Literal[10, 15, 20]:
         if isinstance(self.shape, DecorationModel):
             return 20
-        elif self.shape in frozenset(
-            {
-                PartModel.MagmaTile,
-                PartModel.SlipperyTile,
-                PartModel.StickyTile,
-                PartModel.InvisibleTile,
-            }
-        ):
+        elif self.shape in _SPECIAL_TILES:
             return 15
         else:
             return 10
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        shape: PartModel | DecorationModel,
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._shape = shape
+        return self
+
     @property
     def shape(self) -> PartModel | DecorationModel:
         return self._shape
 
     @shape.setter
+    @_reported
     def shape(self, value: PartModel | DecorationModel, /) -> None:
         self._shape = value
 
@@ -219,6 +380,7 @@ class ProgressMarker(BasePart):
     """Either a crystal (when progress is odd) or a respawn (when progress is even)"""
 
     __slots__ = ("_progress",)
+    _fields = ("progress",)
 
     _progress: Literal[1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
 
@@ -240,12 +402,31 @@ class ProgressMarker(BasePart):
     def cost(self) -> Literal[15, 0]:
         return 15 if self.progress & 1 else 0
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        progress: Literal[1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._progress = progress
+        return self
+
     @property
     def progress(self) -> Literal[1, 2, 3, 4, 5, 6, 7, 8, 9, 10]:
         """The number displayed above the object. Controls which crystals are required to enable a respawn."""
         return self._progress
 
     @progress.setter
+    @_reported
     def progress(self, value: Literal[1, 2, 3, 4, 5, 6, 7, 8, 9, 10], /):
         self._progress = value
 
@@ -280,6 +461,19 @@ class MovingTile(BasePart):
         "_switch",
         "_walls",
     )
+    _fields = (
+        "dest_x",
+        "dest_y",
+        "dest_z",
+        "shape",
+        "speed",
+        "switch",
+        "walls",
+    )
+    _points = (
+        ("x_pos", "y_pos", "z_pos"),
+        ("dest_x", "dest_y", "dest_z"),
+    )
 
     _dest_x: float
     _dest_y: float
@@ -355,6 +549,7 @@ class MovingTile(BasePart):
         return self._dest_x
 
     @dest_x.setter
+    @_reported
     def dest_x(self, value: float, /) -> None:
         self._dest_x = value
 
@@ -363,6 +558,7 @@ class MovingTile(BasePart):
         return self._dest_y
 
     @dest_y.setter
+    @_reported
     def dest_y(self, value: float, /) -> None:
         """Positive is up, negative is down"""
         self._dest_y = value
@@ -373,9 +569,49 @@ class MovingTile(BasePart):
         return self._dest_z
 
     @dest_z.setter
+    @_reported
     def dest_z(self, value: float, /) -> None:
         self._dest_z = value
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        dest_x: float,
+        dest_y: float,
+        dest_z: float,
+        shape: Literal[
+            PartModel.Tile10x10,
+            PartModel.Tile20x20,
+            PartModel.TileA30x30,
+            PartModel.TileA30x90,
+            PartModel.Tile90x90,
+            PartModel.HoleB90x90,
+            PartModel.FunnelPipe,
+            PartModel.StraightPipe,
+        ],
+        speed: float,
+        switch: bool,
+        walls: Walls,
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._dest_x = dest_x
+        self._dest_y = dest_y
+        self._dest_z = dest_z
+        self._shape = shape
+        self._speed = speed
+        self._switch = switch
+        self._walls = walls
+        return self
+
     def __repr__(self) -> str:
         output: Final[list[str]] = [
             f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, dest_x={self.dest_x!r}, dest_y={self.dest_y!r}, dest_z={self.dest_z!r}, shape={self.shape!r}"
@@ -406,6 +642,7 @@ class MovingTile(BasePart):
         return self._shape
 
     @shape.setter
+    @_reported
     def shape(
         self,
         value: Literal[
@@ -420,15 +657,9 @@ class MovingTile(BasePart):
         ],
         /,
     ) -> None:
-        if (
-            value in frozenset({PartModel.FunnelPipe, PartModel.StraightPipe})
-            and self.switch
-        ):
+        if value in _PIPES and self.switch:
             raise ValueError("Moving pipes cannot be switches")
-        elif (
-            value not in frozenset({PartModel.Tile20x20, PartModel.TileA30x30})
-            and self.walls
-        ):
+        elif value not in _WALL_SHAPES and self.walls:
             raise ValueError("Invalid shape for wall attachment")
         else:
             self._shape = value
@@ -438,14 +669,15 @@ class MovingTile(BasePart):
         return self._speed
 
     @speed.setter
+    @_reported
     def speed(self, value: Speed | float, /) -> None:
         match value:
             case Speed.SLOW:
-                self.speed = 0.5
+                self._speed = 0.5
             case Speed.NORMAL:
-                self.speed = 1.0
+                self._speed = 1.0
             case Speed.FAST:
-                self.speed = 1.5
+                self._speed = 1.5
             case _:
                 self._speed = value
 
@@ -455,10 +687,9 @@ class MovingTile(BasePart):
         return self._switch
 
     @switch.setter
+    @_reported
     def switch(self, value: bool, /) -> None:
-        if value and self.shape in frozenset(
-            {PartModel.FunnelPipe, PartModel.StraightPipe}
-        ):
+        if value and self.shape in _PIPES:
             raise ValueError("Moving pipes cannot be switches")
         else:
             self._switch = value
@@ -468,10 +699,9 @@ class MovingTile(BasePart):
         return self._walls
 
     @walls.setter
+    @_reported
     def walls(self, value: Walls, /) -> None:
-        if not value or self.shape in frozenset(
-            {PartModel.Tile20x20, PartModel.TileA30x30}
-        ):
+        if not value or self.shape in _WALL_SHAPES:
             self._walls = value
         else:
             raise ValueError("Invalid shape for wall attachment")
@@ -481,6 +711,7 @@ class FixedSpeedDevice(BasePart, ABC):
     """Device template for devices with speeds that can be set to Slow, Normal, or Fast"""
 
     __slots__ = ("_speed",)
+    _fields: ClassVar[tuple[str, ...]] = ("speed",)
 
     _speed: Speed
 
@@ -498,6 +729,24 @@ class FixedSpeedDevice(BasePart, ABC):
         super().__init__(x_pos, y_pos, z_pos, x_rot, y_rot, z_rot)
         self.speed = speed
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        speed: Speed,
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._speed = speed
+        return self
+
     def __repr__(self) -> str:
         return (
             f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, speed={self.speed!r})"
@@ -510,12 +759,14 @@ class FixedSpeedDevice(BasePart, ABC):
         return self._speed
 
     @speed.setter
+    @_reported
     def speed(self, value: Speed, /) -> None:
         self._speed = value
 
 
 class MovingCurve(FixedSpeedDevice):
     __slots__ = ("_shape",)
+    _fields = ("shape", "speed")
 
     _shape: Literal[PartModel.CurveS, PartModel.CurveM, PartModel.CurveL]
 
@@ -538,6 +789,25 @@ class MovingCurve(FixedSpeedDevice):
     def cost(self) -> Literal[25]:
         return 25
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        shape: Literal[PartModel.CurveS, PartModel.CurveM, PartModel.CurveL],
+        speed: Speed,
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot, speed
+        )
+        self._shape = shape
+        return self
+
     def __repr__(self) -> str:
         return (
             f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, shape={self.shape!r}, speed={self.speed!r})"
@@ -550,6 +820,7 @@ class MovingCurve(FixedSpeedDevice):
         return self._shape
 
     @shape.setter
+    @_reported
     def shape(
         self, value: Literal[PartModel.CurveS, PartModel.CurveM, PartModel.CurveL], /
     ) -> None:
@@ -566,6 +837,7 @@ class SlidingTile(BasePart):
 
 class ConveyorBelt(BasePart):
     __slots__ = ("_reversing",)
+    _fields = ("reversing",)
 
     _reversing: bool
 
@@ -587,6 +859,24 @@ class ConveyorBelt(BasePart):
     def cost(self) -> Literal[60]:
         return 60
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        reversing: bool,
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._reversing = reversing
+        return self
+
     def __repr__(self) -> str:
         return (
             f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, reversing={self.reversing!r})"
@@ -599,12 +889,14 @@ class ConveyorBelt(BasePart):
         return self._reversing
 
     @reversing.setter
+    @_reported
     def reversing(self, value: bool, /) -> None:
         self._reversing = value
 
 
 class MagnetSegment(BasePart):
     __slots__ = ("_shape",)
+    _fields = ("shape",)
 
     _shape: Literal[
         DeviceModel.EndMagnet,
@@ -636,6 +928,29 @@ class MagnetSegment(BasePart):
     def cost(self) -> Literal[15]:
         return 15
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        shape: Literal[
+            DeviceModel.EndMagnet,
+            DeviceModel.StraightMagnet,
+            DeviceModel.CurveMagnetL,
+            DeviceModel.CurveMagnetS,
+        ],
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._shape = shape
+        return self
+
     def __repr__(self) -> str:
         return f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, shape={self.shape!r})"
 
@@ -649,6 +964,7 @@ class MagnetSegment(BasePart):
         return self._shape
 
     @shape.setter
+    @_reported
     def shape(
         self,
         value: Literal[
@@ -664,15 +980,19 @@ class MagnetSegment(BasePart):
 
 class Magnet(BasePart, MutableSequence[MagnetSegment]):
     __slots__ = ("_segments",)
+    _points = ()
+    _rotations = ()
 
     _segments: list[MagnetSegment]
 
     def __init__(self, iterable: Iterable[MagnetSegment] = (), /) -> None:
         self._segments = list(iterable)
 
+    @_reported_items
     def append(self, value: MagnetSegment) -> None:
         return self._segments.append(value)
 
+    @_reported_items
     def clear(self) -> None:
         self._segments.clear()
 
@@ -686,12 +1006,21 @@ class Magnet(BasePart, MutableSequence[MagnetSegment]):
     def count(self, value: Any) -> int:
         return self._segments.count(value)
 
+    @_reported_items
     def __delitem__(self, index: SupportsIndex | slice, /) -> None:
         del self._segments[index]
 
+    @_reported_items
     def extend(self, iterable: Iterable[MagnetSegment], /) -> None:
         self._segments.extend(iterable)
 
+    @classmethod
+    def _from_fields(cls, segments: Iterable[tuple[Any, ...]], /) -> Self:  # type: ignore[override]
+        """Create a magnet from the values of each of its segments, as taken by MagnetSegment._from_fields."""
+        self: Final[Self] = cls.__new__(cls)
+        self._segments = [MagnetSegment._from_fields(*segment) for segment in segments]
+        return self
+
     @overload
     def __getitem__(self, index: SupportsIndex, /) -> MagnetSegment:
         pass
@@ -705,6 +1034,7 @@ class Magnet(BasePart, MutableSequence[MagnetSegment]):
     ) -> MagnetSegment | MutableSequence[MagnetSegment]:
         return self._segments[index]
 
+    @_reported_items
     def __iadd__(self, value: Iterable[MagnetSegment], /) -> Self:
         self._segments += value
         return self
@@ -714,6 +1044,7 @@ class Magnet(BasePart, MutableSequence[MagnetSegment]):
     ) -> int:
         return self._segments.index(value, start, stop)
 
+    @_reported_items
     def insert(self, index: SupportsIndex, value: MagnetSegment, /) -> None:
         return self._segments.insert(index, value)
 
@@ -723,15 +1054,21 @@ class Magnet(BasePart, MutableSequence[MagnetSegment]):
     def __len__(self) -> int:
         return len(self._segments)
 
+    @_reported_items
     def pop(self, index: SupportsIndex = -1, /) -> MagnetSegment:
         return self._segments.pop(index)
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        return _from_record, _record(self)
+
+    @_reported_items
     def remove(self, value: MagnetSegment, /) -> None:
         self._segments.remove(value)
 
     def __repr__(self) -> str:
         return f"{type(self).__name__}({self._segments!r})"
 
+    @_reported_items
     def reverse(self) -> None:
         self._segments.reverse()
 
@@ -746,6 +1083,7 @@ class Magnet(BasePart, MutableSequence[MagnetSegment]):
     def __setitem__(self, slice: slice, value: Iterable[MagnetSegment], /) -> None:
         pass
 
+    @_reported_items
     def __setitem__(
         self,
         index: SupportsIndex | slice,
@@ -832,6 +1170,7 @@ class Magnet(BasePart, MutableSequence[MagnetSegment]):
 
 class DashTunnel(BasePart):
     __slots__ = ("_shape",)
+    _fields = ("shape",)
 
     _shape: Literal[DeviceModel.DashTunnelA, DeviceModel.DashTunnelB]
 
@@ -857,6 +1196,24 @@ class DashTunnel(BasePart):
             case DeviceModel.DashTunnelB:
                 return 100
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        shape: Literal[DeviceModel.DashTunnelA, DeviceModel.DashTunnelB],
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._shape = shape
+        return self
+
     def __repr__(self) -> str:
         return f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, shape={self.shape!r})"
 
@@ -865,6 +1222,7 @@ class DashTunnel(BasePart):
         return self._shape
 
     @shape.setter
+    @_reported
     def shape(
         self, value: Literal[DeviceModel.DashTunnelA, DeviceModel.DashTunnelB], /
     ) -> None:
@@ -873,6 +1231,7 @@ class DashTunnel(BasePart):
 
 class SeesawBlock(BasePart):
     __slots__ = ("_auto", "_shape")
+    _fields = ("auto", "shape")
 
     _auto: bool
     _shape: Literal[DeviceModel.SeesawLBlock, DeviceModel.SeesawIBlock]
@@ -898,6 +1257,7 @@ class SeesawBlock(BasePart):
         return self._auto
 
     @auto.setter
+    @_reported
     def auto(self, value: bool, /) -> None:
         self._auto = value
 
@@ -905,6 +1265,26 @@ class SeesawBlock(BasePart):
     def cost(self) -> Literal[100]:
         return 100
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        auto: bool,
+        shape: Literal[DeviceModel.SeesawLBlock, DeviceModel.SeesawIBlock],
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._auto = auto
+        self._shape = shape
+        return self
+
     def __repr__(self) -> str:
         return (
             f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, auto={self.auto!r}, shape={self.shape!r})"
@@ -917,6 +1297,7 @@ class SeesawBlock(BasePart):
         return self._shape
 
     @shape.setter
+    @_reported
     def shape(
         self, value: Literal[DeviceModel.SeesawLBlock, DeviceModel.SeesawIBlock], /
     ) -> None:
@@ -949,6 +1330,7 @@ class Turntable(FixedSpeedDevice):
 
 class Bumper(BasePart):
     __slots__ = ("_powerful",)
+    _fields = ("powerful",)
 
     _powerful: bool
 
@@ -970,11 +1352,30 @@ class Bumper(BasePart):
     def cost(self) -> Literal[20]:
         return 20
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        powerful: bool,
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._powerful = powerful
+        return self
+
     @property
     def powerful(self) -> bool:
         return self._powerful
 
     @powerful.setter
+    @_reported
     def powerful(self, value: bool, /) -> None:
         self._powerful = value
 
@@ -1004,6 +1405,7 @@ class Gear(FixedSpeedDevice):
 
 class Fan(BasePart):
     __slots__ = ("_wind_pattern",)
+    _fields = ("wind_pattern",)
 
     _wind_pattern: Literal[
         DeviceModel.Fan, DeviceModel.PowerfulFan, DeviceModel.TimerFan
@@ -1029,6 +1431,26 @@ class Fan(BasePart):
     def cost(self) -> Literal[50]:
         return 50
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        wind_pattern: Literal[
+            DeviceModel.Fan, DeviceModel.PowerfulFan, DeviceModel.TimerFan
+        ],
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._wind_pattern = wind_pattern
+        return self
+
     def __repr__(self) -> str:
         return (
             f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, wind_pattern={self.wind_pattern!r})"
@@ -1043,6 +1465,7 @@ class Fan(BasePart):
         return self._wind_pattern
 
     @wind_pattern.setter
+    @_reported
     def wind_pattern(
         self,
         value: Literal[DeviceModel.Fan, DeviceModel.PowerfulFan, DeviceModel.TimerFan],
@@ -1070,6 +1493,7 @@ class TimedDevice(BasePart, ABC):
     """Device Template for devices which can have one of three timings for their movements"""
 
     __slots__ = ("_timing",)
+    _fields = ("timing",)
 
     _timing: MovementTiming
 
@@ -1087,6 +1511,24 @@ class TimedDevice(BasePart, ABC):
         super().__init__(x_pos, y_pos, z_pos, x_rot, y_rot, z_rot)
         self.timing = timing
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        timing: MovementTiming,
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._timing = timing
+        return self
+
     def __repr__(self) -> str:
         return f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, timing={self.timing!r})"
 
@@ -1095,6 +1537,7 @@ class TimedDevice(BasePart, ABC):
         return self._timing
 
     @timing.setter
+    @_reported
     def timing(self, value: MovementTiming, /) -> None:
         self._timing = value
 
@@ -1149,6 +1592,7 @@ class UpsideDownBall(BasePart):
 
 class SizeTunnel(BasePart):
     __slots__ = ("_size",)
+    _fields = ("size",)
 
     _size: Literal[DeviceModel.SmallTunnel, DeviceModel.BigTunnel]
 
@@ -1170,6 +1614,24 @@ class SizeTunnel(BasePart):
     def cost(self) -> Literal[50]:
         return 50
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        size: Literal[DeviceModel.SmallTunnel, DeviceModel.BigTunnel],
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._size = size
+        return self
+
     def __repr__(self) -> str:
         return f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, size={self.size!r})"
 
@@ -1178,6 +1640,7 @@ class SizeTunnel(BasePart):
         return self._size
 
     @size.setter
+    @_reported
     def size(
         self, value: Literal[DeviceModel.SmallTunnel, DeviceModel.BigTunnel], /
     ) -> None:
@@ -1186,6 +1649,7 @@ class SizeTunnel(BasePart):
 
 class TrainTrack(BasePart):
     __slots__ = ("_shape",)
+    _fields = ("shape",)
 
     _shape: Literal[
         DeviceModel.EndTracks,
@@ -1217,6 +1681,29 @@ class TrainTrack(BasePart):
     def cost(self) -> Literal[0, 20]:
         return 0 if self.shape is DeviceModel.EndTracks else 20
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        shape: Literal[
+            DeviceModel.EndTracks,
+            DeviceModel.LeftTracks,
+            DeviceModel.RightTracks,
+            DeviceModel.StraightTracks,
+        ],
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._shape = shape
+        return self
+
     def __repr__(self) -> str:
         return f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, shape={self.shape!r})"
 
@@ -1232,6 +1719,7 @@ class TrainTrack(BasePart):
         return self._shape
 
     @shape.setter
+    @_reported
     def shape(
         self,
         value: Literal[
@@ -1264,9 +1752,11 @@ class ToyTrain(BasePart, MutableSequence[TrainTrack]):
         super().__init__(x_pos, y_pos, z_pos, x_rot, y_rot, z_rot)
         self._tracks = list(tracks)
 
+    @_reported_items
     def append(self, value: TrainTrack) -> None:
         return self._tracks.append(value)
 
+    @_reported_items
     def clear(self) -> None:
         self._tracks.clear()
 
@@ -1280,12 +1770,33 @@ class ToyTrain(BasePart, MutableSequence[TrainTrack]):
     def count(self, value: Any) -> int:
         return self._tracks.count(value)
 
+    @_reported_items
     def __delitem__(self, index: SupportsIndex | slice, /) -> None:
         del self._tracks[index]
 
+    @_reported_items
     def extend(self, iterable: Iterable[TrainTrack], /) -> None:
         self._tracks.extend(iterable)
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        tracks: Iterable[tuple[Any, ...]],
+        /,
+    ) -> Self:
+        """Create a toy train from its own values and the values of each of its tracks, as taken by TrainTrack._from_fields."""
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._tracks = [TrainTrack._from_fields(*track) for track in tracks]
+        return self
+
     @overload
     def __getitem__(self, index: SupportsIndex, /) -> TrainTrack:
         pass
@@ -1299,6 +1810,7 @@ class ToyTrain(BasePart, MutableSequence[TrainTrack]):
     ) -> TrainTrack | MutableSequence[TrainTrack]:
         return self._tracks[index]
 
+    @_reported_items
     def __iadd__(self, value: Iterable[TrainTrack], /) -> Self:
         self._tracks += value
         return self
@@ -1308,6 +1820,7 @@ class ToyTrain(BasePart, MutableSequence[TrainTrack]):
     ) -> int:
         return self._tracks.index(value, start, stop)
 
+    @_reported_items
     def insert(self, index: SupportsIndex, value: TrainTrack, /) -> None:
         return self._tracks.insert(index, value)
 
@@ -1317,15 +1830,21 @@ class ToyTrain(BasePart, MutableSequence[TrainTrack]):
     def __len__(self) -> int:
         return len(self._tracks)
 
+    @_reported_items
     def pop(self, index: SupportsIndex = -1, /) -> TrainTrack:
         return self._tracks.pop(index)
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        return _from_record, _record(self)
+
+    @_reported_items
     def remove(self, value: TrainTrack, /) -> None:
         self._tracks.remove(value)
 
     def __repr__(self) -> str:
         return f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, tracks={self._tracks!r})"
 
+    @_reported_items
     def reverse(self) -> None:
         self._tracks.reverse()
 
@@ -1340,6 +1859,7 @@ class ToyTrain(BasePart, MutableSequence[TrainTrack]):
     def __setitem__(self, slice: slice, value: Iterable[TrainTrack], /) -> None:
         pass
 
+    @_reported_items
     def __setitem__(
         self, index: SupportsIndex | slice, value: TrainTrack | Iterable[TrainTrack], /
     ) -> None:
@@ -1361,6 +1881,30 @@ class Warp(BasePart):
         "_return_z_pos",
         "_return_z_rot",
     )
+    _fields = (
+        "dest_x",
+        "dest_y",
+        "dest_z",
+        "return_x_pos",
+        "return_y_pos",
+        "return_z_pos",
+        "return_x_rot",
+        "return_y_rot",
+        "return_z_rot",
+        "return_dest_x",
+        "return_dest_y",
+        "return_dest_z",
+    )
+    _points = (
+        ("x_pos", "y_pos", "z_pos"),
+        ("dest_x", "dest_y", "dest_z"),
+        ("return_x_pos", "return_y_pos", "return_z_pos"),
+        ("return_dest_x", "return_dest_y", "return_dest_z"),
+    )
+    _rotations = (
+        ("x_rot", "y_rot", "z_rot"),
+        ("return_x_rot", "return_y_rot", "return_z_rot"),
+    )
 
     _dest_x: float
     _dest_y: float
@@ -1421,6 +1965,7 @@ class Warp(BasePart):
         return self._dest_x
 
     @dest_x.setter
+    @_reported
     def dest_x(self, value: float, /) -> None:
         self._dest_x = value
 
@@ -1429,6 +1974,7 @@ class Warp(BasePart):
         return self._dest_y
 
     @dest_y.setter
+    @_reported
     def dest_y(self, value: float, /) -> None:
         """Positive is up, negative is down"""
         self._dest_y = value
@@ -1439,9 +1985,50 @@ class Warp(BasePart):
         return self._dest_z
 
     @dest_z.setter
+    @_reported
     def dest_z(self, value: float, /) -> None:
         self._dest_z = value
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        dest_x: float,
+        dest_y: float,
+        dest_z: float,
+        return_x_pos: float,
+        return_y_pos: float,
+        return_z_pos: float,
+        return_x_rot: float,
+        return_y_rot: float,
+        return_z_rot: float,
+        return_dest_x: float,
+        return_dest_y: float,
+        return_dest_z: float,
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._dest_x = dest_x
+        self._dest_y = dest_y
+        self._dest_z = dest_z
+        self._return_x_pos = return_x_pos
+        self._return_y_pos = return_y_pos
+        self._return_z_pos = return_z_pos
+        self._return_x_rot = return_x_rot
+        self._return_y_rot = return_y_rot
+        self._return_z_rot = return_z_rot
+        self._return_dest_x = return_dest_x
+        self._return_dest_y = return_dest_y
+        self._return_dest_z = return_dest_z
+        return self
+
     def __repr__(self) -> str:
         return f"{type(self).__name__}({self.x_pos!r}, {self.y_pos!r}, {self.z_pos!r}, {self.x_rot!r}, {self.y_rot!r}, {self.z_rot!r}, dest_x={self.dest_x!r}, dest_y={self.dest_y!r}, dest_z={self.dest_z!r}, return_x_pos={self.return_x_pos}, return_y_pos={self.return_y_pos}, return_z_pos={self.return_z_pos}, return_x_rot={self.return_x_rot}, return_y_rot={self.return_y_rot}, return_z_rot={self.return_z_rot}, return_dest_x={self.return_dest_x}, return_dest_y={self.return_dest_y}, return_dest_z={self.return_dest_z})"
 
@@ -1451,6 +2038,7 @@ class Warp(BasePart):
         return self._return_dest_x
 
     @return_dest_x.setter
+    @_reported
     def return_dest_x(self, value: float, /) -> None:
         self._return_dest_x = value
 
@@ -1459,6 +2047,7 @@ class Warp(BasePart):
         return self._return_dest_y
 
     @return_dest_y.setter
+    @_reported
     def return_dest_y(self, value: float, /) -> None:
         """Positive is up, negative is down"""
         self._return_dest_y = value
@@ -1469,6 +2058,7 @@ class Warp(BasePart):
         return self._return_dest_z
 
     @return_dest_z.setter
+    @_reported
     def return_dest_z(self, value: float, /) -> None:
         self._return_dest_z = value
 
@@ -1478,6 +2068,7 @@ class Warp(BasePart):
         return self._return_x_pos
 
     @return_x_pos.setter
+    @_reported
     def return_x_pos(self, value: float, /) -> None:
         self._return_x_pos = value
 
@@ -1489,6 +2080,7 @@ class Warp(BasePart):
         return self._return_x_rot
 
     @return_x_rot.setter
+    @_reported
     def return_x_rot(self, value: float, /) -> None:
         self._return_x_rot = value % 360
 
@@ -1498,6 +2090,7 @@ class Warp(BasePart):
         return self._return_y_pos
 
     @return_y_pos.setter
+    @_reported
     def return_y_pos(self, value: float, /) -> None:
         self._return_y_pos = value
 
@@ -1509,6 +2102,7 @@ class Warp(BasePart):
         return self._return_y_rot
 
     @return_y_rot.setter
+    @_reported
     def return_y_rot(self, value: float, /) -> None:
         self._return_y_rot = value % 360
 
@@ -1518,6 +2112,7 @@ class Warp(BasePart):
         return self._return_z_pos
 
     @return_z_pos.setter
+    @_reported
     def return_z_pos(self, value: float, /) -> None:
         self._return_z_pos = value
 
@@ -1529,6 +2124,7 @@ class Warp(BasePart):
         return self._return_z_rot
 
     @return_z_rot.setter
+    @_reported
     def return_z_rot(self, value: float, /) -> None:
         self._return_z_rot = value % 360
 
@@ -1543,6 +2139,7 @@ class BlinkingTile(TimedDevice):
 
 class MelodyTile(BasePart):
     __slots__ = ("_note",)
+    _fields = ("note",)
 
     _note: Literal[
         DeviceModel.MelodyTileLowG,
@@ -1616,6 +2213,50 @@ class MelodyTile(BasePart):
     def cost(self) -> Literal[20]:
         return 20
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        note: Literal[
+            DeviceModel.MelodyTileLowG,
+            DeviceModel.MelodyTileLowGSharp,
+            DeviceModel.MelodyTileLowA,
+            DeviceModel.MelodyTileLowASharp,
+            DeviceModel.MelodyTileLowB,
+            DeviceModel.MelodyTileC,
+            DeviceModel.MelodyTileCSharp,
+            DeviceModel.MelodyTileD,
+            DeviceModel.MelodyTileDSharp,
+            DeviceModel.MelodyTileE,
+            DeviceModel.MelodyTileF,
+            DeviceModel.MelodyTileFSharp,
+            DeviceModel.MelodyTileG,
+            DeviceModel.MelodyTileGSharp,
+            DeviceModel.MelodyTileA,
+            DeviceModel.MelodyTileASharp,
+            DeviceModel.MelodyTileB,
+            DeviceModel.MelodyTileHighC,
+            DeviceModel.MelodyTileHighCSharp,
+            DeviceModel.MelodyTileHighD,
+            DeviceModel.MelodyTileHighDSharp,
+            DeviceModel.MelodyTileHighE,
+            DeviceModel.MelodyTileHighF,
+            DeviceModel.MelodyTileHighFSharp,
+            DeviceModel.MelodyTileHighG,
+        ],
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._note = note
+        return self
+
     @property
     def note(self) -> Literal[
         DeviceModel.MelodyTileLowG,
@@ -1647,6 +2288,7 @@ class MelodyTile(BasePart):
         return self._note
 
     @note.setter
+    @_reported
     def note(
         self,
         value: Literal[
@@ -1686,6 +2328,7 @@ class MelodyTile(BasePart):
 
 class TextBox(BasePart):
     __slots__ = ("_shape", "_text_id")
+    _fields = ("shape", "text_id")
 
     _shape: Literal[DeviceModel.CubicTextBox, DeviceModel.WallTextBox]
     _text_id: int
@@ -1710,11 +2353,32 @@ class TextBox(BasePart):
     def cost(self) -> Literal[0]:
         return 0
 
+    @classmethod
+    def _from_fields(  # type: ignore[override]
+        cls,
+        x_pos: float,
+        y_pos: float,
+        z_pos: float,
+        x_rot: float,
+        y_rot: float,
+        z_rot: float,
+        shape: Literal[DeviceModel.CubicTextBox, DeviceModel.WallTextBox],
+        text_id: int,
+        /,
+    ) -> Self:
+        self: Final[Self] = super()._from_fields(
+            x_pos, y_pos, z_pos, x_rot, y_rot, z_rot
+        )
+        self._shape = shape
+        self._text_id = text_id
+        return self
+
     @property
     def shape(self) -> Literal[DeviceModel.CubicTextBox, DeviceModel.WallTextBox]:
         return self._shape
 
     @shape.setter
+    @_reported
     def shape(
         self, value: Literal[DeviceModel.CubicTextBox, DeviceModel.WallTextBox], /
     ) -> None:
@@ -1725,6 +2389,7 @@ class TextBox(BasePart):
         return self._text_id
 
     @text_id.setter
+    @_reported
     def text_id(self, value: SupportsIndex, /) -> None:
         self._text_id = index(value)
 
@@ -1751,3 +2416,259 @@ class Ant(BasePart):
     @property
     def cost(self) -> Literal[0]:
         return 0
+
+
+_CONTAINER_METHODS: Final[tuple[str, ...]] = (
+    "append",
+    "clear",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "reverse",
+    "__delitem__",
+    "__iadd__",
+    "__setitem__",
+)
+"""Methods that change which parts a Magnet or ToyTrain contains."""
+
+_original_types: Final[dict[type[BasePart], type[BasePart]]] = {}
+"""Maps each generated part class, such as the frozen variants, to the class that it was generated from."""
+
+
+def _anmtype(device: BasePart, /) -> DeviceModel:
+    """The model of a device, as written to the anmtype element of its XML; ValueError is raised for parts that have none."""
+    if isinstance(device, ProgressMarker):
+        return DeviceModel.Crystal if device.progress % 2 else DeviceModel.Respawn
+    elif isinstance(device, MovingTile):
+        match device.shape:
+            case PartModel.Tile10x10:
+                return (
+                    DeviceModel.MovingTile10x10Switch
+                    if device.switch
+                    else DeviceModel.MovingTile10x10
+                )
+            case PartModel.Tile20x20:
+                return (
+                    DeviceModel.MovingTile20x20Switch
+                    if device.switch
+                    else DeviceModel.MovingTile20x20
+                )
+            case PartModel.TileA30x30:
+                return (
+                    DeviceModel.MovingTile30x30Switch
+                    if device.switch
+                    else DeviceModel.MovingTile30x30
+                )
+            case PartModel.TileA30x90:
+                return (
+                    DeviceModel.MovingTile30x90Switch
+                    if device.switch
+                    else DeviceModel.MovingTile30x90
+                )
+            case PartModel.Tile90x90:
+                return (
+                    DeviceModel.MovingTile90x90ASwitch
+                    if device.switch
+                    else DeviceModel.MovingTile90x90A
+                )
+            case PartModel.HoleB90x90:
+                return (
+                    DeviceModel.MovingTile90x90BSwitch
+                    if device.switch
+                    else DeviceModel.MovingTile90x90B
+                )
+            case PartModel.FunnelPipe:
+                return DeviceModel.MovingFunnelPipe
+            case PartModel.StraightPipe:
+                return DeviceModel.MovingStraightPipe
+    elif isinstance(device, MovingCurve):
+        match device.shape:
+            case PartModel.CurveS:
+                return DeviceModel.MovingCurveS
+            case PartModel.CurveM:
+                return DeviceModel.MovingCurveM
+            case PartModel.CurveL:
+                return DeviceModel.MovingCurveL
+    elif isinstance(device, SlidingTile):
+        return DeviceModel.SlidingTile
+    elif isinstance(device, ConveyorBelt):
+        return DeviceModel.ConveyorBelt
+    elif isinstance(device, (DashTunnel, TextBox)):
+        return device.shape
+    elif isinstance(device, SeesawBlock):
+        if device.auto:
+            match device.shape:
+                case DeviceModel.SeesawLBlock:
+                    return DeviceModel.AutoSeesawLBlock
+                case DeviceModel.SeesawIBlock:
+                    return DeviceModel.AutoSeesawIBlock
+        else:
+            return device.shape
+    elif isinstance(device, Cannon):
+        return DeviceModel.Cannon
+    elif isinstance(device, Drawbridge):
+        return DeviceModel.Drawbridge
+    elif isinstance(device, Turntable):
+        return DeviceModel.Turntable
+    elif isinstance(device, Bumper):
+        return DeviceModel.PowerfulBumper if device.powerful else DeviceModel.Bumper
+    elif isinstance(device, Thorn):
+        return DeviceModel.Thorn
+    elif isinstance(device, Gear):
+        return DeviceModel.Gear
+    elif isinstance(device, Fan):
+        return device.wind_pattern
+    elif isinstance(device, Spring):
+        return DeviceModel.Spring
+    elif isinstance(device, Punch):
+        return DeviceModel.Punch
+    elif isinstance(device, Press):
+        return DeviceModel.Press
+    elif isinstance(device, Scissors):
+        return DeviceModel.Scissors
+    elif isinstance(device, MagnifyingGlass):
+        return DeviceModel.MagnifyingGlass
+    elif isinstance(device, UpsideDownStageDevice):
+        return DeviceModel.UpsideDownStageDevice
+    elif isinstance(device, UpsideDownBall):
+        return DeviceModel.UpsideDownBall
+    elif isinstance(device, SizeTunnel):
+        return device.size
+    elif isinstance(device, BlinkingTile):
+        return DeviceModel.BlinkingTile
+    elif isinstance(device, MelodyTile):
+        return device.note
+    elif isinstance(device, KororinCapsule):
+        return DeviceModel.KororinCapsule
+    elif isinstance(device, GreenCrystal):
+        return DeviceModel.GreenCrystal
+    elif isinstance(device, Ant):
+        return DeviceModel.Ant
+    else:
+        raise ValueError(f"part {device!r} does not have a known anmtype")
+
+
+def _base_type(part: BasePart, /) -> type[BasePart]:
+    """The class of part, ignoring the frozen variants."""
+    cls: type[BasePart] = type(part)
+    while cls in _original_types:
+        cls = _original_types[cls]
+    return cls
+
+
+def _canonical(part: BasePart, /) -> str:
+    """Text form of the values of part that is equal for parts that are equal in game.
+    Numbers are written as floats without negative zero, and rotations are reduced modulo 360.
+    """
+    items: Final[list[str]] = [_base_type(part).__name__]
+    for name, value in _values(part).items():
+        if name == "segments" or name == "tracks":
+            items.append(f"[{','.join(_canonical(child) for child in part)}]")  # type: ignore[attr-defined]
+        elif isinstance(value, Enum):
+            items.append(f"{type(value).__name__}({value.value!r})")
+        elif isinstance(value, bool):
+            items.append(str(int(value)))
+        elif name.endswith("_rot"):
+            items.append(repr(float(value) % 360 + 0.0))
+        else:
+            items.append(repr(float(value) + 0.0))
+    return " ".join(items)
+
+
+def _from_record(cls: type[BasePart], /, *values: Any) -> BasePart:
+    return cls._from_fields(*values)
+
+
+def _notify(part: BasePart, /) -> None:
+    """Call every watcher of part, and notify every container that part belongs to."""
+    for watcher in tuple(part._watchers or ()):
+        if isinstance(watcher, BasePart):
+            _notify(watcher)
+        else:
+            watcher(part)
+
+
+def _record(part: BasePart, /) -> tuple[Any, ...]:
+    """Hashable value of part, equal for parts of the same class with the same values."""
+    return (_base_type(part), *_values(part).values())
+
+
+def _rewatch(container: BasePart, before: Iterable[BasePart], /) -> None:
+    """Move container's watch from the parts that it used to contain to the parts that it contains now."""
+    old: Final[set[BasePart]] = set(before)
+    new: Final[set[BasePart]] = set(container)  # type: ignore[call-overload]
+    for part in old - new:
+        _unwatch(part, container)
+    for part in new - old:
+        _watch(part, container)
+
+
+@contextmanager
+def _unreported(part: BasePart, /) -> Iterator[None]:
+    """Let part and the parts that it contains be changed without notifying their watchers, so that a caller making many changes can call _notify once afterwards."""
+    elements: Final[list[BasePart]] = [
+        element
+        for element in (part, *(part if isinstance(part, MutableSequence) else ()))
+        if element._watchers is not None
+    ]
+    watchers: Final = [element._watchers for element in elements]
+    for element in elements:
+        element._watchers = None
+    try:
+        yield
+    finally:
+        for element, element_watchers in zip(elements, watchers):
+            element._watchers = element_watchers
+
+
+def _unwatch(
+    part: BasePart, watcher: Callable[[BasePart], object] | BasePart, /
+) -> None:
+    """Undo one call to _watch with the same arguments."""
+    if not part._watchable or part._watchers is None:
+        return
+    part._watchers.remove(watcher)
+    if not part._watchers:
+        part._watchers = None
+        if isinstance(part, MutableSequence):
+            for child in part:
+                _unwatch(child, part)
+
+
+def _values(part: BasePart, /) -> dict[str, Any]:
+    """The values that define part, keyed by property name.
+    Magnet segments and toy train tracks are included as tuples of their own values, under segments and tracks.
+    """
+    if isinstance(part, Magnet):
+        return {"segments": tuple(tuple(_values(segment).values()) for segment in part)}
+    values: Final[dict[str, Any]] = {
+        "x_pos": part.x_pos,
+        "y_pos": part.y_pos,
+        "z_pos": part.z_pos,
+        "x_rot": part.x_rot,
+        "y_rot": part.y_rot,
+        "z_rot": part.z_rot,
+    }
+    for name in part._fields:
+        values[name] = getattr(part, name)
+    if isinstance(part, ToyTrain):
+        values["tracks"] = tuple(tuple(_values(track).values()) for track in part)
+    return values
+
+
+def _watch(part: BasePart, watcher: Callable[[BasePart], object] | BasePart, /) -> None:
+    """Call watcher with part whenever part, or a part that it contains, changes.
+    If the watcher raises an exception, the change is undone and the exception is propagated.
+    Changes are reported by the property setters and container methods, which check the part's _watchers and do nothing more while it is None, so the class of a part never changes; see Stage for what this requires of code that changes parts.
+    Parts that are not watchable cannot change, so they are left as they are.
+    """
+    if not part._watchable:
+        return
+    if part._watchers is None:
+        part._watchers = [watcher]
+        if isinstance(part, MutableSequence):
+            for child in part:
+                _watch(child, part)
+    else:
+        part._watchers.append(watcher)
@@ -0,0 +1,114 @@
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from os import name as os_name
+from sys import version_info
+from types import TracebackType
+from typing import Final, Self
+
+from . import Stage
+from .array import StageArray
+
+__all__ = ["SharedStage"]
+
+
+_separately_tracked: bool | None = None
+"""Whether this process has a resource tracker of its own rather than sharing its parent's, which is decided by _tracked_separately when it first attaches to a block."""
+
+
+def _attach(name: str, /) -> "SharedStage":
+    global _separately_tracked
+    self: Final[SharedStage] = SharedStage.__new__(SharedStage)
+    if version_info >= (3, 13):
+        self._memory = SharedMemory(name, track=False)  # type: ignore[call-arg]
+    else:
+        # Before 3.13, attaching registers the block with this process's resource tracker, which unlinks it when the process exits.
+        # That is harmless when the tracker is the owner's, but a process forked before the owner started its tracker gets one of its own.
+        if _separately_tracked is None:
+            _separately_tracked = _tracked_separately()
+        self._memory = SharedMemory(name)
+        if _separately_tracked:
+            resource_tracker.unregister(self._memory._name, "shared_memory")  # type: ignore[attr-defined]
+    self._owner = False
+    return self
+
+
+def _tracked_separately() -> bool:
+    """Whether this process would start a resource tracker of its own, rather than use the one that it inherited from its parent.
+    Only needed before Python 3.13, whose SharedMemory can attach without registering.
+    """
+    # multiprocessing has no public way to ask this, so this reads the private file descriptor of the tracker connection, which is None until this process starts a tracker or inherits one.
+    # It is the only use of resource_tracker internals here; the attribute exists in every version that calls this.
+    return os_name == "posix" and resource_tracker._resource_tracker._fd is None  # type: ignore[attr-defined]
+
+
+class SharedStage:
+    """A stage packed into a block of shared memory, for sending to worker processes without pickling its parts.
+    Pickling a SharedStage only pickles the name of its block, which the receiving process attaches to.
+    The process that created it owns the block, and must unlink it once no worker needs it; leaving a with block does so.
+    Attaching is only supported in processes started by the owner, such as the workers of a multiprocessing pool.
+    """
+
+    __match_args__ = ("name",)
+    __slots__ = ("_memory", "_owner")
+
+    _memory: SharedMemory
+    _owner: bool
+
+    def __init__(self, stage: Stage | StageArray, /) -> None:
+        pieces: Final[list[bytes]] = (
+            stage if isinstance(stage, StageArray) else StageArray.from_stage(stage)
+        )._pack()
+        self._memory = SharedMemory(create=True, size=sum(map(len, pieces)))
+        self._owner = True
+        buffer: Final[memoryview] = self._buffer
+        position: int = 0
+        for piece in pieces:
+            buffer[position : position + len(piece)] = piece
+            position += len(piece)
+
+    @property
+    def _buffer(self) -> memoryview:
+        buffer: Final[memoryview | None] = self._memory.buf
+        if buffer is None:
+            raise ValueError("shared stage is closed")
+        return buffer
+
+    def close(self) -> None:
+        """Detach this process from the block, without freeing it."""
+        self._memory.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+    ) -> None:
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def load(self) -> Stage:
+        """A new stage with the parts and metadata stored in the block."""
+        return StageArray._unpack(self._buffer).to_stage()
+
+    def load_array(self) -> StageArray:
+        """A new StageArray with the columns stored in the block, without creating any parts."""
+        return StageArray._unpack(self._buffer)
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def __reduce__(self) -> tuple[object, tuple[str]]:
+        return _attach, (self.name,)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.name!r}>"
+
+    def unlink(self) -> None:
+        """Free the block once every process has closed it. Only the owner should call this."""
+        self._memory.unlink()
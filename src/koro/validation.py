@@ -0,0 +1,188 @@
+from collections.abc import Iterable, Iterator
+from enum import Enum, unique
+from math import isfinite
+from typing import Final
+
+from .slot.save import _SIZE_LIMIT
+from .slot.xml import XmlSlot
+from .stage import Stage
+from .stage.array import StageArray
+from .stage.model import DecorationModel
+from .stage.part import BasePart, Goal, Part, ProgressMarker, Start, Warp
+
+__all__ = ["Rule", "Violation", "validate", "validate_all"]
+
+
+@unique
+class Rule(Enum):
+    START = 0
+    """A stage must have exactly one start."""
+    GOAL = 1
+    """A stage must have exactly one goal."""
+    PROGRESS = 2
+    """Progress markers must come in crystal and respawn pairs, numbered from 1 without gaps or repeats."""
+    DECORATION = 3
+    """Decorations must be among those available in the stage's theme."""
+    WARP = 4
+    """Both ends of a warp and both of its destinations must be set."""
+    BUDGET = 5
+    """The parts of a stage must not cost more kororin points than the budget."""
+    SIZE = 6
+    """The serialized stage must fit in a save slot."""
+
+
+class Violation:
+    """A way in which a stage breaks one of the rules of the game, as returned by validate."""
+
+    __match_args__ = ("rule", "message", "parts")
+    __slots__ = ("_message", "_parts", "_rule")
+
+    _message: str
+    _parts: tuple[BasePart, ...]
+    _rule: Rule
+
+    def __init__(
+        self, rule: Rule, message: str, parts: Iterable[BasePart] = ()
+    ) -> None:
+        self._message = message
+        self._parts = tuple(parts)
+        self._rule = rule
+
+    def __eq__(self, other: object, /) -> bool:
+        if isinstance(other, Violation):
+            return (
+                self.rule == other.rule
+                and self.message == other.message
+                and self.parts == other.parts
+            )
+        else:
+            return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.rule, self.message, self.parts))
+
+    @property
+    def message(self) -> str:
+        return self._message
+
+    @property
+    def parts(self) -> tuple[BasePart, ...]:
+        """The parts at fault, if the violation can be attributed to particular parts."""
+        return self._parts
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.rule!r}, {self.message!r}, {self.parts!r})"
+
+    @property
+    def rule(self) -> Rule:
+        return self._rule
+
+
+def _check_progress(markers: dict[int, list[ProgressMarker]], /) -> Iterator[Violation]:
+    for progress, found in sorted(markers.items()):
+        if len(found) > 1:
+            yield Violation(
+                Rule.PROGRESS,
+                f"{len(found)} progress markers share number {progress}",
+                found,
+            )
+    checkpoints: Final[set[int]] = {progress + 1 >> 1 for progress in markers}
+    for checkpoint in sorted(checkpoints):
+        for progress in checkpoint * 2 - 1, checkpoint * 2:
+            if progress not in markers:
+                yield Violation(
+                    Rule.PROGRESS,
+                    f"{'crystal' if progress & 1 else 'respawn'} {checkpoint} is missing",
+                    markers[progress + 1 if progress & 1 else progress - 1],
+                )
+    if checkpoints and max(checkpoints) != len(checkpoints):
+        yield Violation(
+            Rule.PROGRESS,
+            f"no progress markers for checkpoints {', '.join(map(str, sorted(set(range(1, max(checkpoints))) - checkpoints)))}",
+        )
+
+
+def validate(
+    stage: Stage | StageArray, /, *, budget: int | None = None
+) -> list[Violation]:
+    """Every rule of the game that stage breaks, found in one pass over its parts.
+    The budget defaults to that of the stage, if it has one; no budget is checked otherwise.
+    A StageArray is converted to a stage once, before it is checked.
+    """
+    if isinstance(stage, StageArray):
+        stage = stage.to_stage()
+    if budget is None:
+        budget = stage.budget
+    available: Final[int] = stage.theme.decorations_available
+    cost: int = 0
+    decorations: Final[list[BasePart]] = []
+    goals: Final[list[BasePart]] = []
+    markers: Final[dict[int, list[ProgressMarker]]] = {}
+    starts: Final[list[BasePart]] = []
+    warps: Final[list[BasePart]] = []
+    for part in stage:
+        cost += part.cost
+        if isinstance(part, Part):
+            if (
+                isinstance(part.shape, DecorationModel)
+                and part.shape.value >= available
+            ):
+                decorations.append(part)
+        elif isinstance(part, ProgressMarker):
+            markers.setdefault(part.progress, []).append(part)
+        elif isinstance(part, Start):
+            starts.append(part)
+        elif isinstance(part, Goal):
+            goals.append(part)
+        elif isinstance(part, Warp):
+            if not all(
+                isfinite(getattr(part, name))
+                for point in part._points
+                for name in point
+            ):
+                warps.append(part)
+    violations: Final[list[Violation]] = []
+    if len(starts) != 1:
+        violations.append(
+            Violation(Rule.START, f"expected 1 start, found {len(starts)}", starts)
+        )
+    if len(goals) != 1:
+        violations.append(
+            Violation(Rule.GOAL, f"expected 1 goal, found {len(goals)}", goals)
+        )
+    violations.extend(_check_progress(markers))
+    if decorations:
+        violations.append(
+            Violation(
+                Rule.DECORATION,
+                f"{stage.theme.name} only has {available} decorations",
+                decorations,
+            )
+        )
+    if warps:
+        violations.append(
+            Violation(Rule.WARP, f"{len(warps)} warps are incomplete", warps)
+        )
+    if budget is not None and cost > budget:
+        violations.append(
+            Violation(Rule.BUDGET, f"total cost of {cost} exceeds budget of {budget}")
+        )
+    size: Final[int] = len(XmlSlot.serialize(stage, canonical=False))
+    if size > _SIZE_LIMIT:
+        violations.append(
+            Violation(
+                Rule.SIZE,
+                f"serialized size of {size} bytes exceeds limit of {_SIZE_LIMIT}",
+            )
+        )
+    return violations
+
+
+def validate_all(
+    stages: Iterable[Stage | StageArray], /, *, budget: int | None = None
+) -> Iterator[list[Violation]]:
+    """The violations of each stage in turn.
+    Stages are validated as they are read, so a corpus can be streamed without holding all of it in memory.
+    """
+    for stage in stages:
+        yield validate(stage, budget=budget)
@@ -0,0 +1,170 @@
+"""Stages shared by the tests."""
+
+from koro import (
+    Ant,
+    BlinkingTile,
+    Bumper,
+    Cannon,
+    ConveyorBelt,
+    DashTunnel,
+    DecorationModel,
+    DeviceModel,
+    Drawbridge,
+    Fan,
+    Gear,
+    Goal,
+    GreenCrystal,
+    KororinCapsule,
+    Magnet,
+    MagnetSegment,
+    MagnifyingGlass,
+    MelodyTile,
+    MovingCurve,
+    MovingTile,
+    Part,
+    PartModel,
+    Press,
+    ProgressMarker,
+    Punch,
+    Scissors,
+    SeesawBlock,
+    SizeTunnel,
+    SlidingTile,
+    Spring,
+    Stage,
+    Start,
+    Theme,
+    Thorn,
+    ToyTrain,
+    TrainTrack,
+    Turntable,
+    UpsideDownBall,
+    UpsideDownStageDevice,
+    Walls,
+    Warp,
+)
+from koro.stage.part import MovementTiming, Speed
+
+
+def every_kind() -> Stage:
+    """A stage with at least one part of every kind that round trips through every format."""
+    return Stage(
+        (
+            Start(0.0, 10.0, 0.0, 0.0, 0.0, 0.0),
+            Goal(100.0, 10.0, 0.0, 0.0, 180.0, 0.0),
+            Part(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20),
+            Part(20.0, 0.0, 0.0, 0.0, 90.0, 0.0, shape=PartModel.MagmaTile),
+            Part(5.0, 5.0, 5.0, 0.0, 0.0, 0.0, shape=DecorationModel.Decoration02),
+            ProgressMarker(3.0, 3.0, 3.0, 0.0, 0.0, 0.0, progress=1),
+            ProgressMarker(4.0, 3.0, 3.0, 0.0, 0.0, 0.0, progress=2),
+            MovingTile(
+                1.0,
+                1.0,
+                1.0,
+                0.0,
+                0.0,
+                0.0,
+                dest_x=5.0,
+                dest_y=1.5,
+                dest_z=1.0,
+                shape=PartModel.Tile20x20,
+                walls=Walls.LEFT | Walls.BACK,
+                switch=True,
+            ),
+            MovingTile(
+                1.0,
+                1.0,
+                1.0,
+                0.0,
+                0.0,
+                0.0,
+                dest_x=5.0,
+                dest_y=1.5,
+                dest_z=1.0,
+                shape=PartModel.FunnelPipe,
+                speed=0.75,
+            ),
+            MovingCurve(
+                2.0, 2.0, 2.0, 0.0, 0.0, 0.0, shape=PartModel.CurveM, speed=Speed.FAST
+            ),
+            SlidingTile(1.0, 2.0, 3.0, 4.0, 5.0, 6.0),
+            ConveyorBelt(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, reversing=True),
+            Magnet(
+                (
+                    MagnetSegment(
+                        0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=DeviceModel.EndMagnet
+                    ),
+                    MagnetSegment(
+                        10.0, 0.0, 0.0, 0.0, 90.0, 0.0, shape=DeviceModel.EndMagnet
+                    ),
+                )
+            ),
+            DashTunnel(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=DeviceModel.DashTunnelB),
+            SeesawBlock(
+                0.0, 0.0, 0.0, 0.0, 0.0, 0.0, auto=True, shape=DeviceModel.SeesawIBlock
+            ),
+            Cannon(0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+            Drawbridge(0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+            Turntable(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, speed=Speed.SLOW),
+            Bumper(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, powerful=True),
+            Thorn(0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+            Gear(0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+            Fan(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, wind_pattern=DeviceModel.TimerFan),
+            Spring(0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+            Punch(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, timing=MovementTiming.B),
+            Press(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, timing=MovementTiming.C),
+            Scissors(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, timing=MovementTiming.A),
+            MagnifyingGlass(0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+            UpsideDownStageDevice(0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+            UpsideDownBall(0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+            SizeTunnel(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, size=DeviceModel.BigTunnel),
+            ToyTrain(
+                1.0,
+                2.0,
+                3.0,
+                0.0,
+                0.0,
+                0.0,
+                tracks=(
+                    TrainTrack(
+                        1.0, 2.0, 13.0, 0.0, 0.0, 0.0, shape=DeviceModel.StraightTracks
+                    ),
+                    TrainTrack(
+                        1.0, 2.0, 23.0, 0.0, 0.0, 0.0, shape=DeviceModel.EndTracks
+                    ),
+                ),
+            ),
+            Warp(
+                1.0,
+                2.0,
+                3.0,
+                0.0,
+                0.0,
+                0.0,
+                dest_x=4.0,
+                dest_y=5.0,
+                dest_z=6.0,
+                return_x_pos=7.0,
+                return_y_pos=8.0,
+                return_z_pos=9.0,
+                return_x_rot=0.0,
+                return_y_rot=90.0,
+                return_z_rot=0.0,
+                return_dest_x=1.0,
+                return_dest_y=1.0,
+                return_dest_z=1.0,
+            ),
+            BlinkingTile(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, timing=MovementTiming.B),
+            MelodyTile(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, note=DeviceModel.MelodyTileE),
+            KororinCapsule(0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+            GreenCrystal(0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+            Ant(0.0, 0.0, 0.0, 0.0, 0.0, 0.0),
+        ),
+        theme=Theme.CITY,
+        tilt_lock=True,
+    )
+
+
+def records(stage: Stage) -> list[str]:
+    """The records of stage in a fixed order, for comparing stages regardless of iteration order."""
+    return sorted(map(repr, stage.records()))
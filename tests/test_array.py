@@ -0,0 +1,50 @@
+from pickle import HIGHEST_PROTOCOL, dumps
+from unittest import TestCase, main
+
+from stages import every_kind, records
+
+from koro import Magnet, Part, PartModel, Stage, StageArray
+from koro.stage.array import _HEADER
+
+
+class TestStageArray(TestCase):
+    def test_round_trip(self) -> None:
+        stage: Stage = every_kind()
+        array: StageArray = StageArray.from_stage(stage)
+        self.assertEqual(records(array.to_stage()), records(stage))
+        unpacked: StageArray = StageArray._unpack(b"".join(array._pack()))
+        self.assertEqual(records(unpacked.to_stage()), records(stage))
+        self.assertEqual(unpacked.edit_user, stage.edit_user)
+        self.assertEqual(unpacked.theme, stage.theme)
+        self.assertEqual(unpacked.tilt_lock, stage.tilt_lock)
+
+    def test_empty_magnet(self) -> None:
+        (magnet,) = StageArray((Magnet(),))
+        self.assertIsInstance(magnet, Magnet)
+        self.assertEqual(len(magnet), 0)
+
+    def test_layout(self) -> None:
+        array: StageArray = StageArray(
+            Part(float(i), 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20)
+            for i in range(10)
+        )
+        self.assertEqual(list(array._codes), [PartModel.Tile20x20.value] * 10)
+        self.assertEqual(len(array._floats), 0)
+        self.assertEqual(array._chains, {})
+        self.assertEqual(
+            sum(map(len, array._pack())),
+            _HEADER.size
+            + 10 * (1 + 6 * 8 + 2 * 4 + 4)
+            + len(dumps({}, HIGHEST_PROTOCOL)),
+        )
+
+    def test_side_table(self) -> None:
+        array: StageArray = StageArray.from_stage(every_kind())
+        self.assertEqual(
+            {array.kind(i).__name__ for i in array._chains},
+            {"Magnet", "ToyTrain"},
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from os.path import join
+from tempfile import TemporaryDirectory
+from typing import Any
+from unittest import IsolatedAsyncioTestCase, main
+
+from stages import every_kind, records
+
+from koro import CachedSlot, EditorPage, SaveSlot, Slot, Stage, StageCache, XmlSlot
+
+
+class _RecordingExecutor(ThreadPoolExecutor):
+    """Executor that records the names of the functions submitted to it."""
+
+    def __init__(self) -> None:
+        super().__init__(1)
+        self.calls: list[str] = []
+
+    def submit(
+        self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any
+    ) -> Future[Any]:
+        self.calls.append(fn.__name__)
+        return super().submit(fn, *args, **kwargs)
+
+
+class TestAsync(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        directory: TemporaryDirectory[str] = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory: str = directory.name
+        self.cpu: _RecordingExecutor = _RecordingExecutor()
+        self.io: _RecordingExecutor = _RecordingExecutor()
+        self.addCleanup(self.cpu.shutdown)
+        self.addCleanup(self.io.shutdown)
+
+    async def _round_trip(self, slot: Slot, /) -> None:
+        stage: Stage = every_kind()
+        await slot.asave(stage, cpu_executor=self.cpu, io_executor=self.io)
+        loaded: Stage | None = await slot.aload(
+            cpu_executor=self.cpu, io_executor=self.io
+        )
+        self.assertIsNotNone(loaded)
+        self.assertEqual(records(loaded), records(stage))
+        await slot.asave(None, cpu_executor=self.cpu, io_executor=self.io)
+        self.assertIsNone(await slot.aload(cpu_executor=self.cpu, io_executor=self.io))
+
+    async def test_file_slot(self) -> None:
+        await self._round_trip(XmlSlot(join(self.directory, "stage.xml")))
+        self.assertEqual(self.cpu.calls, ["serialize", "deserialize"])
+        self.assertEqual(self.io.calls, ["_write", "_read", "_write", "_read"])
+
+    async def test_save_slot(self) -> None:
+        await self._round_trip(SaveSlot(self.directory, EditorPage.ORIGINAL, 1))
+        self.assertEqual(self.cpu.calls, ["_serialize", "deserialize"])
+        self.assertEqual(self.io.calls, ["_write", "_read", "_write", "_read"])
+
+    async def test_default(self) -> None:
+        await self._round_trip(
+            CachedSlot(XmlSlot(join(self.directory, "stage.xml")), StageCache())
+        )
+        self.assertEqual(self.cpu.calls, [])
+        self.assertEqual(self.io.calls, ["save", "load", "save", "load"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+from os import makedirs, stat, utime
+from os.path import dirname, exists, getsize, join
+from pickle import dumps
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from stages import every_kind, records
+
+from koro import (
+    BasePart,
+    CachedSlot,
+    DiskCache,
+    Part,
+    PartModel,
+    Stage,
+    StageCache,
+    XmlSlot,
+)
+
+
+def _stage(x_pos: float) -> Stage:
+    return Stage((Part(x_pos, 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20),))
+
+
+class TestStageCache(TestCase):
+    def setUp(self) -> None:
+        directory: TemporaryDirectory[str] = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.slot: XmlSlot = XmlSlot(join(directory.name, "stage.xml"))
+
+    def test_editable(self) -> None:
+        self.slot.save(every_kind())
+        cache: StageCache = StageCache()
+        first: Stage = cache.load(self.slot)
+        second: Stage = cache.load(self.slot)
+        self.assertEqual(records(second), records(first))
+        self.assertTrue(set(first).isdisjoint(second))
+        part: BasePart = next(iter(second))
+        part.x_pos = 5.0
+        self.assertEqual(part.x_pos, 5.0)
+        self.assertEqual(records(cache.load(self.slot)), records(first))
+
+    def test_missing(self) -> None:
+        self.assertIsNone(StageCache().load(self.slot))
+
+    def test_modified(self) -> None:
+        self.slot.save(_stage(1.0))
+        cache: StageCache = StageCache()
+        cache.load(self.slot)
+        mtime: int = stat(self.slot.path).st_mtime_ns
+        self.slot.save(_stage(20.0))
+        utime(self.slot.path, ns=(mtime, mtime))
+        (part,) = cache.load(self.slot)
+        self.assertEqual(part.x_pos, 20.0)
+        self.slot.save(_stage(30.0))
+        utime(self.slot.path, ns=(mtime + 1_000_000_000, mtime + 1_000_000_000))
+        (part,) = cache.load(self.slot)
+        self.assertEqual(part.x_pos, 30.0)
+
+    def test_maxsize(self) -> None:
+        self.slot.save(_stage(1.0))
+        cache: StageCache = StageCache(1)
+        other: XmlSlot = XmlSlot(f"{self.slot.path}.2")
+        other.save(_stage(2.0))
+        cache.load(self.slot)
+        cache.load(other)
+        self.assertEqual(len(cache), 1)
+
+
+class TestCachedSlot(TestCase):
+    def test_save(self) -> None:
+        with TemporaryDirectory() as directory:
+            cache: StageCache = StageCache()
+            slot: CachedSlot = CachedSlot(XmlSlot(join(directory, "stage.xml")), cache)
+            slot.save(_stage(1.0))
+            slot.load()
+            self.assertEqual(len(cache), 1)
+            slot.save(_stage(2.0))
+            self.assertEqual(len(cache), 0)
+            (part,) = slot.load()
+            self.assertEqual(part.x_pos, 2.0)
+            slot.save(None)
+            self.assertFalse(slot)
+            self.assertIsNone(slot.load())
+
+
+class TestDiskCache(TestCase):
+    def setUp(self) -> None:
+        directory: TemporaryDirectory[str] = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache: DiskCache = DiskCache(directory.name)
+
+    def test_hit(self) -> None:
+        self.assertIsNone(self.cache.get("00" * 20))
+        stage: Stage = every_kind()
+        self.cache.put("00" * 20, stage)
+        loaded: Stage | None = self.cache.get("00" * 20)
+        self.assertIsNotNone(loaded)
+        self.assertEqual(records(loaded), records(stage))
+        self.assertIsNone(self.cache.get("01" * 20))
+
+    def test_corrupt(self) -> None:
+        for data in b"", b"not a pickle", dumps([1, 2, 3]):
+            with self.subTest(data=data):
+                path: str = self.cache._path("00" * 20)
+                makedirs(dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+                self.assertIsNone(self.cache.get("00" * 20))
+                self.assertFalse(exists(path))
+
+    def test_overwrite(self) -> None:
+        self.cache.put("00" * 20, _stage(1.0))
+        self.cache.put("00" * 20, _stage(2.0))
+        self.assertEqual(self.cache._size, getsize(self.cache._path("00" * 20)))
+
+    def test_eviction_order(self) -> None:
+        keys: list[str] = [f"{i:02}" * 20 for i in range(4)]
+        for i, key in enumerate(keys[:3]):
+            self.cache.put(key, _stage(float(i)))
+            utime(self.cache._path(key), ns=(i, i))
+        size: int = getsize(self.cache._path(keys[0]))
+        self.cache._max_bytes = 3 * size
+        self.cache.get(keys[0])
+        self.cache.put(keys[3], _stage(3.0))
+        self.assertEqual(
+            [self.cache.get(key) is not None for key in keys],
+            [True, False, False, True],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from stages import every_kind, records
+
+from koro import Corpus, CorpusWriter, Part, PartModel, Stage, Theme
+
+
+def _stage(x_pos: float) -> Stage:
+    return Stage(
+        (Part(x_pos, 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20),),
+        theme=Theme.CITY,
+    )
+
+
+class TestCorpus(TestCase):
+    def setUp(self) -> None:
+        directory: TemporaryDirectory[str] = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path: str = join(directory.name, "stages.krpc")
+
+    def test_round_trip(self) -> None:
+        stage: Stage = every_kind()
+        with CorpusWriter(self.path) as writer:
+            self.assertEqual(writer.add(stage, "every kind"), 0)
+            self.assertEqual(writer.add(_stage(1.0)), 1)
+            self.assertEqual(writer.add(_stage(2.0), "ключ", single=True), 2)
+        with Corpus(self.path) as corpus:
+            self.assertEqual(len(corpus), 3)
+            self.assertEqual(records(corpus[0]), records(stage))
+            self.assertEqual(records(corpus["every kind"]), records(stage))
+            self.assertEqual(records(corpus["ключ"]), records(_stage(2.0)))
+            self.assertEqual(corpus.keys(), ["every kind", "", "ключ"])
+            self.assertEqual(corpus.part_count(0), len(stage))
+            self.assertEqual(corpus.theme("ключ"), Theme.CITY)
+            self.assertIn("ключ", corpus)
+            self.assertNotIn("", corpus)
+            self.assertEqual(len(list(corpus)), 3)
+            with self.assertRaises(KeyError):
+                corpus["missing"]
+            with self.assertRaises(IndexError):
+                corpus[3]
+
+    def test_duplicate_key(self) -> None:
+        with CorpusWriter(self.path) as writer:
+            writer.add(_stage(1.0), "a")
+            with self.assertRaises(ValueError):
+                writer.add(_stage(2.0), "a")
+            writer.add(_stage(3.0))
+            writer.add(_stage(4.0))
+        with Corpus(self.path) as corpus:
+            self.assertEqual(len(corpus), 3)
+
+    def test_long_key(self) -> None:
+        with CorpusWriter(self.path) as writer:
+            with self.assertRaises(ValueError):
+                writer.add(_stage(1.0), "é" * 0x8000)
+            writer.add(_stage(2.0), "k" * 0xFFFF)
+        with Corpus(self.path) as corpus:
+            self.assertEqual(len(corpus), 1)
+            self.assertEqual(records(corpus["k" * 0xFFFF]), records(_stage(2.0)))
+
+    def test_truncated(self) -> None:
+        with CorpusWriter(self.path) as writer:
+            writer.add(_stage(1.0), "a")
+        with open(self.path, "rb") as f:
+            data: bytes = f.read()
+        for length in 3, len(data) - 1:
+            with self.subTest(length=length):
+                with open(self.path, "wb") as f:
+                    f.write(data[:length])
+                with self.assertRaises(ValueError):
+                    Corpus(self.path)
+
+    def test_unclosed(self) -> None:
+        writer: CorpusWriter = CorpusWriter(self.path)
+        writer.add(_stage(1.0))
+        writer._file.flush()
+        with self.assertRaises(ValueError):
+            Corpus(self.path)
+        writer.close()
+        with Corpus(self.path) as corpus:
+            self.assertEqual(len(corpus), 1)
+
+
+if __name__ == "__main__":
+    main()
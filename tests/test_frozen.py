@@ -0,0 +1,39 @@
+from unittest import TestCase, main
+
+from koro import Interner, PackedSlot, Part, PartModel, Stage, Start, XmlSlot
+
+
+def _stage() -> Stage:
+    return Stage(
+        (
+            Start(0.0, 10.0, 0.0, 0.0, 0.0, 0.0),
+            Part(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20),
+            Part(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20),
+        )
+    )
+
+
+class TestInterner(TestCase):
+    def test_duplicates_kept(self) -> None:
+        for slot in PackedSlot, XmlSlot:
+            with self.subTest(slot=slot.__name__):
+                interner: Interner = Interner()
+                first: Stage = slot.deserialize(
+                    slot.serialize(_stage()), interner=interner
+                )
+                second: Stage = slot.deserialize(
+                    slot.serialize(_stage()), interner=interner
+                )
+                self.assertEqual(len(first), 3)
+                self.assertEqual(slot.serialize(first), slot.serialize(_stage()))
+                self.assertEqual(len(set(map(id, first)) & set(map(id, second))), 2)
+
+    def test_not_watched(self) -> None:
+        stage: Stage = Stage(Interner().intern_all(_stage()))
+        types: dict[int, type] = {id(part): type(part) for part in stage}
+        stage.budget = 1000
+        self.assertEqual({id(part): type(part) for part in stage}, types)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+from os.path import join
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from stages import records
+
+from koro import Part, PartModel, Stage, StageLibrary, XmlSlot
+
+
+def _stage(x_pos: float) -> Stage:
+    return Stage((Part(x_pos, 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20),))
+
+
+class TestStageLibrary(TestCase):
+    def setUp(self) -> None:
+        directory: TemporaryDirectory[str] = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory: str = directory.name
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(2)
+        self.addCleanup(self.executor.shutdown)
+
+    def _library(self, max_pending: int | None = None) -> StageLibrary:
+        return StageLibrary(
+            self.directory,
+            "*.xml",
+            cpu_executor=self.executor,
+            io_executor=self.executor,
+            max_pending=max_pending,
+        )
+
+    def test_errors(self) -> None:
+        for i in range(5):
+            XmlSlot(join(self.directory, f"{i}.xml")).save(_stage(float(i)))
+        bad: str = join(self.directory, "bad.xml")
+        with open(bad, "wb") as f:
+            f.write(b"<EDIT_MAP_NORMAL>")
+        library: StageLibrary = self._library(1)
+        loaded: dict[str, Stage] = dict(library)
+        self.assertEqual(len(loaded), 5)
+        self.assertEqual(
+            records(loaded[join(self.directory, "3.xml")]), records(_stage(3.0))
+        )
+        self.assertEqual(list(library.errors), [bad])
+        self.assertIsInstance(library.errors[bad], Exception)
+        with open(bad, "wb") as f:
+            f.write(XmlSlot.serialize(_stage(5.0)))
+        self.assertEqual(len(dict(library)), 6)
+        self.assertEqual(library.errors, {})
+
+    def test_max_pending(self) -> None:
+        for max_pending in 0, -1:
+            with self.subTest(max_pending=max_pending):
+                with self.assertRaises(ValueError):
+                    self._library(max_pending)
+
+    def test_paths(self) -> None:
+        for name in "a.xml", "b.XML", "c.txt":
+            with open(join(self.directory, name), "wb"):
+                pass
+        self.assertEqual(
+            sorted(StageLibrary(self.directory, "*").paths()),
+            [join(self.directory, "a.xml"), join(self.directory, "b.XML")],
+        )
+
+
+if __name__ == "__main__":
+    main()
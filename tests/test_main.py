@@ -0,0 +1,108 @@
+from contextlib import redirect_stderr
+from io import StringIO
+from os import mkdir
+from os.path import join
+from subprocess import run
+from sys import executable
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from zipfile import ZipFile
+
+import koro
+from koro import EditorPage, Part, PartModel, SaveSlot, Stage, XmlSlot
+from koro.__main__ import main as koro_main
+
+
+def _stage(x_pos: float) -> Stage:
+    return Stage((Part(x_pos, 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20),))
+
+
+class TestMain(TestCase):
+    def setUp(self) -> None:
+        directory: TemporaryDirectory[str] = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory: str = directory.name
+        self.source: str = join(self.directory, "source")
+        self.dest: str = join(self.directory, "dest")
+        mkdir(self.source)
+        mkdir(self.dest)
+        for x_pos, index in (1.0, 1), (3.0, 3), (7.0, 7):
+            SaveSlot(self.source, EditorPage.ORIGINAL, index).save(_stage(x_pos))
+
+    def test_pack_unpack(self) -> None:
+        for jobs in "1", "2":
+            with self.subTest(jobs=jobs):
+                archive: str = join(self.directory, f"{jobs}.zip")
+                self.assertEqual(
+                    koro_main(
+                        ("pack", self.source, archive, "3", "2", "7", "-j", jobs)
+                    ),
+                    0,
+                )
+                with ZipFile(archive) as z:
+                    self.assertEqual(z.namelist(), ["01.bin", "03.bin"])
+                SaveSlot(self.dest, EditorPage.FRIEND, 2).save(_stage(0.0))
+                self.assertEqual(
+                    koro_main(("unpack", archive, self.dest, "-j", jobs)), 0
+                )
+                for index, x_pos in (1, 3.0), (3, 7.0):
+                    (part,) = SaveSlot(self.dest, EditorPage.FRIEND, index).load()
+                    self.assertEqual(part.x_pos, x_pos)
+                self.assertIsNone(SaveSlot(self.dest, EditorPage.FRIEND, 2).load())
+
+    def test_unpack_single(self) -> None:
+        level: str = join(self.directory, "level.xml")
+        XmlSlot(level).save(_stage(5.0))
+        self.assertEqual(koro_main(("unpack", level, self.dest, "4")), 0)
+        (part,) = SaveSlot(self.dest, EditorPage.FRIEND, 4).load()
+        self.assertEqual(part.x_pos, 5.0)
+
+    def test_errors(self) -> None:
+        level: str = join(self.directory, "level.xml")
+        XmlSlot(level).save(_stage(5.0))
+        for argv in (
+            ("bench", level, "-n", "0"),
+            ("bench", level, "-n", "x"),
+            ("convert", level, join(self.directory, "level.txt")),
+            ("inspect", join(self.directory, "missing.xml")),
+        ):
+            with self.subTest(argv=argv):
+                stderr: StringIO = StringIO()
+                with redirect_stderr(stderr), self.assertRaises(SystemExit) as raised:
+                    koro_main(argv)
+                self.assertEqual(raised.exception.code, 2)
+                self.assertIn("error:", stderr.getvalue())
+
+
+class TestLazyImport(TestCase):
+    def test_import(self) -> None:
+        # A fresh interpreter, since other tests have already imported every submodule
+        result = run(
+            (
+                executable,
+                "-c",
+                "import sys, koro\n"
+                "print('koro.slot.xml' in sys.modules)\n"
+                "koro.XmlSlot\n"
+                "print('koro.slot.xml' in sys.modules)",
+            ),
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        self.assertEqual(result.stdout.split(), ["False", "True"])
+
+    def test_getattr(self) -> None:
+        self.assertIs(koro.XmlSlot, XmlSlot)
+        self.assertIs(koro.__getattr__("SaveSlot"), SaveSlot)
+        with self.assertRaises(AttributeError):
+            koro.Missing  # type: ignore[attr-defined]
+
+    def test_dir(self) -> None:
+        names: list[str] = dir(koro)
+        self.assertEqual(names, sorted(names))
+        self.assertLessEqual(set(koro.__all__), set(names))
+
+
+if __name__ == "__main__":
+    main()
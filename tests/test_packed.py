@@ -0,0 +1,123 @@
+from struct import calcsize
+from unittest import TestCase, main
+
+from koro import (
+    DeviceModel,
+    EditUser,
+    Goal,
+    Magnet,
+    MagnetSegment,
+    PackedSlot,
+    Part,
+    PartModel,
+    Stage,
+    Start,
+    Theme,
+    ToyTrain,
+    TrainTrack,
+    Warp,
+)
+from koro.slot.packed import _HEADER, _SECTION
+
+
+def _stage() -> Stage:
+    return Stage(
+        (
+            Start(0.0, 10.0, 0.0, 0.0, 0.0, 0.0),
+            Goal(100.0, 10.0, 0.0, 0.0, 180.0, 0.0),
+            Part(0.5, 0.0, 0.0, 0.0, 90.0, 0.0, shape=PartModel.Tile20x20),
+            Magnet(
+                (
+                    MagnetSegment(
+                        0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=DeviceModel.EndMagnet
+                    ),
+                    MagnetSegment(
+                        10.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=DeviceModel.EndMagnet
+                    ),
+                )
+            ),
+            ToyTrain(
+                1.0,
+                2.0,
+                3.0,
+                0.0,
+                0.0,
+                0.0,
+                tracks=(
+                    TrainTrack(
+                        1.0, 2.0, 13.0, 0.0, 0.0, 0.0, shape=DeviceModel.EndTracks
+                    ),
+                ),
+            ),
+        ),
+        edit_user=EditUser.BEGINNER,
+        theme=Theme.CITY,
+        tilt_lock=True,
+    )
+
+
+class TestPackedSlot(TestCase):
+    def test_round_trip(self) -> None:
+        for single in False, True:
+            with self.subTest(single=single):
+                stage: Stage = _stage()
+                loaded: Stage = PackedSlot.deserialize(
+                    PackedSlot.serialize(stage, single=single)
+                )
+                self.assertEqual(sorted(map(repr, loaded)), sorted(map(repr, stage)))
+                self.assertEqual(loaded.edit_user, stage.edit_user)
+                self.assertEqual(loaded.theme, stage.theme)
+                self.assertEqual(loaded.tilt_lock, stage.tilt_lock)
+
+    def test_rotations_reduced(self) -> None:
+        stage: Stage = Stage(
+            (
+                Part(0.0, 0.0, 0.0, 359.99999, 0.0, 0.0, shape=PartModel.Tile20x20),
+                Warp(
+                    0.0,
+                    0.0,
+                    0.0,
+                    0.0,
+                    0.0,
+                    0.0,
+                    dest_x=0.0,
+                    dest_y=0.0,
+                    dest_z=0.0,
+                    return_x_pos=0.0,
+                    return_y_pos=0.0,
+                    return_z_pos=0.0,
+                    return_x_rot=0.0,
+                    return_y_rot=359.99999,
+                    return_z_rot=0.0,
+                    return_dest_x=0.0,
+                    return_dest_y=0.0,
+                    return_dest_z=0.0,
+                ),
+            )
+        )
+        for part in PackedSlot.deserialize(PackedSlot.serialize(stage, single=True)):
+            with self.subTest(part=part):
+                if isinstance(part, Warp):
+                    self.assertEqual(part.return_y_rot, 0.0)
+                else:
+                    self.assertEqual(part.x_rot, 0.0)
+
+    def test_record_size(self) -> None:
+        # Sections for Start, Goal, Part, Magnet with two segments, ToyTrain with one track
+        for single, width in (False, 8), (True, 4):
+            with self.subTest(single=single):
+                self.assertEqual(
+                    len(PackedSlot.serialize(_stage(), single=single)),
+                    _HEADER.size
+                    + 5 * _SECTION.size
+                    + 2 * calcsize(f"<{6 * width}x")
+                    + calcsize(f"<{6 * width}xh")
+                    + calcsize("<I")
+                    + 2 * calcsize(f"<{6 * width}xB")
+                    + calcsize(f"<{6 * width}xI")
+                    + calcsize(f"<{6 * width}xB"),
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import get_context
+from multiprocessing.synchronize import Event
+from os import listdir
+from os.path import getsize, join
+from tempfile import TemporaryDirectory
+from threading import Thread
+from unittest import TestCase, main, skipIf
+
+from koro import EditorPage, Part, PartModel, SaveSlot, Stage, XmlSlot
+from koro.slot.save import _SIZE_LIMIT, _create, lockf
+
+if lockf is not None:
+    from fcntl import LOCK_EX, LOCK_UN
+
+
+def _stage(x_pos: float) -> Stage:
+    return Stage((Part(x_pos, 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20),))
+
+
+def _hold(path: str, offset: int, held: Event, release: Event, /) -> None:
+    """Lock one slot's region of a save file exclusively until release is set."""
+    with open(path, "r+b") as f:
+        lockf(f, LOCK_EX, _SIZE_LIMIT, offset)
+        held.set()
+        release.wait(10)
+        lockf(f, LOCK_UN, _SIZE_LIMIT, offset)
+
+
+class TestSaveSlot(TestCase):
+    def setUp(self) -> None:
+        directory: TemporaryDirectory[str] = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory: str = directory.name
+
+    def test_create(self) -> None:
+        path: str = join(self.directory, "ed00.dat")
+        self.assertTrue(_create(path))
+        self.assertEqual(getsize(path), 638976)
+        slot: SaveSlot = SaveSlot(self.directory, EditorPage.ORIGINAL, 1)
+        slot.save(_stage(1.0))
+        self.assertFalse(_create(path))
+        (part,) = slot.load()
+        self.assertEqual(part.x_pos, 1.0)
+
+    def test_empty(self) -> None:
+        slot: SaveSlot = SaveSlot(self.directory, EditorPage.ORIGINAL, 2)
+        self.assertIsNone(slot.load())
+        slot.save(None)
+        self.assertFalse(slot)
+        slot.save(_stage(1.0))
+        self.assertTrue(slot)
+        self.assertIsNone(SaveSlot(self.directory, EditorPage.ORIGINAL, 1).load())
+
+    @skipIf(lockf is None, "locking is not supported on this platform")
+    def test_lock(self) -> None:
+        slot: SaveSlot = SaveSlot(self.directory, EditorPage.ORIGINAL, 1, lock=True)
+        other: SaveSlot = SaveSlot(self.directory, EditorPage.ORIGINAL, 2, lock=True)
+        slot.save(_stage(1.0))
+        context = get_context("fork")
+        held: Event = context.Event()
+        release: Event = context.Event()
+        holder = context.Process(
+            target=_hold, args=(slot._path, slot._offset, held, release)
+        )
+        holder.start()
+        try:
+            self.assertTrue(held.wait(10))
+            other.save(_stage(2.0))
+            self.assertIsNotNone(other.load())
+            reader: Thread = Thread(target=slot.load)
+            reader.start()
+            reader.join(0.2)
+            self.assertTrue(reader.is_alive())
+        finally:
+            release.set()
+            holder.join(10)
+        reader.join(10)
+        self.assertFalse(reader.is_alive())
+
+
+class TestSaveMany(TestCase):
+    def setUp(self) -> None:
+        directory: TemporaryDirectory[str] = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory: str = directory.name
+
+    def _slot(self, page: EditorPage, index: int) -> SaveSlot:
+        return SaveSlot(self.directory, page, index)
+
+    def _contents(self) -> dict[str, bytes]:
+        contents: dict[str, bytes] = {}
+        for name in listdir(self.directory):
+            with open(join(self.directory, name), "rb") as f:
+                contents[name] = f.read()
+        return contents
+
+    def test_save_many(self) -> None:
+        with ThreadPoolExecutor(2) as executor:
+            for current in None, executor:
+                with self.subTest(executor=current):
+                    SaveSlot.save_many(
+                        (
+                            (self._slot(EditorPage.ORIGINAL, 1), _stage(1.0)),
+                            (self._slot(EditorPage.ORIGINAL, 6), _stage(6.0)),
+                            (self._slot(EditorPage.FRIEND, 1), _stage(2.0)),
+                            (self._slot(EditorPage.ORIGINAL, 2), None),
+                        ),
+                        executor=current,
+                    )
+                    for page, index, x_pos in (
+                        (EditorPage.ORIGINAL, 1, 1.0),
+                        (EditorPage.ORIGINAL, 6, 6.0),
+                        (EditorPage.FRIEND, 1, 2.0),
+                    ):
+                        (part,) = self._slot(page, index).load()
+                        self.assertEqual(part.x_pos, x_pos)
+                    self.assertIsNone(self._slot(EditorPage.ORIGINAL, 2).load())
+
+    def test_write_many(self) -> None:
+        slot: SaveSlot = self._slot(EditorPage.ORIGINAL, 3)
+        slot.save(_stage(3.0))
+        SaveSlot.write_many(
+            (
+                (slot, b""),
+                (self._slot(EditorPage.HUDSON, 20), XmlSlot.serialize(_stage(1.0))),
+                (self._slot(EditorPage.HUDSON, 20), XmlSlot.serialize(_stage(2.0))),
+            )
+        )
+        self.assertFalse(slot)
+        (part,) = self._slot(EditorPage.HUDSON, 20).load()
+        self.assertEqual(part.x_pos, 2.0)
+
+    def test_too_large(self) -> None:
+        self._slot(EditorPage.ORIGINAL, 1).save(_stage(1.0))
+        before: dict[str, bytes] = self._contents()
+        with self.assertRaises(ValueError):
+            SaveSlot.write_many(
+                (
+                    (self._slot(EditorPage.ORIGINAL, 1), b""),
+                    (self._slot(EditorPage.FRIEND, 1), XmlSlot.serialize(_stage(2.0))),
+                    (self._slot(EditorPage.ORIGINAL, 2), bytes(_SIZE_LIMIT + 1)),
+                )
+            )
+        self.assertEqual(self._contents(), before)
+        with self.assertRaises(ValueError):
+            SaveSlot.save_many(
+                (
+                    (self._slot(EditorPage.ORIGINAL, 1), None),
+                    (
+                        self._slot(EditorPage.ORIGINAL, 2),
+                        Stage(
+                            Part(
+                                float(i),
+                                0.0,
+                                0.0,
+                                0.0,
+                                0.0,
+                                0.0,
+                                shape=PartModel.Tile20x20,
+                            )
+                            for i in range(_SIZE_LIMIT // 50)
+                        ),
+                    ),
+                )
+            )
+        self.assertEqual(self._contents(), before)
+
+
+if __name__ == "__main__":
+    main()
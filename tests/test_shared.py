@@ -0,0 +1,78 @@
+from copy import copy, deepcopy
+from multiprocessing import get_all_start_methods, get_context
+from pickle import dumps, loads
+from sys import version_info
+from unittest import TestCase, main, skipIf
+
+from stages import every_kind, records
+
+from koro import BasePart, SharedStage, Stage, freeze
+from koro.stage.shared import _tracked_separately
+
+
+def _records(shared: SharedStage, /) -> list[str]:
+    with shared:
+        return records(shared.load())
+
+
+class TestPickle(TestCase):
+    def test_parts(self) -> None:
+        for part in every_kind():
+            with self.subTest(part=part):
+                for copied in loads(dumps(part)), copy(part), deepcopy(part):
+                    self.assertIs(type(copied), type(part))
+                    self.assertIsNot(copied, part)
+                    self.assertEqual(records(Stage((copied,))), records(Stage((part,))))
+
+    def test_frozen(self) -> None:
+        for part in every_kind():
+            with self.subTest(part=part):
+                frozen: BasePart = freeze(part)
+                copied: BasePart = loads(dumps(frozen))
+                self.assertIs(type(copied), type(frozen))
+                self.assertEqual(records(Stage((copied,))), records(Stage((part,))))
+
+    def test_stage(self) -> None:
+        stage: Stage = every_kind()
+        stage.budget = 100000
+        copied: Stage = loads(dumps(stage))
+        self.assertEqual(records(copied), records(stage))
+        self.assertEqual(copied.theme, stage.theme)
+        self.assertEqual(copied.tilt_lock, stage.tilt_lock)
+        self.assertEqual(copied.edit_user, stage.edit_user)
+
+
+class TestSharedStage(TestCase):
+    def test_load(self) -> None:
+        stage: Stage = every_kind()
+        with SharedStage(stage) as shared:
+            self.assertEqual(records(shared.load()), records(stage))
+            self.assertEqual(len(shared.load_array()), len(stage))
+            self.assertEqual(shared.load().theme, stage.theme)
+
+    def test_attach(self) -> None:
+        stage: Stage = every_kind()
+        with SharedStage(stage) as shared:
+            attached: SharedStage = loads(dumps(shared))
+            self.assertEqual(attached.name, shared.name)
+            self.assertEqual(records(attached.load()), records(stage))
+            attached.close()
+            with self.assertRaises(ValueError):
+                attached.load()
+            self.assertEqual(records(shared.load()), records(stage))
+
+    def test_worker(self) -> None:
+        stage: Stage = every_kind()
+        for method in get_all_start_methods():
+            with self.subTest(method=method):
+                with get_context(method).Pool(1) as pool, SharedStage(stage) as shared:
+                    self.assertEqual(pool.apply(_records, (shared,)), records(stage))
+
+    @skipIf(version_info >= (3, 13), "attaching does not register the block")
+    def test_tracked_separately(self) -> None:
+        with SharedStage(Stage()):
+            self.assertFalse(_tracked_separately())
+
+
+if __name__ == "__main__":
+    main()
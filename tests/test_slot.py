@@ -0,0 +1,57 @@
+from io import BytesIO
+from unittest import TestCase, main
+
+from koro.slot import _CHUNK_SIZE, _write_changes
+
+
+class _RecordingFile(BytesIO):
+    """In-memory file that records the offset and length of each write."""
+
+    def __init__(self, data: bytes, /) -> None:
+        super().__init__(data)
+        self.writes: list[tuple[int, int]] = []
+
+    def write(self, data: bytes | memoryview, /) -> int:  # type: ignore[override]
+        self.writes.append((self.tell(), len(data)))
+        return super().write(data)
+
+
+class TestWriteChanges(TestCase):
+    def test_changed_chunks(self) -> None:
+        old: bytes = bytes(5 * _CHUNK_SIZE)
+        new: bytearray = bytearray(old)
+        new[1] = 1
+        new[3 * _CHUNK_SIZE] = 1
+        new[4 * _CHUNK_SIZE] = 1
+        f: _RecordingFile = _RecordingFile(old)
+        _write_changes(f, 0, old, bytes(new))
+        self.assertEqual(
+            f.writes, [(0, _CHUNK_SIZE), (3 * _CHUNK_SIZE, 2 * _CHUNK_SIZE)]
+        )
+        self.assertEqual(f.getvalue(), new)
+
+    def test_offset(self) -> None:
+        old: bytes = bytes(2 * _CHUNK_SIZE)
+        new: bytes = bytes(_CHUNK_SIZE) + b"\x01" * _CHUNK_SIZE
+        f: _RecordingFile = _RecordingFile(b"header" + old)
+        _write_changes(f, 6, old, new)
+        self.assertEqual(f.writes, [(6 + _CHUNK_SIZE, _CHUNK_SIZE)])
+        self.assertEqual(f.getvalue(), b"header" + new)
+
+    def test_unchanged(self) -> None:
+        data: bytes = bytes(range(256)) * 40
+        f: _RecordingFile = _RecordingFile(data)
+        _write_changes(f, 0, data, data)
+        self.assertEqual(f.writes, [])
+
+    def test_grown(self) -> None:
+        old: bytes = bytes(_CHUNK_SIZE)
+        new: bytes = old + b"tail"
+        f: _RecordingFile = _RecordingFile(old)
+        _write_changes(f, 0, old, new)
+        self.assertEqual(f.writes, [(_CHUNK_SIZE, 4)])
+        self.assertEqual(f.getvalue(), new)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+from collections import Counter
+from unittest import TestCase, main
+
+from stages import every_kind
+
+from koro import (
+    Bumper,
+    Cannon,
+    DecorationModel,
+    DeviceModel,
+    Journal,
+    Magnet,
+    MagnetSegment,
+    MovingTile,
+    Part,
+    PartModel,
+    Stage,
+    TypeIndex,
+)
+from koro.stage.part import _watch
+
+
+def _part() -> Part:
+    return Part(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20)
+
+
+class TestTransform(TestCase):
+    def test_rotations_composed(self) -> None:
+        part: Part = Part(0.0, 0.0, 0.0, 0.0, 0.0, 90.0, shape=PartModel.Tile20x20)
+        Stage((part,)).rotate_about("x", 90.0)
+        self.assertEqual((part.x_rot, part.y_rot, part.z_rot), (0.0, 270.0, 90.0))
+
+    def test_notified_once(self) -> None:
+        parts: list[Part] = [_part() for _ in range(3)]
+        stage: Stage = Stage(parts)
+        journal: Journal = Journal()
+        stage.journal = journal
+        stage.rotate_about("y", 45.0, (1.0, 2.0, 3.0))
+        self.assertEqual(len(journal.since(0)), len(parts))
+
+
+class TestTypeIndex(TestCase):
+    def test_devices(self) -> None:
+        cannon: Cannon = Cannon(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        tile: Part = _part()
+        for index in (None, TypeIndex()):
+            with self.subTest(index=index):
+                stage: Stage = Stage((cannon, tile))
+                stage.type_index = index
+                self.assertEqual(stage.with_model(DeviceModel.Cannon), {cannon})
+                self.assertEqual(stage.with_model(PartModel.Tile20x20), {tile})
+
+    def test_indexed_counts(self) -> None:
+        stage: Stage = every_kind()
+        expected: Counter[PartModel | DecorationModel | DeviceModel] = (
+            stage.count_by_model()
+        )
+        stage.type_index = TypeIndex()
+        self.assertEqual(stage.count_by_model(), expected)
+        self.assertEqual(expected[DeviceModel.Start], 1)
+        self.assertEqual(expected[DeviceModel.TimerFan], 1)
+        self.assertEqual(expected[DeviceModel.MovingTile20x20Switch], 1)
+        self.assertEqual(expected[PartModel.Tile20x20], 1)
+
+    def test_model_changed(self) -> None:
+        bumper: Bumper = Bumper(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        tile: MovingTile = MovingTile(
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            dest_x=1.0,
+            dest_y=1.0,
+            dest_z=1.0,
+            shape=PartModel.Tile20x20,
+        )
+        stage: Stage = Stage((bumper, tile))
+        stage.type_index = TypeIndex()
+        self.assertEqual(stage.with_model(DeviceModel.MovingTile20x20), {tile})
+        self.assertEqual(stage.with_model(PartModel.Tile20x20), set())
+        bumper.powerful = True
+        tile.switch = True
+        self.assertEqual(stage.with_model(DeviceModel.PowerfulBumper), {bumper})
+        self.assertEqual(stage.with_model(DeviceModel.Bumper), set())
+        self.assertEqual(stage.with_model(DeviceModel.MovingTile20x20Switch), {tile})
+
+
+class TestWatching(TestCase):
+    def test_mutators_overridden(self) -> None:
+        for name in (
+            "add",
+            "clear",
+            "difference_update",
+            "discard",
+            "intersection_update",
+            "pop",
+            "remove",
+            "symmetric_difference_update",
+            "update",
+            "__iand__",
+            "__ior__",
+            "__isub__",
+            "__ixor__",
+        ):
+            with self.subTest(name=name):
+                self.assertIn(name, vars(Stage))
+
+    def test_private_attribute(self) -> None:
+        part: Part = _part()
+        stage: Stage = Stage((part,))
+        stage.type_index = TypeIndex()
+        with self.assertRaises(AttributeError):
+            part._ = None
+        self.assertEqual(stage.with_model(PartModel.Tile20x20), {part})
+        part.shape = PartModel.TileA30x30
+        self.assertEqual(stage.with_model(PartModel.TileA30x30), {part})
+
+    def test_segments_rolled_back(self) -> None:
+        segment: MagnetSegment = MagnetSegment(
+            0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=DeviceModel.EndMagnet
+        )
+        magnet: Magnet = Magnet((segment,))
+        Stage((magnet,)).journal = Journal()
+
+        def refuse(part: object) -> None:
+            raise RuntimeError
+
+        _watch(magnet, refuse)
+        added: MagnetSegment = MagnetSegment(
+            10.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=DeviceModel.EndMagnet
+        )
+        with self.assertRaises(RuntimeError):
+            magnet.append(added)
+        self.assertEqual(list(magnet), [segment])
+        added.x_pos = 5.0
+        with self.assertRaises(RuntimeError):
+            segment.x_pos = 5.0
+        self.assertEqual(segment.x_pos, 0.0)
+
+    def test_type_unchanged(self) -> None:
+        part: Part = _part()
+        magnet: Magnet = Magnet(
+            (MagnetSegment(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=DeviceModel.EndMagnet),)
+        )
+        stage: Stage = Stage((part, magnet))
+        stage.budget = 100
+        stage.journal = Journal()
+        self.assertIs(type(part), Part)
+        self.assertIs(type(magnet), Magnet)
+        part.x_pos = 1.0
+        magnet.append(
+            MagnetSegment(10.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=DeviceModel.EndMagnet)
+        )
+        self.assertEqual(len(stage.journal.since(0)), 2)
+        self.assertIs(type(magnet[1]), MagnetSegment)
+
+
+if __name__ == "__main__":
+    main()
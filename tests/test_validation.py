@@ -0,0 +1,142 @@
+from math import nan
+from unittest import TestCase, main
+
+from koro import (
+    DecorationModel,
+    Goal,
+    Part,
+    PartModel,
+    ProgressMarker,
+    Rule,
+    Stage,
+    StageArray,
+    Start,
+    Theme,
+    Violation,
+    Warp,
+    validate,
+    validate_all,
+)
+
+
+def _tile() -> Part:
+    return Part(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20)
+
+
+def _valid() -> Stage:
+    return Stage(
+        (
+            Start(0.0, 10.0, 0.0, 0.0, 0.0, 0.0),
+            Goal(100.0, 10.0, 0.0, 0.0, 0.0, 0.0),
+            _tile(),
+            ProgressMarker(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, progress=1),
+            ProgressMarker(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, progress=2),
+        ),
+        theme=Theme.CANDY_ISLAND,
+    )
+
+
+def _rules(violations: list[Violation]) -> list[Rule]:
+    return [violation.rule for violation in violations]
+
+
+class TestValidate(TestCase):
+    def test_valid(self) -> None:
+        self.assertEqual(validate(_valid()), [])
+        self.assertEqual(validate(StageArray.from_stage(_valid())), [])
+
+    def test_start_and_goal(self) -> None:
+        stage: Stage = _valid()
+        start: Start = Start(1.0, 10.0, 0.0, 0.0, 0.0, 0.0)
+        stage.add(start)
+        stage -= {part for part in stage if isinstance(part, Goal)}
+        starts, goals = validate(stage)
+        self.assertEqual(starts.rule, Rule.START)
+        self.assertIn(start, starts.parts)
+        self.assertEqual(len(starts.parts), 2)
+        self.assertEqual(goals.rule, Rule.GOAL)
+        self.assertEqual(goals.parts, ())
+
+    def test_progress(self) -> None:
+        stage: Stage = _valid()
+        duplicate: ProgressMarker = ProgressMarker(
+            0.0, 0.0, 0.0, 0.0, 0.0, 0.0, progress=2
+        )
+        unpaired: ProgressMarker = ProgressMarker(
+            0.0, 0.0, 0.0, 0.0, 0.0, 0.0, progress=5
+        )
+        stage |= {duplicate, unpaired}
+        violations: list[Violation] = validate(stage)
+        self.assertEqual(_rules(violations), [Rule.PROGRESS] * 3)
+        self.assertIn(duplicate, violations[0].parts)
+        self.assertEqual(violations[1].parts, (unpaired,))
+        self.assertEqual(violations[2].message, "no progress markers for checkpoints 2")
+
+    def test_decoration(self) -> None:
+        stage: Stage = _valid()
+        allowed: Part = Part(
+            0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=DecorationModel.Decoration01
+        )
+        unavailable: Part = Part(
+            0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=DecorationModel.Decoration05
+        )
+        stage |= {allowed, unavailable}
+        (violation,) = validate(stage)
+        self.assertEqual(violation.rule, Rule.DECORATION)
+        self.assertEqual(violation.parts, (unavailable,))
+
+    def test_warp(self) -> None:
+        warp: Warp = Warp(
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            dest_x=1.0,
+            dest_y=1.0,
+            dest_z=1.0,
+            return_x_pos=nan,
+            return_y_pos=0.0,
+            return_z_pos=0.0,
+            return_x_rot=0.0,
+            return_y_rot=0.0,
+            return_z_rot=0.0,
+            return_dest_x=0.0,
+            return_dest_y=0.0,
+            return_dest_z=0.0,
+        )
+        stage: Stage = _valid()
+        stage.add(warp)
+        (violation,) = validate(stage)
+        self.assertEqual(violation.rule, Rule.WARP)
+        self.assertEqual(violation.parts, (warp,))
+
+    def test_budget(self) -> None:
+        stage: Stage = _valid()
+        cost: int = sum(part.cost for part in stage)
+        self.assertEqual(validate(stage, budget=cost), [])
+        self.assertEqual(_rules(validate(stage, budget=cost - 1)), [Rule.BUDGET])
+        stage.budget = cost - 1
+        self.assertEqual(_rules(validate(stage)), [Rule.BUDGET])
+        self.assertEqual(validate(stage, budget=cost), [])
+
+    def test_size(self) -> None:
+        stage: Stage = _valid()
+        stage.update(
+            Part(float(i), 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20)
+            for i in range(2000)
+        )
+        self.assertEqual(_rules(validate(stage)), [Rule.SIZE])
+
+    def test_validate_all(self) -> None:
+        stage: Stage = _valid()
+        stage.add(Start(1.0, 10.0, 0.0, 0.0, 0.0, 0.0))
+        self.assertEqual(
+            [_rules(violations) for violations in validate_all((_valid(), stage))],
+            [[], [Rule.START]],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from unittest import TestCase, main
+
+from stages import every_kind, records
+
+from koro import Part, PartModel, Stage, XmlSlot
+
+
+class TestXmlSlot(TestCase):
+    def test_round_trip(self) -> None:
+        stage: Stage = every_kind()
+        loaded: Stage = XmlSlot.deserialize(XmlSlot.serialize(stage))
+        self.assertEqual(records(loaded), records(stage))
+        self.assertEqual(loaded.theme, stage.theme)
+        self.assertEqual(loaded.tilt_lock, stage.tilt_lock)
+
+    def test_rotations_normalized(self) -> None:
+        data: bytes = XmlSlot.serialize(
+            Stage((Part(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, shape=PartModel.Tile20x20),))
+        ).replace(b"<rot> 0 0 0 </rot>", b"<rot> -90 450 360 </rot>")
+        (part,) = XmlSlot.deserialize(data)
+        self.assertEqual((part.x_rot, part.y_rot, part.z_rot), (270.0, 90.0, 0.0))
+
+
+if __name__ == "__main__":
+    main()